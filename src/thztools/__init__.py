@@ -7,12 +7,22 @@ from thztools.__about__ import __version__
 from thztools.thztools import (
     FitResult,
     GlobalOptions,
+    IncrementalNoiseFit,
+    LowRankCovariance,
+    NoiseEstimate,
+    NoiseFitProgress,
+    NoiseFitStart,
     NoiseModel,
     NoiseResult,
     apply_frf,
     fit,
     get_option,
+    noise_estimate,
     noisefit,
+    noisefit_batch,
+    noisefit_multistart,
+    noisefit_parallel,
+    noisefit_stochastic,
     options,
     reset_option,
     scaleshift,
@@ -24,13 +34,23 @@ from thztools.thztools import (
 __all__ = [
     "FitResult",
     "GlobalOptions",
+    "IncrementalNoiseFit",
+    "LowRankCovariance",
+    "NoiseEstimate",
+    "NoiseFitProgress",
+    "NoiseFitStart",
     "NoiseModel",
     "NoiseResult",
     "__version__",
     "apply_frf",
     "fit",
     "get_option",
+    "noise_estimate",
     "noisefit",
+    "noisefit_batch",
+    "noisefit_multistart",
+    "noisefit_parallel",
+    "noisefit_stochastic",
     "options",
     "reset_option",
     "scaleshift",
@@ -50,20 +50,28 @@ Create an ideal waveform and apply a frequency response function to it.
 
 from __future__ import annotations
 
+import multiprocessing
+import os
 import sys
+import threading
+import time
 import warnings
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache, partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, cast
 
 import numpy as np
+import scipy.fft
 import scipy.linalg as la
 import scipy.optimize as opt
 from numpy import pi
-from numpy.fft import irfft, rfft, rfftfreq
 from numpy.random import default_rng
 from scipy import signal
 from scipy.linalg import sqrtm
-from scipy.optimize import OptimizeResult, approx_fprime, minimize
+from scipy.optimize import OptimizeResult, approx_fprime, minimize, nnls
 from scipy.signal.windows import __all__ as windowlist
 
 if sys.version_info >= (3, 10):
@@ -75,12 +83,31 @@ else:
     raise ValueError(msg)
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator, Sequence
 
     from numpy.typing import ArrayLike, NDArray
 
 NUM_NOISE_PARAMETERS = 3
 NUM_NOISE_DATA_DIMENSIONS = 2
+NOISEFIT_METHODS = (
+    "BFGS",
+    "L-BFGS-B",
+    "Newton-CG",
+    "trust-exact",
+    "trust-ncg",
+    "trust-krylov",
+    "block-coordinate",
+)
+FFT_BACKENDS = ("numpy", "scipy", "pyfftw")
+NOISEFIT_ERRORS = ("none", "bfgs", "diagonal", "low-rank", "exact", "lazy")
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
 
 
 @dataclass
@@ -94,9 +121,25 @@ class GlobalOptions:
         Global sampling time, normally in picoseconds. When set to None, the
         default, times and frequencies are treated as dimensionless quantities
         that are scaled by the (undetermined) sampling time.
+    fft_backend : str, optional
+        Library used for the FFTs in all functions, which is one of
+        ``"numpy"``, the default, ``"scipy"``, or ``"pyfftw"``. The
+        ``"pyfftw"`` backend requires the optional `pyFFTW
+        <https://github.com/pyFFTW/pyFFTW>`_ package.
+    fft_workers : int, optional
+        Number of threads used for each FFT by the ``"scipy"`` and
+        ``"pyfftw"`` backends. Default is 1. Use -1 for all available
+        processors.
+    use_numexpr : bool, optional
+        Evaluate the element-wise terms of the :func:`noisefit` derivatives
+        in fused, multithreaded passes with the optional `numexpr
+        <https://github.com/pydata/numexpr>`_ package. Default is False.
     """
 
     sampling_time: float | None = None
+    fft_backend: str = "numpy"
+    fft_workers: int = 1
+    use_numexpr: bool = False
 
 
 #: Instance of ``GlobalOptions`` that stores global options.
@@ -127,6 +170,22 @@ def set_option(key: str, value: Any) -> None:
         Global sampling time, normally in picoseconds. When set to ``None``,
         the default, times and frequencies are treated as dimensionless
         quantities that are scaled by the (undetermined) sampling time.
+    fft_backend : str
+        Library used for the FFTs in all functions, which is one of
+        ``"numpy"``, the default, ``"scipy"``, or ``"pyfftw"``. The
+        ``"pyfftw"`` backend requires the optional `pyFFTW
+        <https://github.com/pyFFTW/pyFFTW>`_ package. Results agree between
+        backends to within round-off error.
+    fft_workers : int
+        Number of threads used for each FFT by the ``"scipy"`` and
+        ``"pyfftw"`` backends. Default is 1. Use -1 for all available
+        processors.
+    use_numexpr : bool
+        Evaluate the element-wise terms of the :func:`noisefit` derivatives
+        in fused, multithreaded passes with the optional `numexpr
+        <https://github.com/pydata/numexpr>`_ package. Default is False.
+        The number of threads is set by numexpr, for example with the
+        ``NUMEXPR_NUM_THREADS`` environment variable.
 
     Examples
     --------
@@ -142,6 +201,18 @@ def set_option(key: str, value: Any) -> None:
     >>> thz.get_option("sampling_time")
     0.05
     """
+    if key == "fft_backend":
+        if value not in FFT_BACKENDS:
+            msg = f"FFT backend must be one of {FFT_BACKENDS}, not {value!r}"
+            raise ValueError(msg)
+        if value == "pyfftw":
+            _pyfftw_interface()
+    if key == "fft_workers" and (int(value) < 1 and int(value) != -1):
+        msg = "Number of FFT workers must be a positive integer or -1"
+        raise ValueError(msg)
+    if key == "use_numexpr" and value and _numexpr() is None:
+        msg = "The 'use_numexpr' option requires the numexpr package"
+        raise ImportError(msg)
     setattr(options, key, value)
 
 
@@ -167,6 +238,22 @@ def get_option(key: str) -> Any:
         Global sampling time, normally in picoseconds. When set to ``None``,
         the default, times and frequencies are treated as dimensionless
         quantities that are scaled by the (undetermined) sampling time.
+    fft_backend : str
+        Library used for the FFTs in all functions, which is one of
+        ``"numpy"``, the default, ``"scipy"``, or ``"pyfftw"``. The
+        ``"pyfftw"`` backend requires the optional `pyFFTW
+        <https://github.com/pyFFTW/pyFFTW>`_ package. Results agree between
+        backends to within round-off error.
+    fft_workers : int
+        Number of threads used for each FFT by the ``"scipy"`` and
+        ``"pyfftw"`` backends. Default is 1. Use -1 for all available
+        processors.
+    use_numexpr : bool
+        Evaluate the element-wise terms of the :func:`noisefit` derivatives
+        in fused, multithreaded passes with the optional `numexpr
+        <https://github.com/pydata/numexpr>`_ package. Default is False.
+        The number of threads is set by numexpr, for example with the
+        ``NUMEXPR_NUM_THREADS`` environment variable.
 
     Examples
     --------
@@ -206,6 +293,22 @@ def reset_option(key: str | None = None) -> None:
         Global sampling time, normally in picoseconds. When set to ``None``,
         the default, times and frequencies are treated as dimensionless
         quantities that are scaled by the (undetermined) sampling time.
+    fft_backend : str
+        Library used for the FFTs in all functions, which is one of
+        ``"numpy"``, the default, ``"scipy"``, or ``"pyfftw"``. The
+        ``"pyfftw"`` backend requires the optional `pyFFTW
+        <https://github.com/pyFFTW/pyFFTW>`_ package. Results agree between
+        backends to within round-off error.
+    fft_workers : int
+        Number of threads used for each FFT by the ``"scipy"`` and
+        ``"pyfftw"`` backends. Default is 1. Use -1 for all available
+        processors.
+    use_numexpr : bool
+        Evaluate the element-wise terms of the :func:`noisefit` derivatives
+        in fused, multithreaded passes with the optional `numexpr
+        <https://github.com/pydata/numexpr>`_ package. Default is False.
+        The number of threads is set by numexpr, for example with the
+        ``NUMEXPR_NUM_THREADS`` environment variable.
 
     Examples
     --------
@@ -255,6 +358,104 @@ def _assign_sampling_time(dt: float | None) -> float:
     return dt_out
 
 
+def _pyfftw_interface() -> Any:
+    """Import the NumPy-like interface of pyFFTW and enable plan caching"""
+    try:
+        import pyfftw.interfaces.cache
+        import pyfftw.interfaces.numpy_fft
+    except ImportError as e:
+        msg = "The 'pyfftw' FFT backend requires the pyFFTW package"
+        raise ImportError(msg) from e
+    pyfftw.interfaces.cache.enable()
+    return pyfftw.interfaces.numpy_fft
+
+
+def _fft_workers() -> int:
+    workers = int(get_option("fft_workers"))
+    return (os.cpu_count() or 1) if workers == -1 else workers
+
+
+def _rfft(
+    a: ArrayLike, n: int | None = None, axis: int = -1
+) -> NDArray[np.complex128]:
+    """Real FFT with the backend set by the fft_backend option"""
+    backend = get_option("fft_backend")
+    if backend == "scipy":
+        return np.asarray(
+            scipy.fft.rfft(a, n=n, axis=axis, workers=_fft_workers())
+        )
+    if backend == "pyfftw":
+        return np.asarray(
+            _pyfftw_interface().rfft(a, n=n, axis=axis, threads=_fft_workers())
+        )
+    return np.fft.rfft(a, n=n, axis=axis)
+
+
+def _irfft(
+    a: ArrayLike, n: int | None = None, axis: int = -1
+) -> NDArray[np.float64]:
+    """Inverse real FFT with the backend set by the fft_backend option"""
+    backend = get_option("fft_backend")
+    if backend == "scipy":
+        return np.asarray(
+            scipy.fft.irfft(a, n=n, axis=axis, workers=_fft_workers())
+        )
+    if backend == "pyfftw":
+        return np.asarray(
+            _pyfftw_interface().irfft(
+                a, n=n, axis=axis, threads=_fft_workers()
+            )
+        )
+    return np.fft.irfft(a, n=n, axis=axis)
+
+
+@lru_cache(maxsize=64)
+def _rfftfreq(n: int, d: float = 1.0) -> NDArray[np.float64]:
+    """Cached, read-only frequency grid of the real FFT"""
+    f = np.asarray(np.fft.rfftfreq(n, d), dtype=np.float64)
+    f.setflags(write=False)
+    return f
+
+
+def _delay_phase(eta_on_dt: ArrayLike, n: int) -> NDArray[np.complex128]:
+    r"""
+    Compute the delay phase factors on the frequency grid of the real FFT.
+
+    Returns ``np.exp(1j * eta_on_dt[..., np.newaxis] * w)``, with
+    ``w = 2 * pi * np.fft.rfftfreq(n)``, without evaluating a complex
+    exponential for every element. Writing the frequency index as
+    :math:`k = qb + r` with block size :math:`b \approx \sqrt{n/2}`, each
+    factor is the product of one coarse factor :math:`e^{i\eta w_{qb}}` and
+    one fine factor :math:`e^{i\eta w_r}`, so only about :math:`2\sqrt{n/2}`
+    exponentials are needed per delay. Each factor is the product of two
+    correctly rounded exponentials, so there is no error accumulation along
+    the frequency grid.
+
+    Parameters
+    ----------
+    eta_on_dt : array_like
+        Delays in units of the sampling time, with arbitrary shape.
+    n : int
+        Number of time samples.
+
+    Returns
+    -------
+    exp_iweta : ndarray
+        Array of phase factors, with shape ``(*eta_on_dt.shape, n // 2 + 1)``.
+    """
+    eta_on_dt = np.asarray(eta_on_dt, dtype=np.float64)
+    shape = eta_on_dt.shape
+    n_f = n // 2 + 1
+    block = int(np.ceil(np.sqrt(n_f)))
+    theta = 2 * pi * eta_on_dt[..., np.newaxis] / n
+    fine = np.exp(1j * theta * np.arange(block))
+    coarse = np.exp(1j * theta * np.arange(0, n_f, block))
+    exp_iweta = (
+        coarse[..., :, np.newaxis] * fine[..., np.newaxis, :]
+    ).reshape((*shape, -1))[..., :n_f]
+    return np.ascontiguousarray(exp_iweta)
+
+
 @dataclass
 class NoiseModel:
     r"""
@@ -424,8 +625,8 @@ class NoiseModel:
             x = np.moveaxis(x, axis, -1)
 
         n = x.shape[-1]
-        w_scaled = 2 * pi * rfftfreq(n)
-        xdot = irfft(1j * w_scaled * rfft(x), n=n) / dt
+        w_scaled = 2 * pi * _rfftfreq(n)
+        xdot = _irfft(1j * w_scaled * _rfft(x), n=n) / dt
 
         noise_variance = (
             self.sigma_alpha**2
@@ -624,6 +825,17 @@ class NoiseResult:
         :func:`scipy.optimize.minimize`. Note that the attributes ``fun``,
         ``jac``, and ``hess_inv`` represent functions over the internally
         scaled parameters.
+    covariance : LowRankCovariance or None, optional
+        Compact approximation to ``hess_inv``, represented as a
+        :class:`LowRankCovariance` object, with the parameters in the same
+        order. Default is None.
+    _lazy_errors : callable or None, optional
+        Function that returns ``hess_inv`` and the ``err_*`` attributes, in
+        that order. If given, these attributes hold placeholder values until
+        one of them is first accessed, or until the result is pickled, when
+        the function is called to replace them. The function should be
+        picklable, such as a :func:`functools.partial` object over a
+        module-level function. Default is None.
 
     Attributes
     ----------
@@ -653,6 +865,10 @@ class NoiseResult:
         :func:`scipy.optimize.minimize`. Note that the attributes ``fun``,
         ``jac``, and ``hess_inv`` represent functions over the internally
         scaled parameters.
+    covariance : LowRankCovariance or None, optional
+        Compact approximation to ``hess_inv``, represented as a
+        :class:`LowRankCovariance` object, with the parameters in the same
+        order. Default is None.
 
     See Also
     --------
@@ -673,6 +889,335 @@ class NoiseResult:
     err_a: NDArray[np.float64]
     err_eta: NDArray[np.float64]
     diagnostic: OptimizeResult
+    covariance: LowRankCovariance | None = None
+    _lazy_errors: (
+        Callable[
+            [],
+            tuple[
+                NDArray[np.float64],
+                float,
+                float,
+                float,
+                NDArray[np.float64],
+                NDArray[np.float64],
+                NDArray[np.float64],
+            ],
+        ]
+        | None
+    ) = field(default=None, repr=False, compare=False)
+
+    def __getattribute__(self, name: str) -> Any:
+        # Replace the placeholders with the deferred values on first access
+        if name in _LAZY_NOISE_RESULT_FIELDS:
+            lazy_errors = object.__getattribute__(self, "_lazy_errors")
+            if lazy_errors is not None:
+                self.__dict__.update(
+                    zip(_LAZY_NOISE_RESULT_FIELDS, lazy_errors())
+                )
+                self._lazy_errors = None
+        return object.__getattribute__(self, name)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Compute the deferred values, so that the pickled result does not
+        # hold the data and the function that computes them
+        _ = self.hess_inv
+        return self.__dict__.copy()
+
+
+_LAZY_NOISE_RESULT_FIELDS = (
+    "hess_inv",
+    "err_sigma_alpha",
+    "err_sigma_beta",
+    "err_sigma_tau",
+    "err_mu",
+    "err_a",
+    "err_eta",
+)
+
+
+@dataclass
+class LowRankCovariance:
+    r"""
+    Dataclass for a covariance matrix with diagonal plus low-rank structure.
+
+    Represents the covariance matrix
+
+    .. math:: \mathbf{C} = \operatorname{diag}(\mathbf{d})
+        + \mathbf{U}\mathbf{U}^\mathsf{T},
+
+    where :math:`\mathbf{d}` is a vector of length `p` and
+    :math:`\mathbf{U}` is a `p` by `k` factor matrix with `k` much smaller
+    than `p`, which requires :math:`O(pk)` memory instead of the
+    :math:`O(p^2)` memory of the dense matrix.
+
+    Parameters
+    ----------
+    diag : ndarray, shape (p,)
+        Diagonal vector :math:`\mathbf{d}`.
+    factor : ndarray, shape (p, k)
+        Low-rank factor :math:`\mathbf{U}`.
+
+    Attributes
+    ----------
+    diag : ndarray, shape (p,)
+        Diagonal vector :math:`\mathbf{d}`.
+    factor : ndarray, shape (p, k)
+        Low-rank factor :math:`\mathbf{U}`.
+
+    See Also
+    --------
+    NoiseResult : Dataclass for the output of :func:`noisefit`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> rng = np.random.default_rng(0)
+    >>> u = rng.standard_normal((100, 3))
+    >>> cov = np.diag(np.full(100, 0.1)) + u @ u.T
+    >>> cov_lr = thz.LowRankCovariance.from_matrix(cov, rank=3, seed=0)
+    >>> np.allclose(cov_lr.variance(), np.diag(cov))
+    True
+    >>> bool(np.max(np.abs(cov_lr.todense() - cov)) < 0.1)
+    True
+    """
+
+    diag: NDArray[np.float64]
+    factor: NDArray[np.float64]
+
+    @classmethod
+    def from_matrix(
+        cls,
+        cov: ArrayLike,
+        *,
+        rank: int,
+        seed: int | None = None,
+    ) -> LowRankCovariance:
+        r"""
+        Compress a dense covariance matrix.
+
+        Parameters
+        ----------
+        cov : array_like
+            Symmetric positive semidefinite matrix with shape (p, p).
+        rank : int
+            Rank of the low-rank factor.
+        seed : int or None, optional
+            Random number generator seed for the randomized
+            eigendecomposition.
+
+        Returns
+        -------
+        cov_lr : LowRankCovariance
+            Compressed covariance matrix.
+
+        Notes
+        -----
+        The factor is obtained from the leading eigenvectors of ``cov``,
+        computed with a randomized eigendecomposition, and the diagonal
+        holds the remainder of the diagonal of ``cov``, so that the
+        marginal variances are preserved.
+        """
+        cov = np.asarray(cov, dtype=np.float64)
+        return cls._from_matmat(
+            lambda v: cov @ v, np.diag(cov), rank=rank, seed=seed
+        )
+
+    @classmethod
+    def _from_matmat(
+        cls,
+        matmat: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+        variance: NDArray[np.float64],
+        *,
+        rank: int,
+        seed: int | None = None,
+    ) -> LowRankCovariance:
+        """Compress a covariance matrix given its products with matrices"""
+        rank = min(int(rank), variance.size)
+        if rank < 0:
+            msg = "Rank must be a nonnegative integer"
+            raise ValueError(msg)
+        factor = _randomized_eigh_factor(
+            matmat, variance.size, rank, seed=seed
+        )
+        diag = np.maximum(variance - np.sum(factor**2, axis=1), 0.0)
+        return cls(diag, factor)
+
+    @property
+    def rank(self) -> int:
+        """Rank of the low-rank factor."""
+        return int(self.factor.shape[1])
+
+    def variance(self) -> NDArray[np.float64]:
+        r"""
+        Compute the marginal variances.
+
+        Returns
+        -------
+        var : ndarray, shape (p,)
+            Diagonal of the covariance matrix.
+        """
+        return np.asarray(
+            self.diag + np.sum(self.factor**2, axis=1), dtype=np.float64
+        )
+
+    def covariance(self, index: ArrayLike) -> NDArray[np.float64]:
+        r"""
+        Compute the covariance matrix of a subset of the parameters.
+
+        Parameters
+        ----------
+        index : array_like
+            Integer indices or boolean mask of the parameters.
+
+        Returns
+        -------
+        cov : ndarray
+            Covariance matrix of the selected parameters.
+        """
+        idx = np.arange(self.diag.size)[np.asarray(index)].reshape(-1)
+        u = self.factor[idx]
+        return np.asarray(np.diag(self.diag[idx]) + u @ u.T, dtype=np.float64)
+
+    def todense(self) -> NDArray[np.float64]:
+        r"""
+        Compute the dense covariance matrix.
+
+        Returns
+        -------
+        cov : ndarray, shape (p, p)
+            Covariance matrix.
+        """
+        return np.asarray(
+            np.diag(self.diag) + self.factor @ self.factor.T, dtype=np.float64
+        )
+
+    def sample(
+        self, size: int | None = None, *, seed: int | None = None
+    ) -> NDArray[np.float64]:
+        r"""
+        Draw samples from a zero-mean normal distribution.
+
+        Parameters
+        ----------
+        size : int or None, optional
+            Number of samples. Default is None, which returns a single
+            sample.
+        seed : int or None, optional
+            Random number generator seed.
+
+        Returns
+        -------
+        samples : ndarray, shape (p,) or (size, p)
+            Samples with the represented covariance matrix.
+        """
+        rng = default_rng(seed)
+        shape = () if size is None else (int(size),)
+        z_diag = rng.standard_normal((*shape, self.diag.size))
+        z_factor = rng.standard_normal((*shape, self.rank))
+        return np.asarray(
+            np.sqrt(self.diag) * z_diag + z_factor @ self.factor.T,
+            dtype=np.float64,
+        )
+
+
+def _randomized_eigh_factor(
+    matmat: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+    size: int,
+    rank: int,
+    *,
+    oversample: int = 10,
+    power_iter: int = 2,
+    seed: int | None = None,
+) -> NDArray[np.float64]:
+    """Factor U with U @ U.T the leading eigenpairs of a PSD matrix
+
+    Uses a randomized range finder with power iterations, followed by a
+    Rayleigh-Ritz projection.
+    """
+    if rank == 0:
+        return np.empty((size, 0))
+    rng = default_rng(seed)
+    num_vectors = min(size, rank + oversample)
+    q, _ = np.linalg.qr(matmat(rng.standard_normal((size, num_vectors))))
+    for _ in range(power_iter):
+        q, _ = np.linalg.qr(matmat(q))
+    b = q.T @ matmat(q)
+    eigval, eigvec = np.linalg.eigh((b + b.T) / 2)
+    eigval = np.maximum(eigval[::-1][:rank], 0.0)
+    eigvec = eigvec[:, ::-1][:, :rank]
+    return np.asarray((q @ eigvec) * np.sqrt(eigval), dtype=np.float64)
+
+
+@dataclass
+class NoiseFitProgress:
+    r"""
+    Dataclass for the intermediate state of :func:`noisefit`.
+
+    An instance of this class is passed to the ``callback`` function of
+    :func:`noisefit` after each iteration.
+
+    Parameters
+    ----------
+    nit : int
+        Number of iterations completed.
+    noise_model : NoiseModel
+        Current noise parameters, represented as a :class:`NoiseModel`
+        object.
+    mu : ndarray, shape (n,)
+        Current signal vector.
+    a : ndarray, shape (m,)
+        Current signal amplitude drift vector.
+    eta : ndarray, shape (m,)
+        Current signal delay drift vector.
+    fval : float
+        Current value of NLL cost function.
+    grad_norm : float
+        Maximum absolute value of the gradient of the NLL cost function with
+        respect to the internally scaled parameters, which is compared with
+        the gradient tolerance to test for convergence.
+    elapsed : float
+        Time since the start of the minimization, in seconds.
+
+    Attributes
+    ----------
+    nit : int
+        Number of iterations completed.
+    noise_model : NoiseModel
+        Current noise parameters, represented as a :class:`NoiseModel`
+        object.
+    mu : ndarray, shape (n,)
+        Current signal vector.
+    a : ndarray, shape (m,)
+        Current signal amplitude drift vector.
+    eta : ndarray, shape (m,)
+        Current signal delay drift vector.
+    fval : float
+        Current value of NLL cost function.
+    grad_norm : float
+        Maximum absolute value of the gradient of the NLL cost function with
+        respect to the internally scaled parameters, which is compared with
+        the gradient tolerance to test for convergence.
+    elapsed : float
+        Time since the start of the minimization, in seconds.
+
+    See Also
+    --------
+    noisefit : Estimate noise model parameters.
+    """
+
+    nit: int
+    noise_model: NoiseModel
+    mu: NDArray[np.float64]
+    a: NDArray[np.float64]
+    eta: NDArray[np.float64]
+    fval: float
+    grad_norm: float
+    elapsed: float
+
+
+class _NoiseFitStop(Exception):
+    """Raised by the noisefit callback to stop the minimization"""
 
 
 # noinspection PyShadowingNames
@@ -810,12 +1355,12 @@ def apply_frf(
 
     dt = _assign_sampling_time(dt)
     n = x.size
-    w_scaled = 2 * pi * rfftfreq(n)
+    w_scaled = 2 * pi * _rfftfreq(n)
     h = frfun(w_scaled / dt, *args)
     if numpy_sign_convention:
-        y = np.fft.irfft(np.fft.rfft(x) * h, n=n)
+        y = _irfft(_rfft(x) * h, n=n)
     else:
-        y = np.fft.irfft(np.fft.rfft(x) * np.conj(h), n=n)
+        y = _irfft(_rfft(x) * np.conj(h), n=n)
 
     return y
 
@@ -981,14 +1526,14 @@ def wave(
 
     taul = fwhm / np.sqrt(2 * np.log(2))
 
-    f_scaled = rfftfreq(n)
+    f_scaled = _rfftfreq(n)
 
     w = 2 * pi * f_scaled / dt
     ell = np.exp(-((w * taul) ** 2) / 2) / np.sqrt(2 * pi * taul**2)
     r = 1 / (1 / taur - 1j * w) - 1 / (1 / taur + 1 / tauc - 1j * w)
     s = -1j * w * (ell * r) ** 2 * np.exp(1j * w * t0)
 
-    x_unscaled = irfft(np.conj(s), n=n)
+    x_unscaled = _irfft(np.conj(s), n=n)
 
     return a * x_unscaled / np.max(x_unscaled)
 
@@ -1039,13 +1584,13 @@ def fft(
 
     if window is None:
         windx = signal.windows.tukey(len(x)) * x
-        x_fft = np.fft.rfft(windx, n)
+        x_fft = _rfft(windx, n)
     elif window not in windowlist:
         msg = f"Window parameter only accepts functions in {windowlist}"
         raise ValueError(msg)
     else:
         windx = x * signal.windows.get_window(window, len(x))
-        x_fft = np.fft.rfft(windx, n)
+        x_fft = _rfft(windx, n)
 
     return x_fft
 
@@ -1153,13 +1698,13 @@ def scaleshift(
             )
             raise ValueError(msg)
 
-    f_scaled = rfftfreq(n)
+    f_scaled = _rfftfreq(n)
     w = 2 * pi * f_scaled / dt
     phase = np.expand_dims(eta, axis=eta.ndim) * w
 
-    x_adjusted = np.fft.irfft(
-        np.fft.rfft(x) * np.exp(-1j * phase), n=n
-    ) * np.expand_dims(a, axis=a.ndim)
+    x_adjusted = _irfft(_rfft(x) * np.exp(-1j * phase), n=n) * np.expand_dims(
+        a, axis=a.ndim
+    )
 
     if x.ndim > 1 and axis != -1:
         x_adjusted = np.moveaxis(x_adjusted, -1, axis)
@@ -1175,8 +1720,11 @@ class CommonNLL:
     The functions `_nll_noisefit`, `_jac_noisefit`, and `_hess_noisefit`
     involve computations with a common set of array variables for a given
     input. The `_nll_common` function encapsulates this computation and
-    uses the `CommonNLL` dataclass to organize the output. A future release may
-    implement caching to improve speed.
+    uses the `CommonNLL` dataclass to organize the output, which may be passed
+    to each of these functions through their ``common`` argument. The
+    objective and derivative functions constructed by `_parse_noisefit_input`
+    cache the `CommonNLL` instance for the most recent input, so that it is
+    computed only once when these functions are evaluated at the same point.
 
     Attributes
     ----------
@@ -1222,6 +1770,7 @@ def _nll_common(
     scale_delta_mu: NDArray[np.float64],
     scale_delta_a: NDArray[np.float64],
     scale_eta_on_dt: NDArray[np.float64],
+    exp_iweta: NDArray[np.complex128] | None = None,
 ) -> CommonNLL:
     _, n = x.shape
 
@@ -1234,15 +1783,16 @@ def _nll_common(
     eta_on_dt = np.insert(eta_on_dt_scaled * scale_eta_on_dt, 0, 0.0)
 
     # Compute frequency vector and Fourier coefficients of mu
-    f = rfftfreq(n)
+    f = _rfftfreq(n)
     w = 2 * pi * f
-    mu_f = rfft(mu)
+    mu_f = _rfft(mu)
 
-    exp_iweta = np.exp(1j * np.outer(eta_on_dt, w))
+    if exp_iweta is None:
+        exp_iweta = _delay_phase(eta_on_dt, n)
     zeta_f = ((np.conj(exp_iweta) * mu_f).T * a).T
 
-    zeta = irfft(zeta_f, n=n)
-    dzeta = irfft(1j * w * zeta_f, n=n)
+    zeta = _irfft(zeta_f, n=n)
+    dzeta = _irfft(1j * w * zeta_f, n=n)
 
     res = x - zeta
     ressq = res**2
@@ -1259,6 +1809,183 @@ def _nll_common(
     )
 
 
+@lru_cache(maxsize=1)
+def _numexpr() -> Any:
+    """Return the numexpr module, or ``None`` if it is not installed"""
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
+
+
+def _sum_prod(*arrays: NDArray[np.float64], rows: bool = False) -> Any:
+    """Sum the product of equal-shape (m, n) arrays in a single pass"""
+    subscripts = ",".join(["ij"] * len(arrays)) + ("->i" if rows else "->")
+    return np.einsum(subscripts, *arrays)
+
+
+@dataclass
+class ElementwiseNLL:
+    r"""
+    Dataclass for element-wise terms shared by the NLL derivatives.
+
+    The expressions in `_jac_noisefit` and `_hess_noisefit` are built from
+    a small set of (m, n) arrays, such as the squared waveforms and the
+    derivatives of the NLL with respect to the total variance. The
+    `_nll_elementwise` function computes each of these once, in a single
+    pass over the data, and uses the `ElementwiseNLL` dataclass to
+    organize the output.
+
+    Attributes
+    ----------
+    common: CommonNLL
+        Intermediate variables from which the terms are computed.
+    res: ndarray with shape (m, n)
+        Residuals, equal to x - zeta.
+    res_w: ndarray with shape (m, n)
+        Residuals weighted by the inverse variance, equal to res / vtot.
+    res_w2: ndarray with shape (m, n)
+        Residuals weighted by the inverse variance squared, equal to
+        res / vtot**2.
+    zeta2, dzeta2: ndarray with shape (m, n)
+        Squares of zeta and dzeta.
+    vsig: ndarray with shape (m, n)
+        Signal-dependent part of the variance, equal to
+        vbeta * zeta**2 + vtau * dzeta**2.
+    dvar: ndarray with shape (m, n)
+        Element-wise derivative of the NLL with respect to vtot, times 2,
+        equal to (vtot - ressq) / vtot**2.
+    ddvar: ndarray with shape (m, n)
+        Element-wise second derivative of the NLL with respect to vtot,
+        times 2, equal to (2 * ressq - vtot) / vtot**3. It is computed on first
+        access, since only the Hessian needs it.
+    """
+
+    common: CommonNLL
+    res: NDArray[np.float64]
+    res_w: NDArray[np.float64]
+    res_w2: NDArray[np.float64]
+    zeta2: NDArray[np.float64]
+    dzeta2: NDArray[np.float64]
+    vsig: NDArray[np.float64]
+    dvar: NDArray[np.float64]
+    use_numexpr: bool = False
+
+    @cached_property
+    def ddvar(self) -> NDArray[np.float64]:
+        ressq = self.common.ressq
+        vtot = self.common.vtot
+        if self.use_numexpr:
+            return np.asarray(
+                _numexpr().evaluate(
+                    "(2 * ressq - vtot) / vtot**3",
+                    local_dict={"ressq": ressq, "vtot": vtot},
+                ),
+                dtype=np.float64,
+            )
+        ddvar = 2 * ressq
+        ddvar -= vtot
+        ddvar /= vtot
+        ddvar /= vtot
+        ddvar /= vtot
+        return ddvar
+
+
+def _nll_elementwise(
+    x: NDArray[np.float64],
+    common: CommonNLL,
+    vbeta: float,
+    vtau: float,
+    *,
+    use_numexpr: bool | None = None,
+) -> ElementwiseNLL:
+    """
+    Compute the element-wise terms shared by the NLL derivatives.
+
+    Each term is evaluated once, without the chains of (m, n) temporaries
+    produced by the equivalent NumPy expressions. With `numexpr
+    <https://github.com/pydata/numexpr>`_, each term is evaluated in one
+    fused, multithreaded pass; otherwise the terms are accumulated in place
+    with NumPy.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data matrix with shape (m, n), row-oriented.
+    common : CommonNLL
+        Intermediate variables computed by `_nll_common` for the same input.
+    vbeta, vtau : float
+        Multiplicative and time-base noise variance parameters.
+    use_numexpr : bool, optional
+        Whether to evaluate the terms with numexpr. If ``None`` (default),
+        the global ``use_numexpr`` option is used.
+
+    Returns
+    -------
+    elementwise : ElementwiseNLL
+        Element-wise terms for the input.
+    """
+    ne = _numexpr()
+    if use_numexpr is None:
+        use_numexpr = bool(get_option("use_numexpr"))
+    if use_numexpr and ne is None:
+        msg = "Fused element-wise kernels require the numexpr package"
+        raise ImportError(msg)
+
+    zeta = common.zeta
+    dzeta = common.dzeta
+    vtot = common.vtot
+    if use_numexpr:
+        local_dict = {
+            "x": x,
+            "zeta": zeta,
+            "dzeta": dzeta,
+            "vtot": vtot,
+            "ressq": common.ressq,
+            "vbeta": vbeta,
+            "vtau": vtau,
+        }
+
+        def evaluate(ex: str) -> NDArray[np.float64]:
+            return np.asarray(
+                ne.evaluate(ex, local_dict=local_dict), dtype=np.float64
+            )
+
+        return ElementwiseNLL(
+            common=common,
+            res=evaluate("x - zeta"),
+            res_w=evaluate("(x - zeta) / vtot"),
+            res_w2=evaluate("(x - zeta) / vtot**2"),
+            zeta2=evaluate("zeta**2"),
+            dzeta2=evaluate("dzeta**2"),
+            vsig=evaluate("vbeta * zeta**2 + vtau * dzeta**2"),
+            dvar=evaluate("(vtot - ressq) / vtot**2"),
+            use_numexpr=True,
+        )
+
+    res = x - zeta
+    res_w = res / vtot
+    res_w2 = res_w / vtot
+    zeta2 = np.square(zeta)
+    dzeta2 = np.square(dzeta)
+    vsig = vbeta * zeta2
+    vsig += vtau * dzeta2
+    dvar = vtot - common.ressq
+    dvar /= vtot
+    dvar /= vtot
+    return ElementwiseNLL(
+        common=common,
+        res=res,
+        res_w=res_w,
+        res_w2=res_w2,
+        zeta2=zeta2,
+        dzeta2=dzeta2,
+        vsig=vsig,
+        dvar=dvar,
+    )
+
+
 def _nll_noisefit(
     x: NDArray[np.float64],
     logv_alpha_scaled: float,
@@ -1274,6 +2001,7 @@ def _nll_noisefit(
     scale_delta_mu: NDArray[np.float64],
     scale_delta_a: NDArray[np.float64],
     scale_eta_on_dt: NDArray[np.float64],
+    common: CommonNLL | None = None,
 ) -> np.float64:
     r"""
     Compute the cost function for the time-domain noise model.
@@ -1309,6 +2037,9 @@ def _nll_noisefit(
         ``scale_sigma_tau_on_dt = scale_sigma_tau / dt``, where ``dt`` is the
         sampling time and ``scale_eta`` is the scale factor used in
         ``eta_scaled = eta / scale_eta``.
+    common : CommonNLL, optional
+        Intermediate variables computed by `_nll_common` for the same input.
+        If ``None`` (default), they are computed from the input.
 
     Returns
     -------
@@ -1316,21 +2047,22 @@ def _nll_noisefit(
         Negative log-likelihood, with constant offset :math:`(MN/2)\ln(2\pi)`
         subtracted.
     """
-    common = _nll_common(
-        x=x,
-        logv_alpha_scaled=logv_alpha_scaled,
-        logv_beta_scaled=logv_beta_scaled,
-        logv_tau_scaled=logv_tau_scaled,
-        delta_mu_scaled=delta_mu_scaled,
-        delta_a_scaled=delta_a_scaled,
-        eta_on_dt_scaled=eta_on_dt_scaled,
-        scale_logv_alpha=scale_logv_alpha,
-        scale_logv_beta=scale_logv_beta,
-        scale_logv_tau=scale_logv_tau,
-        scale_delta_mu=scale_delta_mu,
-        scale_delta_a=scale_delta_a,
-        scale_eta_on_dt=scale_eta_on_dt,
-    )
+    if common is None:
+        common = _nll_common(
+            x=x,
+            logv_alpha_scaled=logv_alpha_scaled,
+            logv_beta_scaled=logv_beta_scaled,
+            logv_tau_scaled=logv_tau_scaled,
+            delta_mu_scaled=delta_mu_scaled,
+            delta_a_scaled=delta_a_scaled,
+            eta_on_dt_scaled=eta_on_dt_scaled,
+            scale_logv_alpha=scale_logv_alpha,
+            scale_logv_beta=scale_logv_beta,
+            scale_logv_tau=scale_logv_tau,
+            scale_delta_mu=scale_delta_mu,
+            scale_delta_a=scale_delta_a,
+            scale_eta_on_dt=scale_eta_on_dt,
+        )
     ressq = common.ressq
     vtot = common.vtot
     resnormsq_scaled = ressq / vtot
@@ -1359,6 +2091,7 @@ def _jac_noisefit(
     scale_delta_mu: NDArray[np.float64],
     scale_delta_a: NDArray[np.float64],
     scale_eta_on_dt: NDArray[np.float64],
+    common: CommonNLL | None = None,
 ) -> NDArray[np.float64]:
     r"""
     Compute the Jacobian of ``_nll_noisefit`` w.r.t. the free parameters.
@@ -1398,6 +2131,9 @@ def _jac_noisefit(
         ``scale_sigma_tau_on_dt = scale_sigma_tau / dt``, where ``dt`` is the
         sampling time and ``scale_eta`` is the scale factor used in
         ``eta_scaled = eta / scale_eta``.
+    common : CommonNLL, optional
+        Intermediate variables computed by `_nll_common` for the same input.
+        If ``None`` (default), they are computed from the input.
 
     Returns
     -------
@@ -1411,36 +2147,35 @@ def _jac_noisefit(
     vbeta = np.exp(logv_beta_scaled * scale_logv_beta)
     vtau = np.exp(logv_tau_scaled * scale_logv_tau)
 
-    f = rfftfreq(n)
+    f = _rfftfreq(n)
     w = 2 * pi * f
 
-    common = _nll_common(
-        x=x,
-        logv_alpha_scaled=logv_alpha_scaled,
-        logv_beta_scaled=logv_beta_scaled,
-        logv_tau_scaled=logv_tau_scaled,
-        delta_mu_scaled=delta_mu_scaled,
-        delta_a_scaled=delta_a_scaled,
-        eta_on_dt_scaled=eta_on_dt_scaled,
-        scale_logv_alpha=scale_logv_alpha,
-        scale_logv_beta=scale_logv_beta,
-        scale_logv_tau=scale_logv_tau,
-        scale_delta_mu=scale_delta_mu,
-        scale_delta_a=scale_delta_a,
-        scale_eta_on_dt=scale_eta_on_dt,
-    )
-    ressq = common.ressq
-    vtot = common.vtot
+    if common is None:
+        common = _nll_common(
+            x=x,
+            logv_alpha_scaled=logv_alpha_scaled,
+            logv_beta_scaled=logv_beta_scaled,
+            logv_tau_scaled=logv_tau_scaled,
+            delta_mu_scaled=delta_mu_scaled,
+            delta_a_scaled=delta_a_scaled,
+            eta_on_dt_scaled=eta_on_dt_scaled,
+            scale_logv_alpha=scale_logv_alpha,
+            scale_logv_beta=scale_logv_beta,
+            scale_logv_tau=scale_logv_tau,
+            scale_delta_mu=scale_delta_mu,
+            scale_delta_a=scale_delta_a,
+            scale_eta_on_dt=scale_eta_on_dt,
+        )
     zeta = common.zeta
     dzeta = common.dzeta
     zeta_f = common.zeta_f
     a = common.a
     exp_iweta = common.exp_iweta
 
-    # Compute residuals and their squares for subsequent computations
-    res = x - zeta
-    reswt = res / vtot
-    dvar = (vtot - ressq) / vtot**2
+    # Compute the shared element-wise terms once for all subarrays
+    elementwise = _nll_elementwise(x, common, vbeta, vtau)
+    reswt = elementwise.res_w
+    dvar = elementwise.dvar
 
     # Construct Jacobian subarrays
     if fix_logv_alpha:
@@ -1452,42 +2187,47 @@ def _jac_noisefit(
         jac_logv_beta = []
     else:
         jac_logv_beta = [
-            0.5 * np.sum(zeta**2 * dvar) * vbeta * scale_logv_beta
+            0.5 * _sum_prod(elementwise.zeta2, dvar) * vbeta * scale_logv_beta
         ]
 
     if fix_logv_tau:
         jac_logv_tau = []
     else:
-        jac_logv_tau = [0.5 * np.sum(dzeta**2 * dvar) * vbeta * scale_logv_tau]
+        jac_logv_tau = [
+            0.5 * _sum_prod(elementwise.dzeta2, dvar) * vtau * scale_logv_tau
+        ]
 
     if fix_delta_mu:
         jac_delta_mu = []
     else:
-        p = rfft(vbeta * dvar * zeta - reswt) - 1j * vtau * w * rfft(
-            dvar * dzeta
-        )
+        g_zeta = dvar * zeta
+        g_zeta *= vbeta
+        g_zeta -= reswt
+        p = _rfft(g_zeta) - 1j * vtau * w * _rfft(dvar * dzeta)
         jac_delta_mu = (
-            -np.sum((irfft(exp_iweta * p, n=n).T * a).T, axis=0)
+            -np.sum((_irfft(exp_iweta * p, n=n).T * a).T, axis=0)
             * scale_delta_mu
         )
 
     if fix_delta_a:
         jac_delta_a = []
     else:
-        term = (vtot - valpha) * dvar - reswt * zeta
-        dnllda = np.sum(term, axis=1) / a
+        dnllda = (
+            _sum_prod(elementwise.vsig, dvar, rows=True)
+            - _sum_prod(reswt, zeta, rows=True)
+        ) / a
         # Exclude first term, which is held fixed
         jac_delta_a = dnllda[1:] * scale_delta_a
 
     if fix_eta:
         jac_eta = []
     else:
-        ddzeta = irfft(-(w**2) * zeta_f, n=n)
-        dnlldeta = -np.sum(
-            dvar * (zeta * dzeta * valpha + dzeta * ddzeta * vtau)
-            - reswt * dzeta,
-            axis=1,
-        )
+        ddzeta = _irfft(-(w**2) * zeta_f, n=n)
+        g_eta = vbeta * zeta
+        g_eta += vtau * ddzeta
+        g_eta *= dvar
+        g_eta -= reswt
+        dnlldeta = -_sum_prod(g_eta, dzeta, rows=True)
         # Exclude first term, which is held fixed
         jac_eta = dnlldeta[1:] * scale_eta_on_dt
 
@@ -1525,6 +2265,7 @@ def _hess_noisefit(
     scale_delta_mu: NDArray[np.float64],
     scale_delta_a: NDArray[np.float64],
     scale_eta_on_dt: NDArray[np.float64],
+    common: CommonNLL | None = None,
 ) -> NDArray[np.float64]:
     r"""
     Compute the Hessian of ``_nll_noisefit`` w.r.t. the free parameters.
@@ -1564,76 +2305,190 @@ def _hess_noisefit(
         ``scale_sigma_tau_on_dt = scale_sigma_tau / dt``, where ``dt`` is the
         sampling time and ``scale_eta`` is the scale factor used in
         ``eta_scaled = eta / scale_eta``.
+    common : CommonNLL, optional
+        Intermediate variables computed by `_nll_common` for the same input.
+        If ``None`` (default), they are computed from the input.
 
     Returns
     -------
-    gradnll_scaled : ndarray
-        Gradient of the negative log-likelihood function with respect to
-        the free parameters.
+    hess_scaled : ndarray
+        Hessian of the negative log-likelihood function with respect to the
+        free parameters, as a dense matrix assembled from the blocks
+        computed by `_hess_noisefit_blocks`.
     """
-    m, n = x.shape
-
-    valpha = np.exp(logv_alpha_scaled * scale_logv_alpha)
-    vbeta = np.exp(logv_beta_scaled * scale_logv_beta)
-    vtau = np.exp(logv_tau_scaled * scale_logv_tau)
-
-    f = rfftfreq(n)
-    w = 2 * pi * f
-
-    common = _nll_common(
-        x=x,
-        logv_alpha_scaled=logv_alpha_scaled,
-        logv_beta_scaled=logv_beta_scaled,
-        logv_tau_scaled=logv_tau_scaled,
-        delta_mu_scaled=delta_mu_scaled,
-        delta_a_scaled=delta_a_scaled,
-        eta_on_dt_scaled=eta_on_dt_scaled,
+    return _hess_noisefit_blocks(
+        x,
+        logv_alpha_scaled,
+        logv_beta_scaled,
+        logv_tau_scaled,
+        delta_mu_scaled,
+        delta_a_scaled,
+        eta_on_dt_scaled,
+        fix_logv_alpha=fix_logv_alpha,
+        fix_logv_beta=fix_logv_beta,
+        fix_logv_tau=fix_logv_tau,
+        fix_delta_mu=fix_delta_mu,
+        fix_delta_a=fix_delta_a,
+        fix_eta=fix_eta,
         scale_logv_alpha=scale_logv_alpha,
         scale_logv_beta=scale_logv_beta,
         scale_logv_tau=scale_logv_tau,
         scale_delta_mu=scale_delta_mu,
         scale_delta_a=scale_delta_a,
         scale_eta_on_dt=scale_eta_on_dt,
-    )
-    # Compute residuals and their squares for subsequent computations
-    ressq = common.ressq
-    vtot = common.vtot
-    zeta = common.zeta
-    dzeta = common.dzeta
-    zeta_f = common.zeta_f
-    a = common.a
-    exp_iweta = common.exp_iweta
+        common=common,
+    ).todense()
 
-    ddzeta = irfft(-(w**2) * zeta_f, n=n)
-    dddzeta = irfft(-1j * (w**3) * zeta_f, n=n)
 
-    res = x - zeta
-    dvar = (vtot - ressq) / vtot**2
-    ddvar = (2 * ressq - vtot) / vtot**3
+def _hess_noisefit_blocks(
+    x: NDArray[np.float64],
+    logv_alpha_scaled: float,
+    logv_beta_scaled: float,
+    logv_tau_scaled: float,
+    delta_mu_scaled: NDArray[np.float64],
+    delta_a_scaled: NDArray[np.float64],
+    eta_on_dt_scaled: NDArray[np.float64],
+    *,
+    fix_logv_alpha: bool,
+    fix_logv_beta: bool,
+    fix_logv_tau: bool,
+    fix_delta_mu: bool,
+    fix_delta_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta_on_dt: NDArray[np.float64],
+    common: CommonNLL | None = None,
+) -> _BlockArrow:
+    r"""
+    Compute the Hessian of ``_nll_noisefit`` w.r.t. the free parameters.
 
-    dzeta_dmu = irfft(
-        a[:, np.newaxis, np.newaxis]
-        * np.conj(exp_iweta)[:, np.newaxis, :]
-        * rfft(np.eye(n))[np.newaxis, :, :],
-        n=n,
-    )
+    Parameters
+    ----------
+    x : ndarray
+        Data matrix with shape (m, n), row-oriented.
+    logv_alpha_scaled, logv_beta_scaled, logv_tau_scaled : float
+        Logarithm of the associated scaled noise variance parameter.
+    delta_mu_scaled : ndarray
+        Scaled signal deviation vector with shape (n,).
+    delta_a_scaled: ndarray
+        Scaled amplitude deviation vector with shape (m - 1,).
+    eta_on_dt_scaled : ndarray
+        Scaled delay deviation vector with shape (m - 1,).
+    fix_logv_alpha, fix_logv_beta, fix_logv_tau : bool
+        Exclude noise parameter from gradiate calculation when ``True``.
+    fix_delta_mu : bool
+        Exclude signal deviation vector from gradiate calculation when
+        ``True``.
+    fix_delta_a : bool
+        Exclude signal amplitude deviation vector from gradiate calculation
+        when ``True``.
+    fix_eta : bool
+        Exclude signal delay deviation vector from gradiate calculation when
+        ``True``.
+    scale_logv_alpha, scale_logv_beta,  scale_logv_tau: float
+        Scale parameters for log variance parameters.
+    scale_delta_mu : ndarray
+        Array of scale parameters for ``delta`` with shape (n,).
+    scale_delta_a : ndarray
+        Array of scale parameters for ``alpha`` with shape (m - 1,).
+    scale_eta_on_dt : ndarray
+        Array of scale parameters for ``eta`` with shape (m - 1,). Should be
+        expressed in terms of the sampling time, i.e.,
+        ``scale_sigma_tau_on_dt = scale_sigma_tau / dt``, where ``dt`` is the
+        sampling time and ``scale_eta`` is the scale factor used in
+        ``eta_scaled = eta / scale_eta``.
+    common : CommonNLL, optional
+        Intermediate variables computed by `_nll_common` for the same input.
+        If ``None`` (default), they are computed from the input.
 
-    ddzeta_dmu = irfft(
-        a[:, np.newaxis, np.newaxis]
-        * 1j
-        * w
-        * np.conj(exp_iweta)[:, np.newaxis, :]
-        * rfft(np.eye(n))[np.newaxis, :, :],
-        n=n,
-    )
+    Returns
+    -------
+    hess_scaled : _BlockArrow
+        Hessian of the negative log-likelihood function with respect to the
+        free parameters, in the block-arrow form with the noise parameters
+        and the signal vector in the dense block, and the amplitude and
+        delay drift parameters in the diagonal blocks. The drift parameters
+        of different waveforms do not interact, so the Hessian is returned
+        without forming the dense matrix, which has
+        :math:`(N + 2M + 1)^2` entries.
+    """
+    m, n = x.shape
 
-    dddzeta_dmu = irfft(
-        a[:, np.newaxis, np.newaxis]
-        * -(w**2)
-        * np.conj(exp_iweta)[:, np.newaxis, :]
-        * rfft(np.eye(n))[np.newaxis, :, :],
-        n=n,
-    )
+    valpha = np.exp(logv_alpha_scaled * scale_logv_alpha)
+    vbeta = np.exp(logv_beta_scaled * scale_logv_beta)
+    vtau = np.exp(logv_tau_scaled * scale_logv_tau)
+
+    f = _rfftfreq(n)
+    w = 2 * pi * f
+
+    if common is None:
+        common = _nll_common(
+            x=x,
+            logv_alpha_scaled=logv_alpha_scaled,
+            logv_beta_scaled=logv_beta_scaled,
+            logv_tau_scaled=logv_tau_scaled,
+            delta_mu_scaled=delta_mu_scaled,
+            delta_a_scaled=delta_a_scaled,
+            eta_on_dt_scaled=eta_on_dt_scaled,
+            scale_logv_alpha=scale_logv_alpha,
+            scale_logv_beta=scale_logv_beta,
+            scale_logv_tau=scale_logv_tau,
+            scale_delta_mu=scale_delta_mu,
+            scale_delta_a=scale_delta_a,
+            scale_eta_on_dt=scale_eta_on_dt,
+        )
+    zeta = common.zeta
+    dzeta = common.dzeta
+    zeta_f = common.zeta_f
+    a = common.a
+    exp_iweta = common.exp_iweta
+
+    ddzeta = _irfft(-(w**2) * zeta_f, n=n)
+    dddzeta = _irfft(-1j * (w**3) * zeta_f, n=n)
+
+    # Compute the shared element-wise terms once for all blocks
+    elementwise = _nll_elementwise(x, common, vbeta, vtau)
+    res = elementwise.res
+    res_w2 = elementwise.res_w2
+    zeta2 = elementwise.zeta2
+    dzeta2 = elementwise.dzeta2
+    vsig = elementwise.vsig
+    dvar = elementwise.dvar
+    ddvar = elementwise.ddvar
+    inv_vtot = 1 / common.vtot
+
+    # Combinations that recur in the blocks for the amplitude and delay
+    # parameters, respectively
+    if not fix_delta_a:
+        g_a = ddvar * vsig
+        g_a += dvar
+        g_a += res_w2 * zeta
+    if not fix_eta:
+        cross = vbeta * zeta
+        cross += vtau * ddzeta
+        cross *= dzeta
+        g_eta = ddvar * cross
+        g_eta += res_w2 * dzeta
+
+    # Apply the transposes of the derivatives of zeta, dzeta, and ddzeta with
+    # respect to mu to the rows of u, du, and ddu, respectively. The
+    # derivatives are circulant operators for each waveform, so they can be
+    # applied with FFTs instead of forming (m, n, n) operator arrays.
+    def dzeta_dmu_t(
+        u: NDArray[np.float64],
+        du: NDArray[np.float64] | None = None,
+        ddu: NDArray[np.float64] | None = None,
+    ) -> NDArray[np.float64]:
+        u_f = _rfft(u)
+        if du is not None:
+            u_f = u_f - 1j * w * _rfft(du)
+        if ddu is not None:
+            u_f = u_f - w**2 * _rfft(ddu)
+        return _irfft(a[:, np.newaxis] * exp_iweta * u_f, n=n)
 
     # Hessian block for (logv, logv)
     if fix_logv_alpha:
@@ -1647,14 +2502,14 @@ def _hess_noisefit(
         h_va_vb = np.atleast_2d([])
     else:
         h_va_vb = np.atleast_2d(
-            [0.5 * valpha * vbeta * np.sum(ddvar * zeta**2)]
+            [0.5 * valpha * vbeta * _sum_prod(ddvar, zeta2)]
         )
 
     if fix_logv_alpha or fix_logv_tau:
         h_va_vt = np.atleast_2d([])
     else:
         h_va_vt = np.atleast_2d(
-            [0.5 * valpha * vtau * np.sum(ddvar * dzeta**2)]
+            [0.5 * valpha * vtau * _sum_prod(ddvar, dzeta2)]
         )
 
     if fix_logv_beta:
@@ -1662,8 +2517,8 @@ def _hess_noisefit(
     else:
         h_vb_vb = np.atleast_2d(
             [
-                0.5 * vbeta * np.sum(dvar * zeta**2)
-                + 0.5 * vbeta**2 * np.sum(ddvar * zeta**4)
+                0.5 * vbeta * _sum_prod(dvar, zeta2)
+                + 0.5 * vbeta**2 * _sum_prod(ddvar, zeta2, zeta2)
             ]
         )
 
@@ -1671,7 +2526,7 @@ def _hess_noisefit(
         h_vb_vt = np.atleast_2d([])
     else:
         h_vb_vt = np.atleast_2d(
-            [0.5 * vbeta * vtau * np.sum(ddvar * zeta**2 * dzeta**2)]
+            [0.5 * vbeta * vtau * _sum_prod(ddvar, zeta2, dzeta2)]
         )
 
     if fix_logv_tau:
@@ -1679,8 +2534,8 @@ def _hess_noisefit(
     else:
         h_vt_vt = np.atleast_2d(
             [
-                0.5 * vtau * np.sum(dvar * dzeta**2)
-                + 0.5 * vtau**2 * np.sum(ddvar * dzeta**4)
+                0.5 * vtau * _sum_prod(dvar, dzeta2)
+                + 0.5 * vtau**2 * _sum_prod(ddvar, dzeta2, dzeta2)
             ]
         )
 
@@ -1689,44 +2544,42 @@ def _hess_noisefit(
         h_va_mu = np.atleast_2d([])
     else:
         h_va_mu = np.atleast_2d(
-            np.einsum(
-                "jk, jpk",
-                ddvar * valpha * vbeta * zeta + res * valpha / vtot**2,
-                dzeta_dmu,
+            valpha
+            * np.sum(
+                dzeta_dmu_t(
+                    vbeta * ddvar * zeta + res_w2, vtau * ddvar * dzeta
+                ),
+                axis=0,
             )
-            + np.einsum("jk, jpk", ddvar * valpha * vtau * dzeta, ddzeta_dmu)
         )
 
     if fix_logv_beta or fix_delta_mu:
         h_vb_mu = np.atleast_2d([])
     else:
+        ddvar_zeta2 = ddvar * zeta2
         h_vb_mu = np.atleast_2d(
-            np.einsum(
-                "jk, jpk",
-                dvar * vbeta * zeta
-                + ddvar * vbeta**2 * zeta**3
-                + res * vbeta * zeta**2 / vtot**2,
-                dzeta_dmu,
-            )
-            + np.einsum(
-                "jk, jpk", ddvar * vbeta * vtau * zeta**2 * dzeta, ddzeta_dmu
+            vbeta
+            * np.sum(
+                dzeta_dmu_t(
+                    (dvar + vbeta * ddvar_zeta2) * zeta + res_w2 * zeta2,
+                    vtau * ddvar_zeta2 * dzeta,
+                ),
+                axis=0,
             )
         )
 
     if fix_logv_tau or fix_delta_mu:
         h_vt_mu = np.atleast_2d([])
     else:
+        ddvar_dzeta2 = ddvar * dzeta2
         h_vt_mu = np.atleast_2d(
-            np.einsum(
-                "jk, jpk",
-                ddvar * vbeta * vtau * zeta * dzeta**2
-                + res * vtau * dzeta**2 / vtot**2,
-                dzeta_dmu,
-            )
-            + np.einsum(
-                "jk, jpk",
-                dvar * vtau * dzeta + ddvar * vtau**2 * dzeta**3,
-                ddzeta_dmu,
+            vtau
+            * np.sum(
+                dzeta_dmu_t(
+                    (vbeta * ddvar_dzeta2) * zeta + res_w2 * dzeta2,
+                    (dvar + vtau * ddvar_dzeta2) * dzeta,
+                ),
+                axis=0,
             )
         )
 
@@ -1735,13 +2588,11 @@ def _hess_noisefit(
         h_va_a = np.atleast_2d([])
     else:
         h_va_a = np.atleast_2d(
-            np.sum(
-                (
-                    ddvar * valpha * (vbeta * zeta**2 + vtau * dzeta**2)
-                    + res * valpha * zeta / vtot**2
-                )[1:, :],
-                axis=1,
-            )
+            valpha
+            * (
+                _sum_prod(ddvar, vsig, rows=True)
+                + _sum_prod(res_w2, zeta, rows=True)
+            )[1:]
             / a[1:]
         )
 
@@ -1749,76 +2600,40 @@ def _hess_noisefit(
         h_vb_a = np.atleast_2d([])
     else:
         h_vb_a = np.atleast_2d(
-            np.sum(
-                (
-                    dvar * vbeta * zeta**2
-                    + ddvar
-                    * vbeta
-                    * zeta**2
-                    * (vbeta * zeta**2 + vtau * dzeta**2)
-                    + res * vbeta * zeta**3 / vtot**2
-                )[1:, :],
-                axis=1,
-            )
-            / a[1:]
+            vbeta * _sum_prod(zeta2, g_a, rows=True)[1:] / a[1:]
         )
 
     if fix_logv_tau or fix_delta_a:
         h_vt_a = np.atleast_2d([])
     else:
         h_vt_a = np.atleast_2d(
-            np.sum(
-                (
-                    dvar * vtau * dzeta**2
-                    + ddvar
-                    * vtau
-                    * dzeta**2
-                    * (vbeta * zeta**2 + vtau * dzeta**2)
-                    + res * vtau * zeta * dzeta**2 / vtot**2
-                )[1:, :],
-                axis=1,
-            )
-            / a[1:]
+            vtau * _sum_prod(dzeta2, g_a, rows=True)[1:] / a[1:]
         )
 
     # Hessian block for (log_v, eta)
     if fix_logv_alpha or fix_eta:
         h_va_eta = np.atleast_2d([])
     else:
-        h_va_eta = -np.atleast_2d(
-            np.sum(
-                ddvar * valpha * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                + res * valpha * dzeta / vtot**2,
-                axis=1,
-            )[1:]
-        )
+        h_va_eta = -np.atleast_2d(valpha * np.sum(g_eta, axis=1)[1:])
 
     if fix_logv_beta or fix_eta:
         h_vb_eta = np.atleast_2d([])
     else:
         h_vb_eta = -np.atleast_2d(
-            np.sum(
-                dvar * vbeta * zeta * dzeta
-                + ddvar
-                * vbeta
-                * zeta**2
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                + res * vbeta * zeta**2 * dzeta / vtot**2,
-                axis=1,
+            vbeta
+            * (
+                _sum_prod(dvar, zeta, dzeta, rows=True)
+                + _sum_prod(zeta2, g_eta, rows=True)
             )[1:]
         )
     if fix_logv_tau or fix_eta:
         h_vt_eta = np.atleast_2d([])
     else:
         h_vt_eta = -np.atleast_2d(
-            np.sum(
-                dvar * vtau * dzeta * ddzeta
-                + ddvar
-                * vtau
-                * dzeta**2
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                + res * vtau * dzeta**3 / vtot**2,
-                axis=1,
+            vtau
+            * (
+                _sum_prod(dvar, dzeta, ddzeta, rows=True)
+                + _sum_prod(dzeta2, g_eta, rows=True)
             )[1:]
         )
 
@@ -1827,519 +2642,4025 @@ def _hess_noisefit(
         h_mu_mu = np.atleast_2d([])
     else:
         a_array = (
-            1 / vtot
-            + 4 * vbeta * zeta * res / vtot**2
+            inv_vtot
+            + 4 * vbeta * zeta * res_w2
             + vbeta * dvar
-            + 2 * vbeta**2 * zeta**2 * ddvar
-        )
-
-        b_array = (
-            2 * vtau * dzeta * res / vtot**2
-            + 2 * vbeta * vtau * zeta * dzeta * ddvar
+            + 2 * vbeta**2 * zeta2 * ddvar
         )
 
-        c_array = vtau * dvar + 2 * vtau**2 * dzeta**2 * ddvar
-
-        h_mu_mu = np.atleast_2d(
-            np.einsum("jpk, jk, jqk", dzeta_dmu, a_array, dzeta_dmu)
-            + np.einsum("jpk, jk, jqk", dzeta_dmu, b_array, ddzeta_dmu)
-            + np.einsum("jpk, jk, jqk", ddzeta_dmu, b_array, dzeta_dmu)
-            + np.einsum("jpk, jk, jqk", ddzeta_dmu, c_array, ddzeta_dmu)
-        )
+        b_array = 2 * vtau * dzeta * (res_w2 + vbeta * zeta * ddvar)
+
+        c_array = vtau * dvar + 2 * vtau**2 * dzeta2 * ddvar
+
+        # Accumulate the contributions from one chunk of waveforms at a time,
+        # with about 2**20 elements in each (chunk, n, n) array, so the memory
+        # requirement is O(n**2) for any m
+        eye_f = _rfft(np.eye(n))
+        chunk = max(1, 2**20 // n**2)
+        h_mu_mu = np.zeros((n, n))
+        for j in range(0, m, chunk):
+            a_j = a[j : j + chunk, np.newaxis, np.newaxis]
+            exp_iweta_j = exp_iweta[j : j + chunk, np.newaxis, :]
+            dzeta_dmu_f = a_j * np.conj(exp_iweta_j) * eye_f
+            dzeta_dmu = _irfft(dzeta_dmu_f, n=n)
+            ddzeta_dmu = _irfft(1j * w * dzeta_dmu_f, n=n)
+            u = (
+                dzeta_dmu * a_array[j : j + chunk, np.newaxis, :]
+                + ddzeta_dmu * b_array[j : j + chunk, np.newaxis, :]
+            )
+            du = (
+                dzeta_dmu * b_array[j : j + chunk, np.newaxis, :]
+                + ddzeta_dmu * c_array[j : j + chunk, np.newaxis, :]
+            )
+            h_mu_mu += np.sum(
+                _irfft(
+                    a_j * exp_iweta_j * (_rfft(u) - 1j * w * _rfft(du)), n=n
+                ),
+                axis=0,
+            )
 
     # Hessian block for (delta_mu, delta_a)
     if fix_delta_mu or fix_delta_a:
         h_mu_a = np.atleast_2d([])
     else:
         a_array = (
-            2 * dvar * vbeta * zeta
-            + 2 * ddvar * vbeta * zeta * (vbeta * zeta**2 + vtau * dzeta**2)
-            + 2 * res * (vbeta * zeta**2 + vtau * dzeta**2) / vtot**2
-            + (zeta - res) / vtot
-            + 2 * res * vbeta * zeta**2 / vtot**2
-        )[1:, :]
+            2 * vbeta * zeta * g_a
+            + 2 * res_w2 * vsig
+            + (zeta - res) * inv_vtot
+        )
 
-        b_array = (
-            2
-            * vtau
-            * dzeta
-            * (
-                dvar
-                + ddvar * (vbeta * zeta**2 + vtau * dzeta**2)
-                + res * zeta / vtot**2
-            )
-        )[1:, :]
+        b_array = 2 * vtau * dzeta * g_a
 
-        h_mu_a = (
-            np.einsum("qj, qpj -> pq", a_array, dzeta_dmu[1:, :, :])
-            + np.einsum("qj, qpj -> pq", b_array, ddzeta_dmu[1:, :, :])
-        ) / a[np.newaxis, 1:]
+        h_mu_a = (dzeta_dmu_t(a_array, b_array)[1:, :] / a[1:, np.newaxis]).T
 
     # Hessian block for (delta_mu, eta)
     if fix_delta_mu or fix_eta:
         h_mu_eta = np.atleast_2d([])
     else:
         a_array = (
-            dvar * vbeta * dzeta
-            + 2
-            * ddvar
-            * vbeta
-            * zeta
-            * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-            + 2
-            * res
-            * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-            / vtot**2
-            + dzeta / vtot
-            + 2 * vbeta * res * zeta * dzeta / vtot**2
-        )[1:, :]
+            vbeta * dvar * dzeta
+            + 2 * vbeta * zeta * g_eta
+            + 2 * res_w2 * cross
+            + dzeta * inv_vtot
+        )
 
         b_array = (
             dvar * (vbeta * zeta + vtau * ddzeta)
-            + 2
-            * ddvar
-            * vtau
-            * dzeta
-            * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-            - res / vtot
-            + 2 * vtau * res * dzeta**2 / vtot**2
-        )[1:, :]
+            + 2 * vtau * dzeta * g_eta
+            - elementwise.res_w
+        )
 
-        c_array = (dvar * vtau * dzeta)[1:, :]
+        c_array = dvar * vtau * dzeta
 
-        h_mu_eta = -(
-            np.einsum("qj, qpj -> pq", a_array, dzeta_dmu[1:, :, :])
-            + np.einsum("qj, qpj -> pq", b_array, ddzeta_dmu[1:, :, :])
-            + np.einsum("qj, qpj -> pq", c_array, dddzeta_dmu[1:, :, :])
-        )
+        h_mu_eta = -dzeta_dmu_t(a_array, b_array, c_array)[1:, :].T
 
-    # Hessian block for (delta_a, delta_a)
+    # Diagonals of the Hessian blocks for (delta_a, delta_a)
     if fix_delta_a:
-        h_a_a = np.atleast_2d([])
+        h_a_a = np.array([])
     else:
-        h_a_a = np.diag(
-            np.sum(
-                2
-                * ddvar[1:, :]
-                * (vbeta * zeta[1:, :] ** 2 + vtau * dzeta[1:, :] ** 2) ** 2
-                + dvar[1:, :]
-                * (vbeta * zeta[1:, :] ** 2 + vtau * dzeta[1:, :] ** 2)
-                + 4
-                * res[1:, :]
-                * zeta[1:, :]
-                * (vbeta * zeta[1:, :] ** 2 + vtau * dzeta[1:, :] ** 2)
-                / vtot[1:, :] ** 2
-                + zeta[1:, :] ** 2 / vtot[1:, :],
-                axis=1,
-            )
-            / a[1:] ** 2
-        )
+        h_a_a = (
+            _sum_prod(vsig, 2 * g_a - dvar + 2 * res_w2 * zeta, rows=True)
+            + _sum_prod(zeta2, inv_vtot, rows=True)
+        )[1:] / a[1:] ** 2
 
-    # Hessian block for (delta_a, eta)
+    # Diagonals of the Hessian blocks for (delta_a, eta)
     if fix_delta_a or fix_eta:
-        h_a_eta = np.atleast_2d([])
+        h_a_eta = np.array([])
     else:
-        h_a_eta = -np.diag(
-            np.sum(
-                2 * dvar * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                + 2
-                * ddvar
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                * (vbeta * zeta**2 + vtau * dzeta**2)
-                + 2
-                * res
-                * zeta
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                / vtot**2
-                + (zeta - res) * dzeta / vtot
-                + 2
-                * res
-                * dzeta
-                * (vbeta * zeta**2 + vtau * dzeta**2)
-                / vtot**2,
-                axis=1,
+        h_a_eta = -(
+            (
+                2 * _sum_prod(cross, g_a, rows=True)
+                + _sum_prod(zeta - res, dzeta, inv_vtot, rows=True)
+                + 2 * _sum_prod(res_w2, dzeta, vsig, rows=True)
             )[1:]
             / a[1:]
         )
 
-    # Hessian block for (eta, eta)
+    # Diagonals of the Hessian blocks for (eta, eta)
     if fix_eta:
-        h_eta_eta = np.atleast_2d([])
+        h_eta_eta = np.array([])
     else:
-        h_eta_eta = np.diag(
-            np.sum(
-                dvar
-                * (
-                    vbeta * (dzeta**2 + zeta * ddzeta)
-                    + vtau * (ddzeta**2 + dzeta * dddzeta)
-                )
-                + 2
-                * ddvar
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta) ** 2
-                + 4
-                * res
-                * dzeta
-                * (vbeta * zeta * dzeta + vtau * dzeta * ddzeta)
-                / vtot**2
-                + (dzeta**2 - res * ddzeta) / vtot,
-                axis=1,
-            )[1:]
-        )
+        h_eta_eta = (
+            _sum_prod(
+                dvar,
+                vbeta * (dzeta2 + zeta * ddzeta)
+                + vtau * (ddzeta**2 + dzeta * dddzeta),
+                rows=True,
+            )
+            + 2 * _sum_prod(cross, g_eta + res_w2 * dzeta, rows=True)
+            + _sum_prod(dzeta2 - res * ddzeta, inv_vtot, rows=True)
+        )[1:]
 
-    # Boolean array used to compose full Hessian from multiple blocks
-    fix = np.array(
-        [
-            fix_logv_alpha,
-            fix_logv_beta,
-            fix_logv_tau,
-            fix_delta_mu,
-            fix_delta_a,
-            fix_eta,
-        ]
+    # Boolean arrays used to select the free blocks
+    fix_dense = np.array(
+        [fix_logv_alpha, fix_logv_beta, fix_logv_tau, fix_delta_mu]
     )
+    fix_diag = np.array([fix_delta_a, fix_eta])
 
-    # Arrange blocks in an object array to enable boolean indexing
+    # Arrange the rows of the dense and coupling blocks in an object array
+    # to enable boolean indexing
     hess_block = np.array(
         [
             [h_va_va, h_va_vb, h_va_vt, h_va_mu, h_va_a, h_va_eta],
             [h_va_vb, h_vb_vb, h_vb_vt, h_vb_mu, h_vb_a, h_vb_eta],
             [h_va_vt.T, h_vb_vt.T, h_vt_vt, h_vt_mu, h_vt_a, h_vt_eta],
             [h_va_mu.T, h_vb_mu.T, h_vt_mu.T, h_mu_mu, h_mu_a, h_mu_eta],
-            [h_va_a.T, h_vb_a.T, h_vt_a.T, h_mu_a.T, h_a_a, h_a_eta],
-            [
-                h_va_eta.T,
-                h_vb_eta.T,
-                h_vt_eta.T,
-                h_mu_eta.T,
-                h_a_eta.T,
-                h_eta_eta,
-            ],
-        ],
-        dtype=object,
-    )
-
-    # Create an index array to select blocks
-    idx = np.ix_(~fix, ~fix)
-
-    # Compose the full Jacobian from the selected blocks
-    h = np.block(hess_block[idx].tolist())
-
-    # Arrange scale arrays in an object array, then use the fix array to select
-    # which arrays to include
-    scale_block = np.array(
-        [
-            [scale_logv_alpha],
-            [scale_logv_beta],
-            [scale_logv_tau],
-            -scale_delta_mu,
-            scale_delta_a,
-            scale_eta_on_dt,
         ],
         dtype=object,
+    )[~fix_dense]
+    dense_block = hess_block[:, :4][:, ~fix_dense]
+    coupling_block = hess_block[:, 4:][:, ~fix_diag]
+    diag_block = np.array(
+        [[h_a_a, h_a_eta], [h_a_eta, h_eta_eta]], dtype=object
+    )[np.ix_(~fix_diag, ~fix_diag)]
+
+    # Scale the blocks to the internal variables
+    scale_dense = np.concatenate(
+        np.array(
+            [
+                [scale_logv_alpha],
+                [scale_logv_beta],
+                [scale_logv_tau],
+                -scale_delta_mu,
+            ],
+            dtype=object,
+        )[~fix_dense].tolist()
+        + [np.array([])]
     )
-    scale = np.concatenate(scale_block[~fix].tolist())
+    scale_diag = np.array([scale_delta_a, scale_eta_on_dt], dtype=np.float64)[
+        ~fix_diag
+    ]
+    p = scale_dense.size
+    k, q = scale_diag.shape if scale_diag.size else (0, m - 1)
+
+    dense = (
+        np.block(dense_block.tolist()) if p > 0 else np.empty((0, 0))
+    ) * np.outer(scale_dense, scale_dense)
+    coupling = (
+        np.block(coupling_block.tolist())
+        if p > 0 and k > 0
+        else np.empty((p, k * q))
+    ) * np.outer(scale_dense, scale_diag.ravel())
+    diag = np.empty((q, k, k))
+    for i in range(k):
+        for j in range(k):
+            diag[:, i, j] = diag_block[i, j] * scale_diag[i] * scale_diag[j]
 
     # Return Hessian in scaled internal variables
-    return np.astype(np.diag(scale) @ h @ np.diag(scale), np.float64)
+    return _BlockArrow(
+        np.astype(dense, np.float64), np.astype(coupling, np.float64), diag
+    )
 
 
-def noisefit(
-    x: ArrayLike,
+def _hessp_noisefit(
+    x: NDArray[np.float64],
+    logv_alpha_scaled: float,
+    logv_beta_scaled: float,
+    logv_tau_scaled: float,
+    delta_mu_scaled: NDArray[np.float64],
+    delta_a_scaled: NDArray[np.float64],
+    eta_on_dt_scaled: NDArray[np.float64],
+    v: NDArray[np.float64],
     *,
-    dt: float | None = None,
-    sigma_alpha0: float | None = None,
-    sigma_beta0: float | None = None,
-    sigma_tau0: float | None = None,
-    mu0: ArrayLike | None = None,
-    a0: ArrayLike | None = None,
-    eta0: ArrayLike | None = None,
-    fix_sigma_alpha: bool = False,
-    fix_sigma_beta: bool = False,
-    fix_sigma_tau: bool = False,
-    fix_mu: bool = False,
-    fix_a: bool = False,
-    fix_eta: bool = False,
-    scale_logv_alpha: float | None = None,
-    scale_logv_beta: float | None = None,
-    scale_logv_tau: float | None = None,
-    scale_delta_mu: ArrayLike | None = None,
-    scale_delta_a: ArrayLike | None = None,
-    scale_eta: ArrayLike | None = None,
-    min_options: dict[str, Any] | None = None,
-) -> NoiseResult:
+    fix_logv_alpha: bool,
+    fix_logv_beta: bool,
+    fix_logv_tau: bool,
+    fix_delta_mu: bool,
+    fix_delta_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta_on_dt: NDArray[np.float64],
+    common: CommonNLL | None = None,
+) -> NDArray[np.float64]:
     r"""
-    Estimate noise model from a set of nominally identical waveforms.
+    Compute the product of the Hessian of ``_nll_noisefit`` with a vector.
 
-    The data array ``x`` should include `m` nominally identical waveform
-    measurements, where each waveform comprises `n` samples that are spaced
-    equally in time. The ``noise_model`` attribute of the return object
-    is an instance of the :class:`NoiseModel` class that represents the
-    estimated noise parameters. See `Notes` for details.
+    The result is equal to ``_hess_noisefit(...) @ v``, but it is computed
+    without forming the Hessian. Instead, the function evaluates the
+    directional derivative of the gradient along ``v`` with FFTs, which
+    requires :math:`O(mn\log n)` operations and :math:`O(mn)` memory.
 
     Parameters
     ----------
-    x : array_like with shape (n, m)
-        Data array composed of ``m`` waveforms, each of which is sampled at
-        ``n`` points.
-    dt : float or None, optional
-        Sampling time, normally in picoseconds. Default is None, which sets
-        the sampling time to ``thztools.options.sampling_time``. If both
-        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
-        sampling time is set to ``1.0``. In this case, the unit of time is the
-        sampling time for the noise model parameter ``sigma_tau``, the delay
-        parameter array ``eta``, and the initial guesses for both quantities.
-    sigma_alpha0, sigma_beta0, sigma_tau0 : float, optional
-        Initial values for noise parameters. When set to
-        ``None``, the default, use a linear least-squares fit of the noise
-        model to ``np.var(x, 1, ddof=1)``.
-    mu0 : array_like with shape(n,), optional
-        Initial guess, signal vector with shape (n,). Default is first column
-        of ``x``.
-    a0 : array_like with shape(m,), optional
-        Initial guess, signal amplitude drift vector with shape (m,). Default
-        is ``np.ones(m)``.
-    eta0 : array_like with shape(m,), optional
-        Initial guess, signal delay drift vector with shape (m,). Default is
-        ``np.zeros(m)``.
-    fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau : bool, optional
-        Fix the associated noise parameter. Default is False.
-    fix_mu : bool, optional
-        Fix signal vector. Default is False.
-    fix_a : bool, optional
-        Fix signal amplitude drift vector. Default is False.
-    fix_eta : bool, optional
-        Fix signal delay drift vector. Default is False.
-
-    Returns
-    -------
-    res : NoiseResult
-        Fit result represented as a ``NoiseResult`` object. Important
-        attributes are: ``noise_model``, an instance of :class:`NoiseModel`
-        with the estimated noise parameters; ``mu``, the estimated signal
-        vector; ``a``, the estimated signal amplitude drift vector; ``eta``,
-        the estimated signal delay drift vector; ``fval``, the value of the
-        optimized NLL cost function; and ``diagnostic``, an instance of
-        :class:`scipy.optimize.OptimizeResult` returned by
-        :func:`scipy.optimize.minimize`. Note that the fit parameters are
-        scaled internally to improve convergence (see `Other Parameters`
-        below), which affects the attributes ``fun``, ``jac``, and ``hess_inv``
-        of ``diagnostic``. See :class:`NoiseResult` for more details and for a
-        description of other attributes.
-
-    Other Parameters
-    ----------------
-    scale_logv_alpha, scale_logv_beta, scale_logv_tau : float, optional
-        Scale for varying the log of the variance parameters.
-    scale_delta_mu : array_like with shape(n,), optional
-        Scale for varying signal vector. When set to ``None``, the default,
-        use ``NoiseModel(sigma_alpha0, sigma_beta0,
-        sigma_tau0).noise_amp(mu0)``.
-    scale_delta_a : array_like with shape(n,), optional
-        Scale for varying signal amplitude drift vector. Default is
-        ``np.max((sigma_min, sigma_beta0))`` for all entries, where
+    x : ndarray
+        Data matrix with shape (m, n), row-oriented.
+    logv_alpha_scaled, logv_beta_scaled, logv_tau_scaled : float
+        Logarithm of the associated scaled noise variance parameter.
+    delta_mu_scaled : ndarray
+        Scaled signal deviation vector with shape (n,).
+    delta_a_scaled: ndarray
+        Scaled amplitude deviation vector with shape (m - 1,).
+    eta_on_dt_scaled : ndarray
+        Scaled delay deviation vector with shape (m - 1,).
+    v : ndarray
+        Vector to multiply, with the same size and ordering as the vector of
+        free parameters.
+    fix_logv_alpha, fix_logv_beta, fix_logv_tau : bool
+        Exclude noise parameter from Hessian calculation when ``True``.
+    fix_delta_mu : bool
+        Exclude signal deviation vector from Hessian calculation when
+        ``True``.
+    fix_delta_a : bool
+        Exclude signal amplitude deviation vector from Hessian calculation
+        when ``True``.
+    fix_eta : bool
+        Exclude signal delay deviation vector from Hessian calculation when
+        ``True``.
+    scale_logv_alpha, scale_logv_beta,  scale_logv_tau: float
+        Scale parameters for log variance parameters.
+    scale_delta_mu : ndarray
+        Array of scale parameters for ``delta`` with shape (n,).
+    scale_delta_a : ndarray
+        Array of scale parameters for ``alpha`` with shape (m - 1,).
+    scale_eta_on_dt : ndarray
+        Array of scale parameters for ``eta`` with shape (m - 1,). Should be
+        expressed in terms of the sampling time, i.e.,
+        ``scale_sigma_tau_on_dt = scale_sigma_tau / dt``, where ``dt`` is the
+        sampling time and ``scale_eta`` is the scale factor used in
+        ``eta_scaled = eta / scale_eta``.
+    common : CommonNLL, optional
+        Intermediate variables computed by `_nll_common` for the same input.
+        If ``None`` (default), they are computed from the input.
+
+    Returns
+    -------
+    hessp : ndarray
+        Product of the Hessian of the negative log-likelihood function with
+        respect to the free parameters and the vector ``v``.
+    """
+    m, n = x.shape
+
+    valpha = np.exp(logv_alpha_scaled * scale_logv_alpha)
+    vbeta = np.exp(logv_beta_scaled * scale_logv_beta)
+    vtau = np.exp(logv_tau_scaled * scale_logv_tau)
+
+    f = _rfftfreq(n)
+    w = 2 * pi * f
+
+    if common is None:
+        common = _nll_common(
+            x=x,
+            logv_alpha_scaled=logv_alpha_scaled,
+            logv_beta_scaled=logv_beta_scaled,
+            logv_tau_scaled=logv_tau_scaled,
+            delta_mu_scaled=delta_mu_scaled,
+            delta_a_scaled=delta_a_scaled,
+            eta_on_dt_scaled=eta_on_dt_scaled,
+            scale_logv_alpha=scale_logv_alpha,
+            scale_logv_beta=scale_logv_beta,
+            scale_logv_tau=scale_logv_tau,
+            scale_delta_mu=scale_delta_mu,
+            scale_delta_a=scale_delta_a,
+            scale_eta_on_dt=scale_eta_on_dt,
+        )
+    ressq = common.ressq
+    vtot = common.vtot
+    zeta = common.zeta
+    dzeta = common.dzeta
+    zeta_f = common.zeta_f
+    a = common.a
+    exp_iweta = common.exp_iweta
+
+    # Split v into components for each parameter, with zeros for the fixed
+    # parameters
+    v = np.asarray(v, dtype=np.float64)
+    v_logv_alpha = 0.0
+    v_logv_beta = 0.0
+    v_logv_tau = 0.0
+    v_delta_mu = np.zeros(n)
+    v_delta_a = np.zeros(m - 1)
+    v_eta = np.zeros(m - 1)
+    if not fix_logv_alpha:
+        v_logv_alpha = v[0]
+        v = v[1:]
+    if not fix_logv_beta:
+        v_logv_beta = v[0]
+        v = v[1:]
+    if not fix_logv_tau:
+        v_logv_tau = v[0]
+        v = v[1:]
+    if not fix_delta_mu:
+        v_delta_mu = v[:n]
+        v = v[n:]
+    if not fix_delta_a:
+        v_delta_a = v[: m - 1]
+        v = v[m - 1 :]
+    if not fix_eta:
+        v_eta = v[: m - 1]
+
+    # Perturbations in the unscaled parameters along v
+    dot_valpha = valpha * scale_logv_alpha * v_logv_alpha
+    dot_vbeta = vbeta * scale_logv_beta * v_logv_beta
+    dot_vtau = vtau * scale_logv_tau * v_logv_tau
+    dot_mu = -v_delta_mu * scale_delta_mu
+    dot_a = np.insert(v_delta_a * scale_delta_a, 0, 0.0)
+    dot_eta_on_dt = np.insert(v_eta * scale_eta_on_dt, 0, 0.0)
+
+    # Intermediate variables and their directional derivatives along v
+    res = x - zeta
+    ddzeta = _irfft(-(w**2) * zeta_f, n=n)
+    dvar = (vtot - ressq) / vtot**2
+    ddvar = (2 * ressq - vtot) / vtot**3
+
+    dot_zeta_f = (
+        (dot_a / a)[:, np.newaxis] * zeta_f
+        + a[:, np.newaxis] * np.conj(exp_iweta) * _rfft(dot_mu)
+        - 1j * w * dot_eta_on_dt[:, np.newaxis] * zeta_f
+    )
+    dot_zeta = _irfft(dot_zeta_f, n=n)
+    dot_dzeta = _irfft(1j * w * dot_zeta_f, n=n)
+    dot_ddzeta = _irfft(-(w**2) * dot_zeta_f, n=n)
+
+    dot_vtot = (
+        dot_valpha
+        + dot_vbeta * zeta**2
+        + dot_vtau * dzeta**2
+        + 2 * vbeta * zeta * dot_zeta
+        + 2 * vtau * dzeta * dot_dzeta
+    )
+    dot_dvar = dot_vtot * ddvar + 2 * res * dot_zeta / vtot**2
+
+    # Derivatives of the NLL with respect to zeta and dzeta
+    g_zeta = vbeta * zeta * dvar - res / vtot
+    g_dzeta = vtau * dzeta * dvar
+    dot_g_zeta = (
+        dot_vbeta * zeta * dvar
+        + vbeta * (dot_zeta * dvar + zeta * dot_dvar)
+        + dot_zeta / vtot
+        + res * dot_vtot / vtot**2
+    )
+    dot_g_dzeta = dot_vtau * dzeta * dvar + vtau * (
+        dot_dzeta * dvar + dzeta * dot_dvar
+    )
+
+    # Construct Hessian-vector product subarrays
+    if fix_logv_alpha:
+        hessp_logv_alpha = []
+    else:
+        hessp_logv_alpha = [
+            0.5
+            * (dot_valpha * np.sum(dvar) + valpha * np.sum(dot_dvar))
+            * scale_logv_alpha
+        ]
+
+    if fix_logv_beta:
+        hessp_logv_beta = []
+    else:
+        hessp_logv_beta = [
+            0.5
+            * (
+                dot_vbeta * np.sum(zeta**2 * dvar)
+                + vbeta
+                * np.sum(2 * zeta * dot_zeta * dvar + zeta**2 * dot_dvar)
+            )
+            * scale_logv_beta
+        ]
+
+    if fix_logv_tau:
+        hessp_logv_tau = []
+    else:
+        hessp_logv_tau = [
+            0.5
+            * (
+                dot_vtau * np.sum(dzeta**2 * dvar)
+                + vtau
+                * np.sum(2 * dzeta * dot_dzeta * dvar + dzeta**2 * dot_dvar)
+            )
+            * scale_logv_tau
+        ]
+
+    if fix_delta_mu:
+        hessp_delta_mu = []
+    else:
+        p = _rfft(g_zeta) - 1j * w * _rfft(g_dzeta)
+        dot_p = _rfft(dot_g_zeta) - 1j * w * _rfft(dot_g_dzeta)
+        hessp_delta_mu = (
+            -np.sum(
+                _irfft(
+                    exp_iweta
+                    * (
+                        dot_a[:, np.newaxis] * p
+                        + 1j * w * (a * dot_eta_on_dt)[:, np.newaxis] * p
+                        + a[:, np.newaxis] * dot_p
+                    ),
+                    n=n,
+                ),
+                axis=0,
+            )
+            * scale_delta_mu
+        )
+
+    if fix_delta_a:
+        hessp_delta_a = []
+    else:
+        term = zeta * g_zeta + dzeta * g_dzeta
+        dot_term = (
+            dot_zeta * g_zeta
+            + zeta * dot_g_zeta
+            + dot_dzeta * g_dzeta
+            + dzeta * dot_g_dzeta
+        )
+        dot_dnllda = (
+            np.sum(dot_term, axis=1) / a - dot_a * np.sum(term, axis=1) / a**2
+        )
+        # Exclude first term, which is held fixed
+        hessp_delta_a = dot_dnllda[1:] * scale_delta_a
+
+    if fix_eta:
+        hessp_eta = []
+    else:
+        dot_dnlldeta = -np.sum(
+            dot_g_zeta * dzeta
+            + g_zeta * dot_dzeta
+            + dot_g_dzeta * ddzeta
+            + g_dzeta * dot_ddzeta,
+            axis=1,
+        )
+        # Exclude first term, which is held fixed
+        hessp_eta = dot_dnlldeta[1:] * scale_eta_on_dt
+
+    # Concatenate subarrays to produce the full Hessian-vector product
+    return np.concatenate(
+        (
+            hessp_logv_alpha,
+            hessp_logv_beta,
+            hessp_logv_tau,
+            hessp_delta_mu,
+            hessp_delta_a,
+            hessp_eta,
+        )
+    )
+
+
+def _nll_jac_noisefit_unscaled(
+    x: NDArray[np.float64],
+    logv: NDArray[np.float64],
+    mu: NDArray[np.float64],
+    a: NDArray[np.float64],
+    eta_on_dt: NDArray[np.float64],
+) -> tuple[
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]:
+    r"""
+    Compute the noisefit cost function and its unscaled gradient.
+
+    Evaluates the cost function of `_nll_noisefit` and its gradient with
+    respect to the unscaled parameters for a stack of ``k`` data matrices,
+    with FFTs taken over the full stack. Every entry of ``a`` and
+    ``eta_on_dt`` is treated as a parameter, so the function may also be
+    applied to a subset of the waveforms in a data matrix.
+
+    Parameters
+    ----------
+    x : ndarray
+        Stack of data matrices with shape (k, m, n), row-oriented.
+    logv : ndarray
+        Logarithm of the noise variance parameters, with shape (k, 3), with
+        ``sigma_tau`` expressed in units of the sampling time.
+    mu : ndarray
+        Signal vectors with shape (k, n).
+    a : ndarray
+        Amplitude drift vectors with shape (k, m).
+    eta_on_dt : ndarray
+        Delay drift vectors with shape (k, m), in units of the sampling time.
+
+    Returns
+    -------
+    nll : ndarray
+        Negative log-likelihood for each data matrix, with shape (k,).
+    jac_logv, jac_mu, jac_a, jac_eta : ndarray
+        Gradient of the negative log-likelihood with respect to ``logv``,
+        ``mu``, ``a``, and ``eta_on_dt``, with the same shapes as these
+        inputs.
+    """
+    n = x.shape[-1]
+
+    v = np.exp(logv)
+    valpha = v[:, 0, np.newaxis, np.newaxis]
+    vbeta = v[:, 1, np.newaxis, np.newaxis]
+    vtau = v[:, 2, np.newaxis, np.newaxis]
+
+    # Compute frequency vector and Fourier coefficients of mu
+    f = _rfftfreq(n)
+    w = 2 * pi * f
+    mu_f = _rfft(mu)
+
+    exp_iweta = _delay_phase(eta_on_dt, n)
+    zeta_f = a[:, :, np.newaxis] * np.conj(exp_iweta) * mu_f[:, np.newaxis, :]
+
+    zeta = _irfft(zeta_f, n=n)
+    dzeta = _irfft(1j * w * zeta_f, n=n)
+    ddzeta = _irfft(-(w**2) * zeta_f, n=n)
+
+    res = x - zeta
+    ressq = res**2
+    vtot = valpha + vbeta * zeta**2 + vtau * dzeta**2
+
+    nll = 0.5 * (
+        np.sum(np.log(vtot), axis=(1, 2)) + np.sum(ressq / vtot, axis=(1, 2))
+    )
+
+    reswt = res / vtot
+    dvar = (vtot - ressq) / vtot**2
+
+    jac_logv = (
+        0.5
+        * np.stack(
+            (
+                np.sum(dvar, axis=(1, 2)),
+                np.sum(zeta**2 * dvar, axis=(1, 2)),
+                np.sum(dzeta**2 * dvar, axis=(1, 2)),
+            ),
+            axis=1,
+        )
+        * v
+    )
+
+    p = _rfft(vbeta * dvar * zeta - reswt) - 1j * w * _rfft(
+        vtau * dvar * dzeta
+    )
+    jac_mu = np.sum(_irfft(exp_iweta * p, n=n) * a[:, :, np.newaxis], axis=1)
+
+    term = (vtot - valpha) * dvar - reswt * zeta
+    jac_a = np.sum(term, axis=2) / a
+
+    jac_eta = -np.sum(
+        dvar * (zeta * dzeta * vbeta + dzeta * ddzeta * vtau) - reswt * dzeta,
+        axis=2,
+    )
+
+    return nll, jac_logv, jac_mu, jac_a, jac_eta
+
+
+def _nll_jac_noisefit_batch(
+    x: NDArray[np.float64],
+    logv_scaled: NDArray[np.float64],
+    delta_mu_scaled: NDArray[np.float64],
+    delta_a_scaled: NDArray[np.float64],
+    eta_on_dt_scaled: NDArray[np.float64],
+    *,
+    scale_logv: NDArray[np.float64],
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta_on_dt: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    r"""
+    Compute the noisefit cost function and its gradient for a stack of inputs.
+
+    Evaluates `_nll_noisefit` and `_jac_noisefit` for ``k`` independent
+    data matrices at once, with FFTs taken over the full stack.
+
+    Parameters
+    ----------
+    x : ndarray
+        Stack of data matrices with shape (k, m, n), row-oriented.
+    logv_scaled : ndarray
+        Logarithm of the scaled noise variance parameters, with shape (k, 3).
+    delta_mu_scaled : ndarray
+        Scaled signal deviation vectors with shape (k, n).
+    delta_a_scaled: ndarray
+        Scaled amplitude deviation vectors with shape (k, m - 1).
+    eta_on_dt_scaled : ndarray
+        Scaled delay deviation vectors with shape (k, m - 1).
+    scale_logv : ndarray
+        Scale parameters for the log variance parameters, with shape (k, 3).
+    scale_delta_mu : ndarray
+        Scale parameters for ``delta_mu`` with shape (k, n).
+    scale_delta_a : ndarray
+        Scale parameters for ``delta_a`` with shape (k, m - 1).
+    scale_eta_on_dt : ndarray
+        Scale parameters for ``eta`` with shape (k, m - 1), expressed in terms
+        of the sampling time.
+
+    Returns
+    -------
+    nll : ndarray
+        Negative log-likelihood for each data matrix, with shape (k,).
+    gradnll_scaled : ndarray
+        Gradient of the negative log-likelihood with respect to all scaled
+        parameters, with shape (k, 3 + n + 2 * (m - 1)) and the parameters
+        ordered as in `_jac_noisefit`.
+    """
+    k = x.shape[0]
+
+    mu = x[:, 0, :] - delta_mu_scaled * scale_delta_mu
+    a = 1.0 + np.concatenate(
+        (np.zeros((k, 1)), delta_a_scaled * scale_delta_a), axis=1
+    )
+    eta_on_dt = np.concatenate(
+        (np.zeros((k, 1)), eta_on_dt_scaled * scale_eta_on_dt), axis=1
+    )
+
+    nll, jac_logv, jac_mu, jac_a, jac_eta = _nll_jac_noisefit_unscaled(
+        x, logv_scaled * scale_logv, mu, a, eta_on_dt
+    )
+
+    # Exclude first terms of a and eta, which are held fixed
+    return nll, np.concatenate(
+        (
+            jac_logv * scale_logv,
+            -jac_mu * scale_delta_mu,
+            jac_a[:, 1:] * scale_delta_a,
+            jac_eta[:, 1:] * scale_eta_on_dt,
+        ),
+        axis=1,
+    )
+
+
+class _NoiseFitShards:
+    r"""
+    Worker processes that evaluate the noisefit cost function over shards.
+
+    Each worker process holds a contiguous block of waveforms from the data
+    matrix and, on request, returns the contribution of its waveforms to the
+    negative log-likelihood and its gradient. The contributions to the
+    gradient with respect to the noise parameters and ``mu`` are summed over
+    the workers, and those with respect to ``a`` and ``eta`` are
+    concatenated.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data matrix with shape (m, n), row-oriented.
+    workers : int
+        Number of worker processes, which is reduced to ``m`` if it is
+        larger.
+    """
+
+    def __init__(self, x: NDArray[np.float64], workers: int) -> None:
+        m, n = x.shape
+        self.n = n
+        self.m = m
+        self.slices = [
+            slice(int(idx[0]), int(idx[-1]) + 1)
+            for idx in np.array_split(np.arange(m), min(workers, m))
+        ]
+        ctx = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        with _set_environ({key: "1" for key in BLAS_THREAD_VARIABLES}):
+            for sl in self.slices:
+                conn, child_conn = ctx.Pipe()
+                process = ctx.Process(
+                    target=_noisefit_shard_worker,
+                    args=(child_conn, x[sl]),
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                self.connections.append(conn)
+                self.processes.append(process)
+
+    def evaluate(
+        self,
+        logv: NDArray[np.float64],
+        mu: NDArray[np.float64],
+        a: NDArray[np.float64],
+        eta_on_dt: NDArray[np.float64],
+    ) -> tuple[
+        float,
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+    ]:
+        """Evaluate the cost function and its unscaled gradient"""
+        for conn, sl in zip(self.connections, self.slices):
+            conn.send((logv, mu, a[sl], eta_on_dt[sl]))
+
+        nll = 0.0
+        jac_logv = np.zeros(NUM_NOISE_PARAMETERS)
+        jac_mu = np.zeros(self.n)
+        jac_a = np.empty(self.m)
+        jac_eta = np.empty(self.m)
+        for conn, sl in zip(self.connections, self.slices):
+            out = conn.recv()
+            if isinstance(out, BaseException):
+                raise out
+            nll += out[0]
+            jac_logv += out[1]
+            jac_mu += out[2]
+            jac_a[sl] = out[3]
+            jac_eta[sl] = out[4]
+        return nll, jac_logv, jac_mu, jac_a, jac_eta
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        for conn in self.connections:
+            conn.send(None)
+            conn.close()
+        for process in self.processes:
+            process.join()
+
+
+def _noisefit_shard_worker(conn: Any, x: NDArray[np.float64]) -> None:
+    """Evaluate the noisefit cost function over a shard on request"""
+    _init_noisefit_worker(1)
+    while (msg := conn.recv()) is not None:
+        logv, mu, a, eta_on_dt = msg
+        try:
+            out = _nll_jac_noisefit_unscaled(
+                x[np.newaxis],
+                logv[np.newaxis],
+                mu[np.newaxis],
+                a[np.newaxis],
+                eta_on_dt[np.newaxis],
+            )
+            conn.send(tuple(val[0] for val in out))
+        except Exception as e:  # noqa: BLE001
+            conn.send(e)
+    conn.close()
+
+
+class _NoiseFitChunks:
+    r"""
+    Evaluate the noisefit cost function over blocks of waveforms.
+
+    Provides the ``evaluate`` method of :class:`_NoiseFitShards` in the
+    calling process, reading ``chunk_size`` waveforms from the data array at
+    a time, so that the data array may be a memory-mapped array or another
+    array-like object that supports slicing.
+
+    Parameters
+    ----------
+    x : array_like
+        Data array with shape (n, m), column-oriented.
+    chunk_size : int
+        Number of waveforms in each block.
+    """
+
+    def __init__(self, x: NDArray[np.float64], chunk_size: int) -> None:
+        n, m = x.shape
+        self.x = x
+        self.n = n
+        self.m = m
+        self.slices = [
+            slice(start, min(start + chunk_size, m))
+            for start in range(0, m, chunk_size)
+        ]
+
+    def chunk(self, sl: slice) -> NDArray[np.float64]:
+        """Read a block of waveforms, row-oriented"""
+        return np.asarray(self.x[:, sl], dtype=np.float64).T
+
+    def var(self) -> NDArray[np.float64]:
+        """Time-dependent variance of the waveforms, with ddof=1"""
+        # Combine the means and sums of squared deviations of the blocks
+        count = 0
+        mean = np.zeros(self.n)
+        m2 = np.zeros(self.n)
+        for sl in self.slices:
+            x_chunk = self.chunk(sl)
+            count_chunk = x_chunk.shape[0]
+            mean_chunk = np.mean(x_chunk, axis=0)
+            m2_chunk = np.sum((x_chunk - mean_chunk) ** 2, axis=0)
+            delta = mean_chunk - mean
+            total = count + count_chunk
+            m2 += m2_chunk + delta**2 * count * count_chunk / total
+            mean += delta * count_chunk / total
+            count = total
+        return np.asarray(m2 / (count - 1), dtype=np.float64)
+
+    def evaluate(
+        self,
+        logv: NDArray[np.float64],
+        mu: NDArray[np.float64],
+        a: NDArray[np.float64],
+        eta_on_dt: NDArray[np.float64],
+    ) -> tuple[
+        float,
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+    ]:
+        """Evaluate the cost function and its unscaled gradient"""
+        nll = 0.0
+        jac_logv = np.zeros(NUM_NOISE_PARAMETERS)
+        jac_mu = np.zeros(self.n)
+        jac_a = np.empty(self.m)
+        jac_eta = np.empty(self.m)
+        for sl in self.slices:
+            out = _nll_jac_noisefit_unscaled(
+                self.chunk(sl)[np.newaxis],
+                logv[np.newaxis],
+                mu[np.newaxis],
+                a[np.newaxis, sl],
+                eta_on_dt[np.newaxis, sl],
+            )
+            nll += float(out[0][0])
+            jac_logv += out[1][0]
+            jac_mu += out[2][0]
+            jac_a[sl] = out[3][0]
+            jac_eta[sl] = out[4][0]
+        return nll, jac_logv, jac_mu, jac_a, jac_eta
+
+    def close(self) -> None:
+        """Release the data array"""
+        del self.x
+
+
+def _parse_noisefit_roi(roi: slice | ArrayLike, n: int) -> slice:
+    """Convert a noisefit region of interest to a contiguous slice"""
+    if isinstance(roi, slice):
+        start, stop, step = roi.indices(n)
+        if step != 1:
+            msg = "ROI must be a contiguous range of samples"
+            raise ValueError(msg)
+    else:
+        mask = np.asarray(roi)
+        if mask.dtype != np.bool_ or mask.shape != (n,):
+            msg = "ROI mask must be a boolean array with shape (n,)"
+            raise ValueError(msg)
+        (index,) = np.nonzero(mask)
+        start = int(index[0]) if index.size else 0
+        stop = int(index[-1]) + 1 if index.size else 0
+        if index.size != stop - start:
+            msg = "ROI must be a contiguous range of samples"
+            raise ValueError(msg)
+    if stop - start < NUM_NOISE_PARAMETERS:
+        msg = (
+            f"ROI must include at least {NUM_NOISE_PARAMETERS} samples, "
+            f"not {max(stop - start, 0)}"
+        )
+        raise ValueError(msg)
+    return slice(start, stop)
+
+
+@dataclass
+class _NoiseFitBaseline:
+    r"""
+    Sufficient statistics of the samples outside a noisefit ROI.
+
+    Outside the region of interest, the signal vector is fixed to the mean
+    of the data at each sample, and the drift and the signal-dependent
+    noise terms are neglected, so that the :math:`K` data points there
+    contribute
+
+    .. math:: \frac{1}{2}\left(K\ln\sigma_\alpha^2
+        + \frac{S}{\sigma_\alpha^2}\right)
+
+    to the cost function, where :math:`S` is the sum of their squared
+    deviations from the means.
+
+    Parameters
+    ----------
+    roi : slice
+        Contiguous range of samples in the region of interest.
+    mu : ndarray
+        Signal vector with shape (n,), equal to the mean of the data
+        outside the ROI and zero inside it.
+    count : int
+        Number of data points outside the ROI.
+    ssr : float
+        Sum of the squared deviations of the data points outside the ROI
+        from the means.
+    """
+
+    roi: slice
+    mu: NDArray[np.float64]
+    count: int
+    ssr: float
+
+    @classmethod
+    def from_data(
+        cls, x: NDArray[np.float64], roi: slice, chunk_size: int | None = None
+    ) -> _NoiseFitBaseline:
+        """Compute the statistics, reading the waveforms in blocks"""
+        n, m = x.shape
+        outside = np.ones(n, dtype=bool)
+        outside[roi] = False
+        step = m if chunk_size is None else chunk_size
+
+        # Combine the means and sums of squared deviations of the blocks
+        count = 0
+        mean = np.zeros(n)
+        m2 = np.zeros(n)
+        for start in range(0, m, step):
+            x_chunk = np.asarray(x[:, start : start + step], dtype=np.float64)
+            x_chunk = x_chunk[outside]
+            count_chunk = x_chunk.shape[1]
+            mean_chunk = np.mean(x_chunk, axis=1)
+            m2_chunk = np.sum((x_chunk - mean_chunk[:, np.newaxis]) ** 2, 1)
+            delta = mean_chunk - mean[outside]
+            total = count + count_chunk
+            m2[outside] += m2_chunk + delta**2 * count * count_chunk / total
+            mean[outside] += delta * count_chunk / total
+            count = total
+        return cls(roi, mean, int(np.sum(outside)) * m, float(np.sum(m2)))
+
+    def expand(
+        self, values: NDArray[np.float64], fill: ArrayLike
+    ) -> NDArray[np.float64]:
+        """Embed values for the ROI in a vector with shape (n,)"""
+        out = np.empty(self.mu.size)
+        out[:] = fill
+        out[self.roi] = values
+        return out
+
+    def nll(self, logv_alpha: float) -> tuple[float, float, float]:
+        """Cost function and its first two derivatives in log(var_alpha)"""
+        ssr_on_v = self.ssr * np.exp(-logv_alpha)
+        return (
+            0.5 * (self.count * logv_alpha + ssr_on_v),
+            0.5 * (self.count - ssr_on_v),
+            0.5 * ssr_on_v,
+        )
+
+    def wrap(
+        self,
+        unpack: Callable[[NDArray[np.float64]], dict[str, Any]],
+        objective: Callable[[NDArray[np.float64]], np.float64],
+        jac: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+        hess: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+        hessp: Callable[..., NDArray[np.float64]],
+        *,
+        fix_sigma_alpha: bool,
+        scale_logv_alpha: float,
+    ) -> tuple[
+        Callable[[NDArray[np.float64]], np.float64],
+        Callable[[NDArray[np.float64]], NDArray[np.float64]],
+        Callable[[NDArray[np.float64]], NDArray[np.float64]],
+        Callable[..., NDArray[np.float64]],
+    ]:
+        """Add the baseline terms to the cost function and its derivatives"""
+
+        def terms(_p: NDArray[np.float64]) -> tuple[float, float, float]:
+            logv_alpha = scale_logv_alpha * unpack(_p)["logv_alpha_scaled"]
+            fun, d1, d2 = self.nll(float(logv_alpha))
+            return fun, scale_logv_alpha * d1, scale_logv_alpha**2 * d2
+
+        def objective_roi(_p: NDArray[np.float64]) -> np.float64:
+            return np.float64(objective(_p) + terms(_p)[0])
+
+        # The free log-variance of sigma_alpha, if any, is the first
+        # parameter. Copy the outputs, which may be cached by the caller.
+        def jac_roi(_p: NDArray[np.float64]) -> NDArray[np.float64]:
+            out = np.array(jac(_p), dtype=np.float64)
+            if not fix_sigma_alpha:
+                out[0] += terms(_p)[1]
+            return out
+
+        def hess_roi(_p: NDArray[np.float64]) -> NDArray[np.float64]:
+            out = np.array(hess(_p), dtype=np.float64)
+            if not fix_sigma_alpha:
+                out[0, 0] += terms(_p)[2]
+            return out
+
+        def hessp_roi(
+            _p: NDArray[np.float64], _v: NDArray[np.float64]
+        ) -> NDArray[np.float64]:
+            out = np.array(hessp(_p, _v), dtype=np.float64)
+            if not fix_sigma_alpha:
+                out[0] += terms(_p)[2] * _v[0]
+            return out
+
+        return objective_roi, jac_roi, hess_roi, hessp_roi
+
+
+def noisefit(
+    x: ArrayLike,
+    *,
+    dt: float | None = None,
+    sigma_alpha0: float | None = None,
+    sigma_beta0: float | None = None,
+    sigma_tau0: float | None = None,
+    mu0: ArrayLike | None = None,
+    a0: ArrayLike | None = None,
+    eta0: ArrayLike | None = None,
+    fix_sigma_alpha: bool = False,
+    fix_sigma_beta: bool = False,
+    fix_sigma_tau: bool = False,
+    fix_mu: bool = False,
+    fix_a: bool = False,
+    fix_eta: bool = False,
+    scale_logv_alpha: float | None = None,
+    scale_logv_beta: float | None = None,
+    scale_logv_tau: float | None = None,
+    scale_delta_mu: ArrayLike | None = None,
+    scale_delta_a: ArrayLike | None = None,
+    scale_eta: ArrayLike | None = None,
+    method: str = "BFGS",
+    workers: int = 1,
+    init: NoiseResult | None = None,
+    estimate_drift: bool = False,
+    callback: Callable[[NoiseFitProgress], bool | None] | None = None,
+    max_iter: int | None = None,
+    max_time: float | None = None,
+    errors: str = "exact",
+    covariance_rank: int = 32,
+    chunk_size: int | None = None,
+    roi: slice | ArrayLike | None = None,
+    min_options: dict[str, Any] | None = None,
+) -> NoiseResult:
+    r"""
+    Estimate noise model from a set of nominally identical waveforms.
+
+    The data array ``x`` should include `m` nominally identical waveform
+    measurements, where each waveform comprises `n` samples that are spaced
+    equally in time. The ``noise_model`` attribute of the return object
+    is an instance of the :class:`NoiseModel` class that represents the
+    estimated noise parameters. See `Notes` for details.
+
+    Parameters
+    ----------
+    x : array_like with shape (n, m)
+        Data array composed of ``m`` waveforms, each of which is sampled at
+        ``n`` points.
+    dt : float or None, optional
+        Sampling time, normally in picoseconds. Default is None, which sets
+        the sampling time to ``thztools.options.sampling_time``. If both
+        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
+        sampling time is set to ``1.0``. In this case, the unit of time is the
+        sampling time for the noise model parameter ``sigma_tau``, the delay
+        parameter array ``eta``, and the initial guesses for both quantities.
+    sigma_alpha0, sigma_beta0, sigma_tau0 : float, optional
+        Initial values for noise parameters. When set to
+        ``None``, the default, use a linear least-squares fit of the noise
+        model to ``np.var(x, 1, ddof=1)``.
+    mu0 : array_like with shape(n,), optional
+        Initial guess, signal vector with shape (n,). Default is first column
+        of ``x``.
+    a0 : array_like with shape(m,), optional
+        Initial guess, signal amplitude drift vector with shape (m,). Default
+        is ``np.ones(m)``.
+    eta0 : array_like with shape(m,), optional
+        Initial guess, signal delay drift vector with shape (m,). Default is
+        ``np.zeros(m)``.
+    fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau : bool, optional
+        Fix the associated noise parameter. Default is False.
+    fix_mu : bool, optional
+        Fix signal vector. Default is False.
+    fix_a : bool, optional
+        Fix signal amplitude drift vector. Default is False.
+    fix_eta : bool, optional
+        Fix signal delay drift vector. Default is False.
+
+    Returns
+    -------
+    res : NoiseResult
+        Fit result represented as a ``NoiseResult`` object. Important
+        attributes are: ``noise_model``, an instance of :class:`NoiseModel`
+        with the estimated noise parameters; ``mu``, the estimated signal
+        vector; ``a``, the estimated signal amplitude drift vector; ``eta``,
+        the estimated signal delay drift vector; ``fval``, the value of the
+        optimized NLL cost function; and ``diagnostic``, an instance of
+        :class:`scipy.optimize.OptimizeResult` returned by
+        :func:`scipy.optimize.minimize`. Note that the fit parameters are
+        scaled internally to improve convergence (see `Other Parameters`
+        below), which affects the attributes ``fun``, ``jac``, and ``hess_inv``
+        of ``diagnostic``. See :class:`NoiseResult` for more details and for a
+        description of other attributes.
+
+    Other Parameters
+    ----------------
+    scale_logv_alpha, scale_logv_beta, scale_logv_tau : float, optional
+        Scale for varying the log of the variance parameters.
+    scale_delta_mu : array_like with shape(n,), optional
+        Scale for varying signal vector. When set to ``None``, the default,
+        use ``NoiseModel(sigma_alpha0, sigma_beta0,
+        sigma_tau0).noise_amp(mu0)``.
+    scale_delta_a : array_like with shape(n,), optional
+        Scale for varying signal amplitude drift vector. Default is
+        ``np.max((sigma_min, sigma_beta0))`` for all entries, where
         ``sigma_min = np.sqrt(np.min(np.var(x, 1, ddof=1)))``.
     scale_eta : array_like with shape(n,), optional
         Scale for varying signal delay drift vector. Default is
         ``np.max((sigma_min, sigma_tau0))``, for all entries, where
         ``sigma_min = np.sqrt(np.min(np.var(x, 1, ddof=1)))``.
+    method : str, optional
+        Minimization method passed to :func:`scipy.optimize.minimize`. Default
+        is ``"BFGS"``, which stores a dense approximation to the inverse
+        Hessian, with :math:`(N + 2M)^2` entries. The limited-memory method
+        ``"L-BFGS-B"`` avoids this and uses ``gtol = 1e-5 * x.size`` by
+        default. The method ``"trust-exact"`` uses the exact Hessian, and the
+        Hessian-free methods ``"Newton-CG"``, ``"trust-ncg"``, and
+        ``"trust-krylov"`` use Hessian-vector products that are computed with
+        FFTs in :math:`O(MN\log N)` operations, without forming the Hessian.
+        The method ``"block-coordinate"`` alternates between updates of the
+        noise parameters, the signal vector, and the drift parameters of all
+        waveforms, with :math:`O(MN\log N)` operations and :math:`O(MN)`
+        memory per sweep, and is usually much faster than BFGS when ``m`` is
+        large. It accepts the ``min_options`` keys ``gtol`` and ``maxiter``,
+        the maximum number of sweeps, which defaults to 1000. When
+        ``fix_mu``, ``fix_a``, and ``fix_eta`` are all ``True``, the model
+        waveforms do not change during the fit, and the noise parameters are
+        instead fitted by Newton's method on sums of the residuals that are
+        computed once; this path accepts the ``min_options`` keys ``gtol``
+        and ``maxiter``, which defaults to 100, and ignores ``method``. For all
+        methods, the number of iterations and the execution time of the
+        minimization are given by the ``nit`` and ``execution_time``
+        attributes of the ``diagnostic`` attribute of the result.
+    workers : int, optional
+        Number of worker processes used to evaluate the cost function and its
+        gradient. Each worker holds a contiguous block of waveforms and
+        returns its contribution to the cost function and gradient, which
+        are combined in the calling process. Default is 1, which evaluates
+        them in the calling process. Use -1 for all available processors.
+        Parallel evaluation only pays off when ``m`` is large enough for the
+        computation at each iteration to exceed the cost of communicating
+        the ``n``-dimensional signal vector to the workers.
+    init : NoiseResult or None, optional
+        Result of a previous fit to use as a warm start. The noise parameters
+        and signal vector of ``init`` replace the defaults for
+        ``sigma_alpha0``, ``sigma_beta0``, ``sigma_tau0``, and ``mu0``, which
+        in turn determine the default scales, and its drift vectors replace
+        the defaults for ``a0`` and ``eta0`` when they have ``m`` entries.
+        For ``method="BFGS"``, the inverse Hessian of ``init`` is also
+        converted to the scaled parameters and used as the initial inverse
+        Hessian approximation, provided that it matches the number of free
+        parameters and that ``min_options`` does not include ``hess_inv0``.
+        Default is None.
+    estimate_drift : bool, optional
+        If ``True``, estimate the drift parameters before the minimization to
+        replace the defaults for ``a0`` and ``eta0``. The delays are estimated
+        from the peaks of the cross-correlations of the waveforms with a
+        reference waveform, interpolated to sub-sample precision, and the
+        amplitudes are estimated by projecting the waveforms onto the
+        shifted reference. The drift-corrected mean waveform then replaces
+        the default for ``mu0``, and the variance of the drift-corrected
+        waveforms replaces the data variance in the default noise parameter
+        estimates. The estimates are computed with :math:`O(MN\log N)`
+        operations and substantially reduce the number of iterations when the
+        delay drift is large compared to the sampling time. Default is
+        ``False``.
+    callback : callable or None, optional
+        Function called after each iteration as ``callback(progress)``,
+        where ``progress`` is a :class:`NoiseFitProgress` object with the
+        current parameters, the value of the NLL cost function, and the norm
+        of its gradient. If the function returns ``True``, the minimization
+        stops. Default is None.
+    max_iter : int or None, optional
+        Maximum number of iterations, which takes precedence over the
+        ``maxiter`` option in ``min_options``. Default is None.
+    max_time : float or None, optional
+        Maximum time for the minimization, in seconds, which is checked after
+        each iteration. Default is None.
+
+        If the minimization is stopped by ``callback``, ``max_iter``, or
+        ``max_time``, the result holds the last iterate and
+        ``diagnostic.success`` is ``False``. The uncertainties are then
+        computed from the Hessian at the last iterate, and are ``nan`` where
+        the Hessian is not positive definite.
+    errors : str, optional
+        One of ``"exact"``, ``"diagonal"``, ``"low-rank"``, ``"bfgs"``,
+        ``"lazy"``, or ``"none"``, the method used to compute the ``hess_inv``
+        and ``err_*`` attributes of the result. Default is ``"exact"``, which
+        inverts the Hessian of the cost function at the optimum. This is
+        often more expensive than the minimization itself when ``m`` is
+        large, and is not supported with ``chunk_size``. The
+        option ``"diagonal"`` computes the same uncertainties from the diagonal
+        of the inverse Hessian alone, without forming the dense inverse, and
+        sets ``hess_inv`` to an empty array. The option ``"low-rank"`` does the
+        same and also sets the ``covariance`` attribute to a
+        :class:`LowRankCovariance` approximation of the inverse Hessian, which
+        is computed with a randomized eigendecomposition and preserves the
+        marginal variances. The option ``"bfgs"`` uses the inverse Hessian
+        approximation of the ``"BFGS"`` or ``"L-BFGS-B"`` methods instead,
+        which is less accurate but requires no additional computation. The
+        option ``"lazy"`` defers the exact computation until one of these
+        attributes is first accessed, including by ``repr``, comparisons,
+        or :func:`dataclasses.asdict`, or until the result is pickled, and
+        holds a reference to the data until then. The option ``"none"``
+        skips the computation, so that ``hess_inv`` is an empty array and
+        the uncertainties of the free parameters are ``nan``.
+    covariance_rank : int, optional
+        Rank of the low-rank factor of the ``covariance`` attribute of the
+        result when ``errors="low-rank"``. Default is 32.
+    chunk_size : int or None, optional
+        If given, evaluate the cost function and its gradient over blocks of
+        ``chunk_size`` waveforms, which are read from ``x`` one block at a
+        time. The data array ``x`` is then not converted to an in-memory
+        array, so it may be a :class:`numpy.memmap` or another array-like
+        object with a ``shape`` attribute that supports slicing, such as an
+        HDF5 dataset, and the memory required for the temporary arrays of
+        the cost function is proportional to ``chunk_size`` instead of
+        ``m``. Requires ``method="BFGS"`` or ``"L-BFGS-B"``, ``workers=1``,
+        and ``estimate_drift=False``. The ``"L-BFGS-B"`` method avoids the
+        dense inverse Hessian approximation of ``"BFGS"``. Only the options
+        ``"none"`` and ``"bfgs"`` for ``errors`` are supported, as the others
+        evaluate the Hessian over the full data array. Default is None,
+        which evaluates the cost function over all waveforms at once.
+    roi : slice, array_like of bool with shape (n,), or None, optional
+        Region of interest, a contiguous range of samples given as a slice
+        or as a boolean mask. Inside the ROI, the signal vector is a free
+        parameter as usual. Outside it, the signal vector is fixed to the
+        mean of the data at each sample, and the drift and the terms of the
+        noise model proportional to ``sigma_beta`` and ``sigma_tau`` are
+        neglected, so that these samples contribute to the cost function
+        only through ``sigma_alpha``, by way of their number and the sum of
+        their squared deviations from the means, which are computed once.
+        The number of free parameters and the cost of the FFTs and of the
+        Hessian then scale with the size of the ROI instead of ``n``. The
+        ROI should include every sample where the signal is not negligible,
+        and should begin and end where it is, since the waveforms inside it
+        are shifted with FFTs that treat it as periodic. The ``hess_inv``
+        and ``covariance`` attributes of the result then include only the
+        entries of the signal vector inside the ROI, and the uncertainty of
+        the entries outside it is ``sigma_alpha / sqrt(m)``. Default is
+        None, which fits the signal vector at all samples.
+    min_options : dict or None, optional
+        Keyword options passed to the ``options`` parameter of
+        :func:`scipy.optimize.minimize`. See the documentation on the
+        `BFGS <https://docs.scipy.org/doc/scipy/reference/
+        optimize.minimize-bfgs.html#optimize-minimize-bfgs>`_
+        method for details. By default, ``gtol=1e-5 * x.size``, except for
+        ``method="Newton-CG"``, which uses the SciPy default for ``xtol``. The
+        options ``eps`` and ``finite_diff_rel_step`` are not used.
+
+    Raises
+    ------
+    ValueError
+        If all parameters are held fixed, if the input arrays have
+        incompatible shapes, if ``method`` or ``errors`` is not supported,
+        if ``workers``, ``chunk_size``, or ``roi`` is invalid, or if
+        ``chunk_size`` is combined with an unsupported option.
+
+    Warns
+    -----
+    UserWarning
+        If ``thztools.options.sampling_time`` and the ``dt`` parameter
+        are both not ``None`` and are set to different ``float`` values, the
+        function will set the sampling time to ``dt`` and raise a
+        :class:`UserWarning`.
+
+    See Also
+    --------
+    NoiseModel : Noise model class.
+    noisefit_batch : Estimate noise models for a stack of data arrays.
+
+    Notes
+    -----
+    Given an :math:`N\times M` data array :math:`\mathbf{X}`, the function uses
+    :func:`scipy.optimize.minimize` (by default, with the BFGS method) to
+    minimize the maximum-likelihood cost function [1]_
+
+    .. math:: \begin{split}\
+        Q_\text{ML}\
+        (\sigma_\alpha,\sigma_\beta,\sigma_\tau,\boldsymbol{\mu},\
+        \mathbf{A},\boldsymbol{\eta};\mathbf{X})\
+        = \frac{1}{2}\sum_{k=0}^{N-1}\sum_{l=0}^{M-1}& \
+        \left[\ln\sigma_{kl}^2 + \frac{(X_{kl} \
+        - Z_{kl})^2}{\sigma_{kl}^2}\right]\
+        \end{split}
+
+    with respect to the unknown model parameters :math:`\sigma_\alpha`,
+    :math:`\sigma_\beta`, :math:`\sigma_\tau`, :math:`\boldsymbol{\mu}`,
+    :math:`\mathbf{A}` and :math:`\boldsymbol{\eta}`. The model assumes that
+    the elements of :math:`\mathbf{X}` are normally distributed around the
+    corresponding elements of :math:`\mathbf{Z}` with variances given by
+    :math:`\boldsymbol{\sigma}^2`, which are in turn given by
+
+    .. math:: Z_{kl} = A_l\mu(t_k - \eta_l)
+
+    and
+
+    .. math:: \sigma_{kl}^2 = \sigma_\alpha^2 + \sigma_\beta^2 Z_{kl}^2 \
+        + \sigma_\tau^2(\mathbf{D}\mathbf{Z})_{kl}^2,
+
+    where :math:`\mathbf{D}` is the time-domain derivative operator. The
+    function :math:`\mu(t)` represents an ideal primary waveform, which drifts
+    in amplitude and temporal location between each of the :math:`M` waveform
+    measurements. Each waveform comprises :math:`N` samples at the nominal
+    times :math:`t_k`, and the drift in the amplitude and the temporal location
+    of the :math:`l` waveform are given by :math:`A_l` and :math:`\eta_l`,
+    respectively, with initial values fixed at :math:`A_0 = 1.0` and
+    :math:`\eta_0 = 0.0` by definition.
+
+    References
+    ----------
+    .. [1] Laleh Mohtashemi, Paul Westlund, Derek G. Sahota, Graham B. Lea,
+        Ian Bushfield, Payam Mousavi, and J. Steven Dodge, "Maximum-
+        likelihood parameter estimation in terahertz time-domain
+        spectroscopy," Opt. Express **29**, 4912-4926 (2021),
+        `<https://doi.org/10.1364/OE.417724>`_.
+
+    Examples
+    --------
+    In basic usage, it should be possible to call ``noisefit`` with just
+    the data array. In the code below, we simulate ``m = 50`` noisy waveforms
+    with ``n = 256`` time points each, then verify that the fit results are
+    consistent with the true noise parameters.
+
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> from matplotlib import pyplot as plt
+    >>> rng = np.random.default_rng(0)
+    >>> n, m, dt = 256, 50, 0.05
+    >>> t = thz.timebase(n, dt=dt)
+    >>> mu = thz.wave(n, dt=dt)
+    >>> alpha, beta, tau = 1e-4, 1e-2, 1e-3
+    >>> noise_model = thz.NoiseModel(sigma_alpha=alpha, sigma_beta=beta,
+    ...  sigma_tau=tau, dt=dt)
+    >>> a = 1.0 + 1e-2 * np.concatenate(([0.0],
+    ...                                 rng.standard_normal(m - 1)))
+    >>> eta = 1e-3 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
+    >>> z = thz.scaleshift(np.repeat(np.atleast_2d(mu), m, axis=0), dt=dt,
+    ...                    a=a, eta=eta).T  # Orient the array columnwise
+    >>> x = z + noise_model.noise_sim(z, axis=0, seed=12345)
+    >>> noise_res = thz.noisefit(x, sigma_alpha0=alpha, sigma_beta0=beta,
+    ...  sigma_tau0=tau, dt=dt)
+    >>> noise_res.noise_model
+    NoiseModel(sigma_alpha=0.000100..., sigma_beta=0.00985...,
+    sigma_tau=0.000894..., dt=0.05)
+
+    >>> plt.plot(t, np.std(thz.scaleshift(x, a=1 / noise_res.a,
+    ... eta=-noise_res.eta, axis=0), axis=1), "-",
+    ... label="Data")
+    >>> plt.plot(t, noise_res.noise_model.noise_amp(noise_res.mu),
+    ...  "--", label="Fit")
+    >>> plt.legend()
+    >>> plt.xlabel("t (ps)")
+    >>> plt.ylabel(r"$\sigma(t)$")
+    >>> plt.show()
+    """
+    if method not in NOISEFIT_METHODS:
+        msg = f"Method must be one of {NOISEFIT_METHODS}, not {method!r}"
+        raise ValueError(msg)
+
+    if errors not in NOISEFIT_ERRORS:
+        msg = f"Errors must be one of {NOISEFIT_ERRORS}, not {errors!r}"
+        raise ValueError(msg)
+    if errors == "bfgs" and method not in ("BFGS", "L-BFGS-B"):
+        msg = (
+            "Errors 'bfgs' requires method 'BFGS' or 'L-BFGS-B', "
+            f"not {method!r}"
+        )
+        raise ValueError(msg)
+
+    if workers == -1:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        msg = "Number of workers must be a positive integer or -1"
+        raise ValueError(msg)
+
+    if chunk_size is None:
+        x = np.asarray(x, dtype=np.float64)
+    else:
+        if chunk_size < 1:
+            msg = "Chunk size must be a positive integer"
+            raise ValueError(msg)
+        if method not in ("BFGS", "L-BFGS-B") or workers > 1 or estimate_drift:
+            msg = (
+                "Chunked evaluation requires method 'BFGS' or 'L-BFGS-B', "
+                "workers=1, and estimate_drift=False"
+            )
+            raise ValueError(msg)
+        if errors not in ("none", "bfgs"):
+            msg = (
+                f"Chunked evaluation does not support errors {errors!r}, "
+                "which evaluates the Hessian over the full data array; use "
+                "'none' or 'bfgs'"
+            )
+            raise ValueError(msg)
+        # Keep array-like data sources, such as memory-mapped arrays, out of
+        # memory
+        if not hasattr(x, "shape"):
+            x = np.asarray(x, dtype=np.float64)
+        x = cast("NDArray[np.float64]", x)
+        if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
+            msg = "Data array x must be 2D"
+            raise ValueError(msg)
+    dt = _assign_sampling_time(dt)
+
+    # Reduce the samples outside the region of interest to their sufficient
+    # statistics, and fit the rest of the data
+    baseline = None
+    if roi is not None:
+        if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
+            msg = "Data array x must be 2D"
+            raise ValueError(msg)
+        roi = _parse_noisefit_roi(roi, x.shape[0])
+        baseline = _NoiseFitBaseline.from_data(x, roi, chunk_size)
+        x = x[roi]
+
+    # With the signal and drift held fixed, only the noise parameters vary,
+    # and the model waveforms need to be computed only once
+    noise_only = fix_mu and fix_a and fix_eta and chunk_size is None
+
+    if init is not None:
+        if sigma_alpha0 is None:
+            sigma_alpha0 = init.noise_model.sigma_alpha
+        if sigma_beta0 is None:
+            sigma_beta0 = init.noise_model.sigma_beta
+        if sigma_tau0 is None:
+            sigma_tau0 = init.noise_model.sigma_tau
+        if mu0 is None:
+            mu0 = init.mu
+        if a0 is None and init.a.size == x.shape[-1]:
+            a0 = init.a
+        if eta0 is None and init.eta.size == x.shape[-1]:
+            eta0 = init.eta
+
+    # Restrict vectors over all samples to the region of interest
+    if baseline is not None:
+        if mu0 is not None and np.size(mu0) == baseline.mu.size:
+            mu0 = np.asarray(mu0, dtype=np.float64)[baseline.roi]
+        if (
+            scale_delta_mu is not None
+            and np.size(scale_delta_mu) == baseline.mu.size
+        ):
+            scale_delta_mu = np.asarray(scale_delta_mu, dtype=np.float64)[
+                baseline.roi
+            ]
+
+    if estimate_drift and x.ndim == NUM_NOISE_DATA_DIMENSIONS:
+        mu_est, a_est, eta_est = _estimate_noisefit_drift(x, dt)
+        mu0 = mu_est if mu0 is None else mu0
+        a0 = a_est if a0 is None else a0
+        eta0 = eta_est if eta0 is None else eta0
+        if None in [sigma_alpha0, sigma_beta0, sigma_tau0]:
+            x_adj = scaleshift(x, dt=dt, a=1 / a_est, eta=-eta_est, axis=0)
+            sigma_est = _fit_noise_variance(
+                np.var(x_adj, 1, ddof=1), mu_est, dt
+            )
+            if sigma_alpha0 is None:
+                sigma_alpha0 = float(sigma_est[0])
+            if sigma_beta0 is None:
+                sigma_beta0 = float(sigma_est[1])
+            if sigma_tau0 is None:
+                sigma_tau0 = float(sigma_est[2])
+
+    shards_context: (
+        closing[_NoiseFitShards | _NoiseFitChunks] | nullcontext[None]
+    )
+    if chunk_size is not None:
+        shards_context = closing(_NoiseFitChunks(x, chunk_size))
+    elif (
+        workers > 1 and x.ndim == NUM_NOISE_DATA_DIMENSIONS and not noise_only
+    ):
+        shards_context = closing(_NoiseFitShards(x.T, workers))
+    else:
+        shards_context = nullcontext()
+
+    with shards_context as shards:
+        parsed = _parse_noisefit_input(
+            x,
+            dt=dt,
+            sigma_alpha0=sigma_alpha0,
+            sigma_beta0=sigma_beta0,
+            sigma_tau0=sigma_tau0,
+            mu0=mu0,
+            a0=a0,
+            eta0=eta0,
+            fix_sigma_alpha=fix_sigma_alpha,
+            fix_sigma_beta=fix_sigma_beta,
+            fix_sigma_tau=fix_sigma_tau,
+            fix_mu=fix_mu,
+            fix_a=fix_a,
+            fix_eta=fix_eta,
+            scale_logv_alpha=scale_logv_alpha,
+            scale_logv_beta=scale_logv_beta,
+            scale_logv_tau=scale_logv_tau,
+            scale_delta_mu=scale_delta_mu,
+            scale_delta_a=scale_delta_a,
+            scale_eta=scale_eta,
+            shards=shards,
+        )
+
+        objective, jac, x0, input_parsed = parsed
+        hessp = input_parsed.pop("hessp")
+        unpack = input_parsed["unpack"]
+        if baseline is not None:
+            objective, jac, input_parsed["hess"], hessp = baseline.wrap(
+                unpack,
+                objective,
+                jac,
+                input_parsed["hess"],
+                hessp,
+                fix_sigma_alpha=fix_sigma_alpha,
+                scale_logv_alpha=input_parsed["scale_logv_alpha"],
+            )
+
+        # Seed BFGS with the inverse Hessian of the previous fit, converted
+        # to the scaled parameters
+        min_options = {} if min_options is None else dict(min_options)
+        if (
+            method == "BFGS"
+            and not noise_only
+            and init is not None
+            and init.hess_inv.shape == (x0.size, x0.size)
+            and "hess_inv0" not in min_options
+        ):
+            scale_hess_inv = _scale_noisefit_hess_inv(
+                init.noise_model.sigma_alpha,
+                init.noise_model.sigma_beta,
+                init.noise_model.sigma_tau,
+                **{
+                    k: v
+                    for k, v in input_parsed.items()
+                    if k.startswith(("fix_", "scale_"))
+                },
+            )
+            hess_inv0 = init.hess_inv / np.outer(
+                scale_hess_inv, scale_hess_inv
+            )
+            min_options["hess_inv0"] = (hess_inv0 + hess_inv0.T) / 2
+
+        if max_iter is not None:
+            min_options["maxiter"] = max_iter
+
+        # Track the latest iterate so that the minimization can be stopped
+        # early by the callback or the time budget
+        state: dict[str, Any] = {"nit": 0, "x": x0}
+        decode_kwargs = {
+            k: v
+            for k, v in input_parsed.items()
+            if k not in ("hess", "unpack")
+        }
+
+        def iter_callback(xk: NDArray[np.float64]) -> None:
+            state["nit"] += 1
+            state["x"] = np.copy(xk)
+            elapsed = time.perf_counter() - start_time
+            if callback is not None:
+                noise_model, mu, a, eta = _decode_noisefit(
+                    xk, x, dt, **decode_kwargs
+                )
+                if baseline is not None:
+                    mu = baseline.expand(mu, baseline.mu)
+                progress = NoiseFitProgress(
+                    nit=state["nit"],
+                    noise_model=noise_model,
+                    mu=mu,
+                    a=a,
+                    eta=eta,
+                    fval=float(objective(xk)),
+                    grad_norm=float(np.max(np.abs(jac(xk)), initial=0.0)),
+                    elapsed=elapsed,
+                )
+                if callback(progress):
+                    msg = "Stopped by callback."
+                    raise _NoiseFitStop(msg)
+            if max_time is not None and elapsed > max_time:
+                msg = "Maximum time has been exceeded."
+                raise _NoiseFitStop(msg)
+
+        min_callback = (
+            None if callback is None and max_time is None else iter_callback
+        )
+
+        # Minimize cost function with respect to free parameters
+        start_time = time.perf_counter()
+        try:
+            out = _minimize_noisefit(
+                "noise-only" if noise_only else method,
+                x,
+                x0,
+                dt=dt,
+                unpack=unpack,
+                objective=objective,
+                jac=jac,
+                hessp=hessp,
+                input_parsed=input_parsed,
+                callback=min_callback,
+                min_options=min_options,
+                baseline=baseline,
+            )
+        except _NoiseFitStop as stop:
+            out = OptimizeResult(
+                x=state["x"],
+                fun=float(objective(state["x"])),
+                jac=jac(state["x"]),
+                nit=state["nit"],
+                status=99,
+                success=False,
+                message=str(stop),
+            )
+        out.execution_time = time.perf_counter() - start_time
+
+    return _parse_noisefit_output(
+        out,
+        x,
+        dt=dt,
+        errors=errors,
+        covariance_rank=covariance_rank,
+        baseline=baseline,
+        **{k: v for k, v in input_parsed.items() if k != "hess"},
+    )
+
+
+def _minimize_noisefit(
+    method: str,
+    x: NDArray[np.float64],
+    x0: NDArray[np.float64],
+    *,
+    dt: float,
+    unpack: Callable[[NDArray[np.float64]], dict[str, Any]],
+    objective: Callable[[NDArray[np.float64]], np.float64],
+    jac: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+    hessp: Callable[..., NDArray[np.float64]],
+    input_parsed: dict[str, Any],
+    callback: Callable[[NDArray[np.float64]], None] | None,
+    min_options: dict[str, Any],
+    baseline: _NoiseFitBaseline | None = None,
+) -> OptimizeResult:
+    """Dispatch the noisefit minimization to the selected method"""
+    if method == "noise-only":
+        return _minimize_noisefit_noise(
+            x,
+            x0,
+            dt=dt,
+            unpack=unpack,
+            **{
+                k: v
+                for k, v in input_parsed.items()
+                if k.startswith(("fix_", "scale_"))
+            },
+            callback=callback,
+            baseline=baseline,
+            gtol=min_options.get("gtol", 1e-5 * x.size),
+            maxiter=min_options.get("maxiter", 100),
+        )
+    if method == "block-coordinate":
+        return _minimize_noisefit_block(
+            x,
+            x0,
+            dt=dt,
+            unpack=unpack,
+            objective=objective,
+            jac=jac,
+            **{
+                k: v
+                for k, v in input_parsed.items()
+                if k.startswith(("fix_", "scale_"))
+            },
+            callback=callback,
+            baseline=baseline,
+            **{"gtol": 1e-5 * x.size, **min_options},
+        )
+    if method == "BFGS":
+        return minimize(
+            objective,
+            x0,
+            method=method,
+            jac=jac,
+            tol=1e-5 * x.size,
+            callback=callback,
+            options=min_options,
+        )
+    if method == "L-BFGS-B":
+        # The tol argument would also set the relative tolerance on the
+        # cost function, ftol, so set gtol through the options instead
+        return minimize(
+            objective,
+            x0,
+            method=method,
+            jac=jac,
+            callback=callback,
+            options={"gtol": 1e-5 * x.size, **min_options},
+        )
+    if method == "trust-exact":
+        return minimize(
+            objective,
+            x0,
+            method=method,
+            jac=jac,
+            hess=input_parsed["hess"],
+            tol=1e-5 * x.size,
+            callback=callback,
+            options=min_options,
+        )
+    return minimize(
+        objective,
+        x0,
+        method=method,
+        jac=jac,
+        hessp=hessp,
+        tol=None if method == "Newton-CG" else 1e-5 * x.size,
+        callback=callback,
+        options=min_options,
+    )
+
+
+def _estimate_noisefit_drift(
+    x: NDArray[np.float64], dt: float, *, num_iter: int = 2
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    r"""
+    Estimate the signal and drift parameters by cross-correlation.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data array with shape (n, m).
+    dt : float
+        Sampling time.
+    num_iter : int, optional
+        Number of passes, each of which aligns the waveforms to the
+        drift-corrected mean of the previous pass. Default is 2.
+
+    Returns
+    -------
+    mu : ndarray
+        Drift-corrected mean waveform, with shape (n,).
+    a : ndarray
+        Amplitude drift vector, with shape (m,) and ``a[0] = 1``.
+    eta : ndarray
+        Delay drift vector, with shape (m,) and ``eta[0] = 0``.
+
+    Notes
+    -----
+    The delay of each waveform relative to the reference waveform is
+    estimated from the peak of their circular cross-correlation, which is
+    computed for all waveforms with one batch of FFTs and refined to
+    sub-sample precision by fitting a parabola to the peak and its two
+    neighbors. The amplitude is then estimated by projecting each waveform
+    onto the shifted reference. The first waveform serves as the reference
+    for the first pass.
+    """
+    x_rows = x.T
+    m, n = x_rows.shape
+    x_f = _rfft(x_rows)
+    w = 2 * pi * _rfftfreq(n)
+    idx = np.arange(m)
+    mu = x_rows[0]
+    a = np.ones(m)
+    eta_on_dt = np.zeros(m)
+    for _ in range(num_iter):
+        mu_f = _rfft(mu)
+        xcorr = _irfft(x_f * np.conj(mu_f), n=n)
+        k = np.argmax(xcorr, axis=1)
+        y_minus = xcorr[idx, (k - 1) % n]
+        y_0 = xcorr[idx, k]
+        y_plus = xcorr[idx, (k + 1) % n]
+        curv = y_minus - 2 * y_0 + y_plus
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = np.where(curv < 0, (y_minus - y_plus) / (2 * curv), 0.0)
+        eta_on_dt = np.where(k > n // 2, k - n, k) + delta
+
+        # Project each waveform onto the shifted reference
+        shift_f = np.exp(-1j * np.outer(eta_on_dt, w)) * mu_f
+        shifted = _irfft(shift_f, n=n)
+        a = np.sum(x_rows * shifted, axis=1) / np.sum(shifted**2, axis=1)
+
+        # Refer the drift to the first waveform and average the corrected
+        # waveforms
+        a = a / a[0]
+        eta_on_dt = eta_on_dt - eta_on_dt[0]
+        mu = np.mean(
+            _irfft(x_f * np.exp(1j * np.outer(eta_on_dt, w)), n=n)
+            / a[:, np.newaxis],
+            axis=0,
+        )
+
+    return (
+        np.asarray(mu, dtype=np.float64),
+        np.asarray(a, dtype=np.float64),
+        np.asarray(eta_on_dt * dt, dtype=np.float64),
+    )
+
+
+def _fit_noise_variance(
+    v_t: NDArray[np.float64], mu: NDArray[np.float64], dt: float
+) -> NDArray[np.float64]:
+    """Linear least-squares fit of the noise model to a variance vector"""
+    n = mu.size
+    w = 2 * pi * _rfftfreq(n, dt)
+    dmu_dt = _irfft(1j * w * _rfft(mu), n=n)
+    a_matrix = np.stack([np.ones(n), mu**2, dmu_dt**2], axis=1)
+    sol = np.linalg.lstsq(a_matrix, v_t, rcond=None)
+    return np.asarray(
+        np.ma.sqrt(sol[0]).filled(np.sqrt(np.min(v_t))), dtype=np.float64
+    )
+
+
+def _parse_noisefit_input(
+    x: NDArray[np.float64],
+    dt: float,
+    *,
+    sigma_alpha0: float | None,
+    sigma_beta0: float | None,
+    sigma_tau0: float | None,
+    mu0: ArrayLike | None,
+    a0: ArrayLike | None,
+    eta0: ArrayLike | None,
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float | None,
+    scale_logv_beta: float | None,
+    scale_logv_tau: float | None,
+    scale_delta_mu: ArrayLike | None,
+    scale_delta_a: ArrayLike | None,
+    scale_eta: ArrayLike | None,
+    shards: _NoiseFitShards | _NoiseFitChunks | None = None,
+) -> tuple[
+    Callable[[NDArray[np.float64]], np.float64],
+    Callable[[NDArray[np.float64]], NDArray[np.float64]],
+    NDArray[np.float64],
+    dict[str, Any],
+]:
+    """Parse noisefit inputs"""
+    if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
+        msg = "Data array x must be 2D"
+        raise ValueError(msg)
+    n, m = x.shape
+
+    if (
+        fix_sigma_alpha
+        and fix_sigma_beta
+        and fix_sigma_tau
+        and fix_mu
+        and fix_a
+        and fix_eta
+    ):
+        msg = "All variables are fixed"
+        raise ValueError(msg)
+
+    # Use the first column of x as a default
+    if mu0 is None:
+        mu0 = x[:, 0]
+    else:
+        mu0 = np.asarray(mu0, dtype=np.float64)
+        if mu0.size != n:
+            msg = "Size of mu0 is incompatible with data array x."
+            raise ValueError(msg)
+
+    # Compute time-dependent variance of signal array and
+    # the minimum value of the time-dependent noise amplitude
+    v_t = (
+        shards.var()
+        if isinstance(shards, _NoiseFitChunks)
+        else np.var(x, 1, ddof=1)
+    )
+    sigma_min = np.sqrt(np.min(v_t))
+
+    # If any initial guess for the noise parameters is unspecified,
+    # estimate all noise parameters with a linear least-squares fit
+    # to the time-dependent variance
+    if None in [sigma_alpha0, sigma_beta0, sigma_tau0]:
+        sigma_est = _fit_noise_variance(v_t, mu0, dt)
+
+    if sigma_alpha0 is None:
+        sigma_alpha0 = sigma_est[0]
+
+    if sigma_beta0 is None:
+        sigma_beta0 = sigma_est[1]
+
+    if sigma_tau0 is None:
+        sigma_tau0 = sigma_est[2]
+
+    noise_model = NoiseModel(
+        float(sigma_alpha0),
+        float(sigma_beta0),
+        float(sigma_tau0),
+        dt=float(dt),
+    )
+
+    if scale_delta_mu is None:
+        scale_delta_mu = noise_model.noise_amp(mu0)
+        scale_delta_mu[np.isclose(scale_delta_mu, 0.0)] = np.sqrt(
+            np.finfo(float).eps
+        )
+
+    scale_delta_mu = np.asarray(scale_delta_mu, dtype=np.float64)
+
+    if scale_delta_a is None:
+        scale_delta_a_amp = np.max((sigma_min, sigma_beta0))
+        scale_delta_a = scale_delta_a_amp * np.ones(m - 1)
+
+    scale_delta_a = np.asarray(scale_delta_a, dtype=np.float64)
+
+    if scale_eta is None:
+        scale_eta_amp = np.max((sigma_min, sigma_tau0))
+        scale_eta = scale_eta_amp * np.ones(m - 1)
+
+    scale_eta = np.asarray(scale_eta, dtype=np.float64)
+
+    if scale_logv_alpha is None:
+        scale_logv_alpha = 1 / m
+
+    if scale_logv_beta is None:
+        scale_logv_beta = 1 / m
+
+    if scale_logv_tau is None:
+        scale_logv_tau = 1 / m
+
+    scale_logv = np.array(
+        [scale_logv_alpha, scale_logv_beta, scale_logv_tau],
+        dtype=np.float64,
+    )
+
+    # Replace log(x) with -1e2 when x <= 0
+    v0 = (
+        np.asarray(
+            [sigma_alpha0, sigma_beta0, sigma_tau0 / dt], dtype=np.float64
+        )
+    ) ** 2
+    logv0_scaled = np.ma.log(v0).filled(-1.0e2) / scale_logv
+    delta0 = (x[:, 0] - mu0) / scale_delta_mu
+
+    if a0 is None:
+        a0 = np.ones(m)
+    else:
+        a0 = np.asarray(a0, dtype=np.float64)
+        if a0.size != m:
+            msg = "Size of a0 is incompatible with data array x."
+            raise ValueError(msg)
+
+    epsilon0 = (a0[1:] - 1.0) / (a0[0] * scale_delta_a)
+
+    if eta0 is None:
+        eta0 = np.zeros(m)
+    else:
+        eta0 = np.asarray(eta0, dtype=np.float64)
+        if eta0.size != m:
+            msg = "Size of eta0 is incompatible with data array x."
+            raise ValueError(msg)
+
+    eta_scaled0 = eta0[1:] / scale_eta
+
+    # Set initial guesses for all free parameters
+    x0 = np.array([], dtype=np.float64)
+    if not fix_sigma_alpha:
+        x0 = np.append(x0, logv0_scaled[0])
+    if not fix_sigma_beta:
+        x0 = np.append(x0, logv0_scaled[1])
+    if not fix_sigma_tau:
+        x0 = np.append(x0, logv0_scaled[2])
+    if not fix_mu:
+        x0 = np.concatenate((x0, delta0))
+    if not fix_a:
+        x0 = np.concatenate((x0, epsilon0))
+    if not fix_eta:
+        x0 = np.concatenate((x0, eta_scaled0))
+
+    # Keyword arguments shared by the cost function and its derivatives
+    scale_kwargs: dict[str, Any] = {
+        "scale_logv_alpha": scale_logv_alpha,
+        "scale_logv_beta": scale_logv_beta,
+        "scale_logv_tau": scale_logv_tau,
+        "scale_delta_mu": scale_delta_mu,
+        "scale_delta_a": scale_delta_a,
+        "scale_eta_on_dt": scale_eta / dt,  # Scale in units of dt
+    }
+    fix_kwargs: dict[str, Any] = {
+        "fix_logv_alpha": fix_sigma_alpha,
+        "fix_logv_beta": fix_sigma_beta,
+        "fix_logv_tau": fix_sigma_tau,
+        "fix_delta_mu": fix_mu,
+        "fix_delta_a": fix_a,
+        "fix_eta": fix_eta,
+    }
+
+    # Split free parameters into the arguments of the cost function
+    def unpack(_p: NDArray[np.float64]) -> dict[str, Any]:
+        if fix_sigma_alpha:
+            _logv_alpha = logv0_scaled[0]
+        else:
+            _logv_alpha = _p[0]
+            _p = _p[1:]
+        if fix_sigma_beta:
+            _logv_beta = logv0_scaled[1]
+        else:
+            _logv_beta = _p[0]
+            _p = _p[1:]
+        if fix_sigma_tau:
+            _logv_tau = logv0_scaled[2]
+        else:
+            _logv_tau = _p[0]
+            _p = _p[1:]
+        if fix_mu:
+            _delta = delta0
+        else:
+            _delta = _p[:n]
+            _p = _p[n:]
+        if fix_a:
+            _epsilon = epsilon0
+        else:
+            _epsilon = _p[: m - 1]
+            _p = _p[m - 1 :]
+
+        _eta = eta_scaled0 if fix_eta else _p[: m - 1]
+
+        return {
+            "logv_alpha_scaled": _logv_alpha,
+            "logv_beta_scaled": _logv_beta,
+            "logv_tau_scaled": _logv_tau,
+            "delta_mu_scaled": _delta,
+            "delta_a_scaled": _epsilon,
+            "eta_on_dt_scaled": _eta,
+        }
+
+    # Cache the intermediate variables for the most recent parameter vector,
+    # so that the objective and its derivatives share one pass through
+    # _nll_common when evaluated at the same point
+    cache_p: list[NDArray[np.float64]] = []
+    cache_kwargs: dict[str, Any] = {}
+
+    # The delay phase factors are the same at every point of the fit when
+    # the delays are held fixed, so compute them once
+    exp_iweta0 = (
+        _delay_phase(
+            np.insert(eta_scaled0 * scale_kwargs["scale_eta_on_dt"], 0, 0.0), n
+        )
+        if fix_eta
+        else None
+    )
+
+    def unpack_common(_p: NDArray[np.float64]) -> dict[str, Any]:
+        if not cache_p or not np.array_equal(cache_p[0], _p):
+            cache_p[:] = [np.array(_p, dtype=np.float64)]
+            params = unpack(cache_p[0])
+            cache_kwargs.clear()
+            cache_kwargs.update(params)
+            cache_kwargs["common"] = _nll_common(
+                x.T, **params, **scale_kwargs, exp_iweta=exp_iweta0
+            )
+        return cache_kwargs
+
+    # Bundle free parameters together into objective function
+    def objective(_p: NDArray[np.float64]) -> np.float64:
+        return _nll_noisefit(x.T, **unpack_common(_p), **scale_kwargs)
+
+    def jac(_p: NDArray[np.float64]) -> NDArray[np.float64]:
+        return _jac_noisefit(
+            x.T, **unpack_common(_p), **fix_kwargs, **scale_kwargs
+        )
+
+    def hess(_p: NDArray[np.float64]) -> NDArray[np.float64]:
+        return _hess_noisefit(
+            x.T, **unpack_common(_p), **fix_kwargs, **scale_kwargs
+        )
+
+    def hessp(
+        _p: NDArray[np.float64], _v: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        return _hessp_noisefit(
+            x.T, **unpack_common(_p), v=_v, **fix_kwargs, **scale_kwargs
+        )
+
+    if shards is not None:
+        # Evaluate the objective and gradient together over the shards of
+        # waveforms, and cache the result for the most recent input
+        free_logv = [
+            not fix_sigma_alpha,
+            not fix_sigma_beta,
+            not fix_sigma_tau,
+        ]
+        sharded_p: list[NDArray[np.float64]] = []
+        sharded_out: list[tuple[np.float64, NDArray[np.float64]]] = []
+
+        def evaluate_sharded(
+            _p: NDArray[np.float64],
+        ) -> tuple[np.float64, NDArray[np.float64]]:
+            if not sharded_p or not np.array_equal(sharded_p[0], _p):
+                params = unpack(_p)
+                logv = scale_logv * np.array(
+                    [
+                        params["logv_alpha_scaled"],
+                        params["logv_beta_scaled"],
+                        params["logv_tau_scaled"],
+                    ]
+                )
+                mu = x[:, 0] - params["delta_mu_scaled"] * scale_delta_mu
+                a = 1.0 + np.concatenate(
+                    ([0.0], params["delta_a_scaled"] * scale_delta_a)
+                )
+                eta_on_dt = np.concatenate(
+                    ([0.0], params["eta_on_dt_scaled"] * scale_eta / dt)
+                )
+                nll, jac_logv, jac_mu, jac_a, jac_eta = shards.evaluate(
+                    logv, mu, a, eta_on_dt
+                )
+                # Exclude first terms of a and eta, which are held fixed
+                jac_scaled = np.concatenate(
+                    (
+                        (jac_logv * scale_logv)[free_logv],
+                        [] if fix_mu else -jac_mu * scale_delta_mu,
+                        [] if fix_a else jac_a[1:] * scale_delta_a,
+                        [] if fix_eta else jac_eta[1:] * scale_eta / dt,
+                    )
+                )
+                sharded_p[:] = [np.array(_p, dtype=np.float64)]
+                sharded_out[:] = [(np.float64(nll), jac_scaled)]
+            return sharded_out[0]
+
+        def objective_sharded(_p: NDArray[np.float64]) -> np.float64:
+            return evaluate_sharded(_p)[0]
+
+        def jac_sharded(_p: NDArray[np.float64]) -> NDArray[np.float64]:
+            return evaluate_sharded(_p)[1]
+
+    input_parsed = {
+        "sigma_alpha0": sigma_alpha0,
+        "sigma_beta0": sigma_beta0,
+        "sigma_tau0": sigma_tau0,
+        "mu0": mu0,
+        "a0": a0,
+        "eta0": eta0,
+        "fix_sigma_alpha": fix_sigma_alpha,
+        "fix_sigma_beta": fix_sigma_beta,
+        "fix_sigma_tau": fix_sigma_tau,
+        "fix_mu": fix_mu,
+        "fix_a": fix_a,
+        "fix_eta": fix_eta,
+        "scale_logv_alpha": scale_logv_alpha,
+        "scale_logv_beta": scale_logv_beta,
+        "scale_logv_tau": scale_logv_tau,
+        "scale_delta_mu": scale_delta_mu,
+        "scale_delta_a": scale_delta_a,
+        "scale_eta": scale_eta,
+        "hess": hess,
+        "hessp": hessp,
+        "unpack": unpack,
+    }
+    if shards is not None:
+        return objective_sharded, jac_sharded, x0, input_parsed
+    return objective, jac, x0, input_parsed
+
+
+def _noisefit_model(
+    mu: NDArray[np.float64],
+    a: NDArray[np.float64],
+    eta_on_dt: NDArray[np.float64],
+) -> tuple[
+    NDArray[np.complex128],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]:
+    """Delay factors, waveforms, and their first two time derivatives"""
+    n = mu.size
+    w = 2 * pi * _rfftfreq(n)
+    exp_iweta = _delay_phase(eta_on_dt, n)
+    zeta_f = a[:, np.newaxis] * np.conj(exp_iweta) * _rfft(mu)
+    return (
+        exp_iweta,
+        _irfft(zeta_f, n=n),
+        _irfft(1j * w * zeta_f, n=n),
+        _irfft(-(w**2) * zeta_f, n=n),
+    )
+
+
+def _nll_rows_noisefit(
+    x: NDArray[np.float64],
+    v: NDArray[np.float64],
+    zeta: NDArray[np.float64],
+    dzeta: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Noisefit cost function for each row of x"""
+    vtot = v[0] + v[1] * zeta**2 + v[2] * dzeta**2
+    return np.asarray(
+        0.5 * np.sum(np.log(vtot) + (x - zeta) ** 2 / vtot, axis=1),
+        dtype=np.float64,
+    )
+
+
+def _fisher_step_drift(
+    x: NDArray[np.float64],
+    v: NDArray[np.float64],
+    mu: NDArray[np.float64],
+    a: NDArray[np.float64],
+    eta_on_dt: NDArray[np.float64],
+    zeta: NDArray[np.float64],
+    dzeta: NDArray[np.float64],
+    ddzeta: NDArray[np.float64],
+    *,
+    free_drift: NDArray[np.bool_],
+    active: NDArray[np.bool_],
+    max_backtrack: int = 30,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], int]:
+    r"""
+    Update the drift parameters with a Fisher scoring step.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data array with shape (m, n), row-oriented.
+    v : ndarray
+        Noise variance parameters with shape (3,), with ``sigma_tau``
+        expressed in units of the sampling time.
+    mu : ndarray
+        Signal vector with shape (n,).
+    a, eta_on_dt : ndarray
+        Amplitude and delay drift vectors with shape (m,), with the delay
+        expressed in units of the sampling time.
+    zeta, dzeta, ddzeta : ndarray
+        Output of `_noisefit_model` for ``mu``, ``a``, and ``eta_on_dt``.
+    free_drift : ndarray
+        Boolean array with shape (2,) indicating whether the amplitude and
+        delay drift parameters are free.
+    active : ndarray
+        Boolean array with shape (m,) indicating the waveforms to update.
+    max_backtrack : int, optional
+        Maximum number of step halvings in the line search. Default is 30.
+
+    Returns
+    -------
+    a, eta_on_dt : ndarray
+        Updated drift vectors.
+    nfev : int
+        Number of model evaluations in the line search.
+
+    Notes
+    -----
+    With the other parameters held fixed, the drift parameters of different
+    waveforms are decoupled, so the step is obtained from :math:`M`
+    independent :math:`2\times 2` systems, with a separate backtracking line
+    search for each waveform.
+    """
+    m = x.shape[0]
+    a = np.array(a, dtype=np.float64)
+    eta_on_dt = np.array(eta_on_dt, dtype=np.float64)
+    active = np.array(active, dtype=bool)
+
+    vtot = v[0] + v[1] * zeta**2 + v[2] * dzeta**2
+    res = x - zeta
+    dvar = (vtot - res**2) / vtot**2
+    dnll_dzeta = v[1] * dvar * zeta - res / vtot
+    dnll_ddzeta = v[2] * dvar * dzeta
+    grad = np.stack(
+        (
+            np.sum(dnll_dzeta * zeta + dnll_ddzeta * dzeta, axis=1) / a,
+            -np.sum(dnll_dzeta * dzeta + dnll_ddzeta * ddzeta, axis=1),
+        ),
+        axis=1,
+    )
+    dzeta_dtheta = np.stack((zeta / a[:, np.newaxis], -dzeta))
+    dlogvtot_dtheta = np.stack(
+        (
+            2 * (vtot - v[0]) / (a[:, np.newaxis] * vtot),
+            -2 * (v[1] * zeta * dzeta + v[2] * dzeta * ddzeta) / vtot,
+        )
+    )
+    fisher = np.einsum(
+        "imn,jmn->mij", dzeta_dtheta, dzeta_dtheta / vtot
+    ) + 0.5 * np.einsum("imn,jmn->mij", dlogvtot_dtheta, dlogvtot_dtheta)
+    fisher = fisher[:, free_drift][:, :, free_drift]
+    step = np.zeros((m, 2))
+    step[:, free_drift] = -np.linalg.solve(
+        fisher, grad[:, free_drift, np.newaxis]
+    )[..., 0]
+
+    # Skip waveforms for which the predicted decrease in the cost function
+    # is below its rounding error
+    nll0 = _nll_rows_noisefit(x, v, zeta, dzeta)
+    decrease = -0.5 * np.sum(grad * step, axis=1)
+    active &= decrease > x.shape[1] * np.finfo(float).eps * np.abs(nll0)
+    nfev = 0
+    for _ in range(max_backtrack):
+        if not np.any(active):
+            break
+        a_trial = a + step[:, 0] * active
+        eta_trial = eta_on_dt + step[:, 1] * active
+        _, zeta_trial, dzeta_trial, _ = _noisefit_model(mu, a_trial, eta_trial)
+        nfev += 1
+        accept = active & (
+            _nll_rows_noisefit(x, v, zeta_trial, dzeta_trial) < nll0
+        )
+        a[accept] = a_trial[accept]
+        eta_on_dt[accept] = eta_trial[accept]
+        active &= ~accept
+        step = step / 2
+
+    return a, eta_on_dt, nfev
+
+
+def _minimize_noisefit_block(
+    x: NDArray[np.float64],
+    x0: NDArray[np.float64],
+    *,
+    dt: float,
+    unpack: Callable[[NDArray[np.float64]], dict[str, Any]],
+    objective: Callable[[NDArray[np.float64]], np.float64],
+    jac: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta: NDArray[np.float64],
+    gtol: float,
+    maxiter: int = 1000,
+    callback: Callable[[NDArray[np.float64]], None] | None = None,
+    baseline: _NoiseFitBaseline | None = None,
+) -> OptimizeResult:
+    r"""
+    Minimize the noisefit cost function by block-coordinate descent.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data array with shape (n, m).
+    x0 : ndarray
+        Initial scaled parameter vector, as returned by
+        `_parse_noisefit_input`.
+    dt : float
+        Sampling time.
+    unpack : callable
+        Function that splits a scaled parameter vector into the scaled
+        arguments of `_nll_noisefit`.
+    objective, jac : callable
+        Cost function and its gradient with respect to the scaled
+        parameters.
+    fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau, fix_mu, fix_a, fix_eta
+        Parameters that are held fixed.
+    scale_logv_alpha, scale_logv_beta, scale_logv_tau, scale_delta_mu,
+    scale_delta_a, scale_eta
+        Parameter scales used by `_parse_noisefit_input`.
+    gtol : float
+        Terminate when the maximum absolute value of the scaled gradient is
+        less than ``gtol``.
+    maxiter : int, optional
+        Maximum number of sweeps. Default is 1000.
+    callback : callable or None, optional
+        Function called after each sweep with the current scaled parameter
+        vector. Default is None.
+    baseline : _NoiseFitBaseline or None, optional
+        Statistics of the samples outside the region of interest, which
+        contribute to the cost function through ``sigma_alpha`` only.
+        Default is None.
+
+    Returns
+    -------
+    res : OptimizeResult
+        Optimization result, with ``x`` and ``jac`` expressed in terms of
+        the scaled parameters.
+
+    Notes
+    -----
+    Each sweep updates the free noise parameters, the signal vector, and
+    the drift parameters in turn, holding the other blocks fixed. Each
+    update is a Fisher scoring step followed by a backtracking line search.
+    The Fisher information of the data with respect to a parameter vector
+    :math:`\boldsymbol{\theta}` is
+
+    .. math:: I_{ij} = \sum_{k, l}\left[\frac{1}{\sigma_{kl}^2}
+        \frac{\partial Z_{kl}}{\partial\theta_i}
+        \frac{\partial Z_{kl}}{\partial\theta_j} + \frac{1}{2}
+        \frac{\partial\ln\sigma_{kl}^2}{\partial\theta_i}
+        \frac{\partial\ln\sigma_{kl}^2}{\partial\theta_j}\right],
+
+    which is positive semidefinite, so that each step is a descent
+    direction. The noise parameter step solves a system with at most three
+    unknowns. The signal vector step solves the :math:`N`-dimensional system
+    with the preconditioned conjugate gradient method, using products with
+    the Fisher information that are computed with FFTs. The drift parameters
+    of different waveforms are decoupled when the other blocks are fixed, so
+    their steps are obtained from :math:`M` independent :math:`2\times 2`
+    systems, with a separate line search for each waveform. Each sweep
+    requires :math:`O(MN\log N)` operations and :math:`O(MN)` memory.
+    """
+    messages = {
+        0: "Optimization terminated successfully.",
+        1: "Maximum number of iterations has been exceeded.",
+    }
+    max_backtrack = 30
+    max_cg = 50
+
+    x_rows = x.T
+    m, n = x_rows.shape
+    w = 2 * pi * _rfftfreq(n)
+
+    # Convert the initial parameters to unscaled form
+    params = unpack(x0)
+    scale_logv = np.array([scale_logv_alpha, scale_logv_beta, scale_logv_tau])
+    scale_eta_on_dt = scale_eta / dt
+    logv = scale_logv * np.array(
+        [
+            params["logv_alpha_scaled"],
+            params["logv_beta_scaled"],
+            params["logv_tau_scaled"],
+        ],
+        dtype=np.float64,
+    )
+    mu = x_rows[0] - params["delta_mu_scaled"] * scale_delta_mu
+    a = 1.0 + np.insert(params["delta_a_scaled"] * scale_delta_a, 0, 0.0)
+    eta_on_dt = np.insert(params["eta_on_dt_scaled"] * scale_eta_on_dt, 0, 0.0)
+
+    free_logv = ~np.array([fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau])
+    free_drift = ~np.array([fix_a, fix_eta])
+
+    def pack() -> NDArray[np.float64]:
+        return np.concatenate(
+            [
+                (logv / scale_logv)[free_logv],
+                [] if fix_mu else (x_rows[0] - mu) / scale_delta_mu,
+                [] if fix_a else (a[1:] - 1.0) / scale_delta_a,
+                [] if fix_eta else eta_on_dt[1:] / scale_eta_on_dt,
+            ]
+        )
+
+    def adjoint(
+        _exp_iweta: NDArray[np.complex128],
+        _a: NDArray[np.float64],
+        u: NDArray[np.float64],
+        du: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        # Transpose of the map from mu to (zeta, dzeta)
+        u_f = _rfft(u) - 1j * w * _rfft(du)
+        return np.asarray(
+            np.sum(_irfft(_exp_iweta * u_f, n=n) * _a[:, np.newaxis], axis=0),
+            dtype=np.float64,
+        )
+
+    def fisher_dot(
+        u: NDArray[np.float64],
+        _exp_iweta: NDArray[np.complex128],
+        _a: NDArray[np.float64],
+        _v: NDArray[np.float64],
+        _vtot: NDArray[np.float64],
+        _zeta: NDArray[np.float64],
+        _dzeta: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        # Product of the Fisher information for mu with u
+        u_f = _a[:, np.newaxis] * np.conj(_exp_iweta) * _rfft(u)
+        du = _irfft(u_f, n=n)
+        ddu = _irfft(1j * w * u_f, n=n)
+        dlogvtot = 2 * (_v[1] * _zeta * du + _v[2] * _dzeta * ddu) / _vtot
+        return adjoint(
+            _exp_iweta,
+            _a,
+            (du + _v[1] * _zeta * dlogvtot) / _vtot,
+            _v[2] * _dzeta * dlogvtot / _vtot,
+        )
+
+    status = 1
+    nit = 0
+    nfev = 0
+    while nit < maxiter:
+        p = pack()
+        if np.max(np.abs(jac(p)), initial=0.0) <= gtol:
+            status = 0
+            break
+        nit += 1
+
+        # Noise parameters
+        exp_iweta, zeta, dzeta, ddzeta = _noisefit_model(mu, a, eta_on_dt)
+        nfev += 1
+        if np.any(free_logv):
+            ressq = (x_rows - zeta) ** 2
+            terms = np.stack((np.ones_like(zeta), zeta**2, dzeta**2))
+            v = np.exp(logv)
+            vtot = np.tensordot(v, terms, axes=1)
+            dlogv_dlogv = (v[:, np.newaxis, np.newaxis] * terms / vtot)[
+                free_logv
+            ]
+            grad = 0.5 * np.sum(dlogv_dlogv * (1 - ressq / vtot), axis=(1, 2))
+            fisher = 0.5 * np.tensordot(
+                dlogv_dlogv, dlogv_dlogv, axes=((1, 2), (1, 2))
+            )
+            f0 = np.sum(_nll_rows_noisefit(x_rows, v, zeta, dzeta))
+            if baseline is not None:
+                f0 += baseline.nll(logv[0])[0]
+                if free_logv[0]:
+                    grad[0] += baseline.nll(logv[0])[1]
+                    fisher[0, 0] += 0.5 * baseline.count
+            step = np.zeros(NUM_NOISE_PARAMETERS)
+            step[free_logv] = -np.linalg.solve(fisher, grad)
+            for _ in range(max_backtrack):
+                v_trial = np.exp(logv + step)
+                f_trial = np.sum(
+                    _nll_rows_noisefit(x_rows, v_trial, zeta, dzeta)
+                )
+                if baseline is not None:
+                    f_trial += baseline.nll(logv[0] + step[0])[0]
+                if f_trial < f0:
+                    logv = logv + step
+                    break
+                step = step / 2
+
+        v = np.exp(logv)
+        vtot = v[0] + v[1] * zeta**2 + v[2] * dzeta**2
+
+        # Signal vector
+        if not fix_mu:
+            res = x_rows - zeta
+            dvar = (vtot - res**2) / vtot**2
+
+            grad = adjoint(
+                exp_iweta,
+                a,
+                v[1] * dvar * zeta - res / vtot,
+                v[2] * dvar * dzeta,
+            )
+            precond = np.sum(
+                a[:, np.newaxis] ** 2
+                * (1 + 2 * v[1] ** 2 * zeta**2 / vtot)
+                / vtot,
+                axis=0,
+            )
+
+            # Preconditioned conjugate gradient solution of fisher @ step
+            # = -grad, to a relative tolerance that tightens as the
+            # gradient decreases
+            step = np.zeros(n)
+            r = -grad
+            z = r / precond
+            d = z
+            rz = r @ z
+            tol = min(0.5, np.sqrt(np.linalg.norm(grad))) * np.linalg.norm(
+                grad
+            )
+            for _ in range(max_cg):
+                fd = fisher_dot(d, exp_iweta, a, v, vtot, zeta, dzeta)
+                curv = d @ fd
+                if curv <= 0:
+                    break
+                alpha = rz / curv
+                step = step + alpha * d
+                r = r - alpha * fd
+                if np.linalg.norm(r) <= tol:
+                    break
+                z = r / precond
+                rz_new = r @ z
+                d = z + (rz_new / rz) * d
+                rz = rz_new
+            if not np.any(step):
+                step = -grad / precond
+
+            f0 = np.sum(_nll_rows_noisefit(x_rows, v, zeta, dzeta))
+            for _ in range(max_backtrack):
+                exp_iweta, zeta, dzeta, ddzeta = _noisefit_model(
+                    mu + step, a, eta_on_dt
+                )
+                nfev += 1
+                if np.sum(_nll_rows_noisefit(x_rows, v, zeta, dzeta)) < f0:
+                    mu = mu + step
+                    break
+                step = step / 2
+            else:
+                exp_iweta, zeta, dzeta, ddzeta = _noisefit_model(
+                    mu, a, eta_on_dt
+                )
+            vtot = v[0] + v[1] * zeta**2 + v[2] * dzeta**2
+
+        # Drift parameters, excluding the first waveform
+        if np.any(free_drift):
+            active = np.ones(m, dtype=bool)
+            active[0] = False
+            a, eta_on_dt, nfev_drift = _fisher_step_drift(
+                x_rows,
+                v,
+                mu,
+                a,
+                eta_on_dt,
+                zeta,
+                dzeta,
+                ddzeta,
+                free_drift=free_drift,
+                active=active,
+            )
+            nfev += nfev_drift
+
+        if callback is not None:
+            callback(pack())
+
+    p = pack()
+    return OptimizeResult(
+        x=p,
+        fun=float(objective(p)),
+        jac=jac(p),
+        nit=nit,
+        nfev=nfev,
+        status=status,
+        success=status == 0,
+        message=messages[status],
+    )
+
+
+def _minimize_noisefit_noise(
+    x: NDArray[np.float64],
+    x0: NDArray[np.float64],
+    *,
+    dt: float,
+    unpack: Callable[[NDArray[np.float64]], dict[str, Any]],
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta: NDArray[np.float64],
+    gtol: float,
+    maxiter: int = 100,
+    callback: Callable[[NDArray[np.float64]], None] | None = None,
+    baseline: _NoiseFitBaseline | None = None,
+) -> OptimizeResult:
+    r"""
+    Minimize the noisefit cost function over the noise parameters only.
+
+    Parameters
+    ----------
+    x : ndarray
+        Data array with shape (n, m).
+    x0 : ndarray
+        Initial scaled parameter vector, as returned by
+        `_parse_noisefit_input`, which contains only the free noise
+        parameters.
+    dt : float
+        Sampling time.
+    unpack : callable
+        Function that splits a scaled parameter vector into the scaled
+        arguments of `_nll_noisefit`.
+    fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau : bool
+        Noise parameters that are held fixed.
+    fix_mu, fix_a, fix_eta : bool
+        Signal and drift parameters, which are held fixed and must all be
+        ``True``.
+    scale_logv_alpha, scale_logv_beta, scale_logv_tau, scale_delta_mu,
+    scale_delta_a, scale_eta
+        Parameter scales used by `_parse_noisefit_input`.
+    gtol : float
+        Terminate when the maximum absolute value of the scaled gradient is
+        less than ``gtol``.
+    maxiter : int, optional
+        Maximum number of Newton iterations. Default is 100.
+    callback : callable or None, optional
+        Function called after each iteration with the current scaled
+        parameter vector. Default is None.
+    baseline : _NoiseFitBaseline or None, optional
+        Statistics of the samples outside the region of interest, which
+        contribute to the cost function through ``sigma_alpha`` only.
+        Default is None.
+
+    Returns
+    -------
+    res : OptimizeResult
+        Optimization result, with ``x``, ``jac``, and ``hess_inv`` expressed
+        in terms of the scaled parameters.
+
+    Notes
+    -----
+    With the signal vector and the drift parameters held fixed, the model
+    waveforms :math:`\zeta_{kl}` and their time derivatives
+    :math:`\dot{\zeta}_{kl}` are computed once, and the cost function
+    depends on the log-variances :math:`u_j = \ln\sigma_j^2` only through
+
+    .. math:: \sigma_{kl}^2 = e^{u_\alpha} + e^{u_\beta}\zeta_{kl}^2
+        + e^{u_\tau}\dot{\zeta}_{kl}^2.
+
+    When all waveforms share the same amplitude and delay, the model is the
+    same for every waveform, and the squared residuals enter only through
+    their sums over waveforms, so each evaluation requires :math:`O(N)`
+    operations; otherwise it requires :math:`O(MN)` operations, without
+    FFTs. Each iteration is a Newton step for at most three parameters,
+    with the Hessian eigenvalues replaced by their absolute values to
+    ensure descent, followed by a backtracking line search.
+    """
+    messages = {
+        0: "Optimization terminated successfully.",
+        1: "Maximum number of iterations has been exceeded.",
+        2: "Desired error not necessarily achieved due to precision loss.",
+    }
+    max_backtrack = 30
+    max_dlogv = 2.0
+
+    x_rows = x.T
+    m, n = x_rows.shape
+
+    # Convert the initial parameters to unscaled form
+    params = unpack(x0)
+    scale_logv = np.array([scale_logv_alpha, scale_logv_beta, scale_logv_tau])
+    logv = scale_logv * np.array(
+        [
+            params["logv_alpha_scaled"],
+            params["logv_beta_scaled"],
+            params["logv_tau_scaled"],
+        ],
+        dtype=np.float64,
+    )
+    mu = x_rows[0] - params["delta_mu_scaled"] * scale_delta_mu
+    a = 1.0 + np.insert(params["delta_a_scaled"] * scale_delta_a, 0, 0.0)
+    eta_on_dt = np.insert(params["eta_on_dt_scaled"] * scale_eta / dt, 0, 0.0)
+
+    free = ~np.array([fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau])
+    scale_free = scale_logv[free]
+
+    # Precompute the sums on which the cost function depends
+    _, zeta, dzeta, _ = _noisefit_model(mu, a, eta_on_dt)
+    ressq = (x_rows - zeta) ** 2
+    if np.all(a == 1.0) and np.all(eta_on_dt == 0.0):
+        count = np.full(n, float(m))
+        ressq = np.sum(ressq, axis=0)
+        terms = np.stack((np.ones(n), zeta[0] ** 2, dzeta[0] ** 2))
+    else:
+        count = np.ones(m * n)
+        ressq = ressq.ravel()
+        terms = np.stack(
+            (np.ones(m * n), zeta.ravel() ** 2, dzeta.ravel() ** 2)
+        )
+
+    # The samples outside the region of interest enter as one term with
+    # variance sigma_alpha**2
+    if baseline is not None:
+        count = np.append(count, float(baseline.count))
+        ressq = np.append(ressq, baseline.ssr)
+        terms = np.column_stack((terms, [1.0, 0.0, 0.0]))
+
+    def evaluate(
+        _logv: NDArray[np.float64],
+    ) -> tuple[float, NDArray[np.float64], NDArray[np.float64]]:
+        # Cost function, gradient, and Hessian with respect to the scaled
+        # free parameters
+        v = np.exp(_logv)
+        vtot = v @ terms
+        fun = 0.5 * float(np.sum(count * np.log(vtot) + ressq / vtot))
+        dvar = (count - ressq / vtot) / vtot
+        ddvar = (2 * ressq / vtot - count) / vtot**2
+        grad = 0.5 * v * (terms @ dvar)
+        hess = 0.5 * np.outer(v, v) * ((terms * ddvar) @ terms.T) + np.diag(
+            grad
+        )
+        return (
+            fun,
+            grad[free] * scale_free,
+            hess[np.ix_(free, free)] * np.outer(scale_free, scale_free),
+        )
+
+    status = 1
+    nit = 0
+    nfev = 1
+    fun, grad, hess = evaluate(logv)
+    while True:
+        if np.max(np.abs(grad), initial=0.0) <= gtol:
+            status = 0
+            break
+        if nit >= maxiter:
+            break
+        nit += 1
+
+        # Limit the change in each log-variance, so that a step along a
+        # direction of small curvature does not overflow
+        lam, vec = np.linalg.eigh(hess)
+        lam = np.maximum(np.abs(lam), 1e-8 * np.max(np.abs(lam)))
+        step = -vec @ ((vec.T @ grad) / lam)
+        step = step / max(1.0, np.max(np.abs(step * scale_free)) / max_dlogv)
+        for _ in range(max_backtrack):
+            logv_trial = logv.copy()
+            logv_trial[free] += step * scale_free
+            fun_trial, grad_trial, hess_trial = evaluate(logv_trial)
+            nfev += 1
+            if np.isfinite(fun_trial) and fun_trial < fun + 1e-4 * (
+                grad @ step
+            ):
+                logv = logv_trial
+                fun, grad, hess = fun_trial, grad_trial, hess_trial
+                break
+            step = step / 2
+        else:
+            status = 2
+            break
+
+        if callback is not None:
+            callback((logv / scale_logv)[free])
+
+    return OptimizeResult(
+        x=(logv / scale_logv)[free],
+        fun=fun,
+        jac=grad,
+        hess_inv=np.linalg.pinv(hess),
+        nit=nit,
+        nfev=nfev,
+        njev=nfev,
+        status=status,
+        success=status == 0,
+        message=messages[status],
+    )
+
+
+@dataclass
+class _BlockArrow:
+    r"""
+    Symmetric block-arrow matrix.
+
+    The matrix has the block structure ``[[P, Q], [Q.T, D]]``, where ``P``
+    is a dense square block and ``D`` is a square array of equal-sized
+    diagonal blocks, which is stored without its zero entries.
+
+    Parameters
+    ----------
+    dense : ndarray
+        Dense block ``P``, with shape (p, p).
+    coupling : ndarray
+        Coupling block ``Q``, with shape (p, k * q), where ``k`` is the
+        number of diagonal blocks along each dimension of ``D`` and ``q`` is
+        their size.
+    diag : ndarray
+        Diagonals of the blocks of ``D``, as a stack of ``k`` by ``k``
+        matrices with shape (q, k, k), one for each index within the blocks.
+    """
+
+    dense: NDArray[np.float64]
+    coupling: NDArray[np.float64]
+    diag: NDArray[np.float64]
+
+    @classmethod
+    def from_matrix(
+        cls, h: NDArray[np.float64], num_dense: int, num_diag_blocks: int
+    ) -> _BlockArrow:
+        """Extract the blocks of a dense block-arrow matrix"""
+        p = num_dense
+        k = num_diag_blocks
+        q = (h.shape[0] - p) // k if k > 0 else 0
+        diag = np.empty((q, k, k))
+        for i in range(k):
+            for j in range(k):
+                diag[:, i, j] = np.diag(
+                    h[p + i * q : p + (i + 1) * q, p + j * q : p + (j + 1) * q]
+                )
+        return cls(h[:p, :p], h[:p, p:], diag)
+
+    @property
+    def size(self) -> int:
+        """Number of rows of the matrix"""
+        return int(self.dense.shape[0] + self.coupling.shape[1])
+
+    def todense(self) -> NDArray[np.float64]:
+        """Dense matrix"""
+        p = self.dense.shape[0]
+        q, k, _ = self.diag.shape
+        h = np.zeros((self.size, self.size))
+        h[:p, :p] = self.dense
+        h[:p, p:] = self.coupling
+        h[p:, :p] = self.coupling.T
+        idx = np.arange(q)
+        for i in range(k):
+            for j in range(k):
+                h[p + i * q + idx, p + j * q + idx] = self.diag[:, i, j]
+        return h
+
+
+def _inv_block_arrow(h: _BlockArrow) -> NDArray[np.float64]:
+    r"""
+    Invert a symmetric block-arrow matrix.
+
+    Parameters
+    ----------
+    h : _BlockArrow
+        Symmetric matrix with the block structure ``[[P, Q], [Q.T, D]]``,
+        where ``P`` is a dense square block and ``D`` is a square array of
+        equal-sized diagonal blocks.
+
+    Returns
+    -------
+    h_inv : ndarray
+        Inverse of ``h``.
+
+    Notes
+    -----
+    The diagonal blocks are eliminated with a Schur complement, so that only
+    the dense Schur complement :math:`S = P - Q D^{-1} Q^\mathsf{T}` requires
+    a dense factorization. With :math:`W = Q D^{-1}`, the inverse is
+
+    .. math:: \begin{bmatrix} S^{-1} & -S^{-1} W \\
+        -W^\mathsf{T} S^{-1} & D^{-1} + W^\mathsf{T} S^{-1} W
+        \end{bmatrix}.
+    """
+    p = h.dense.shape[0]
+    q, k, _ = h.diag.shape
+    if k == 0:
+        return np.asarray(np.linalg.inv(h.dense), dtype=np.float64)
+    d_inv, wt = _block_arrow_factors(h)
+
+    # D^{-1} as a dense matrix
+    h_inv = np.zeros((h.size, h.size))
+    idx = np.arange(q)
+    for i in range(k):
+        for j in range(k):
+            h_inv[p + i * q + idx, p + j * q + idx] = d_inv[:, i, j]
+
+    if p > 0:
+        s_inv = np.linalg.inv(h.dense - h.coupling @ wt)
+        s_inv_w = s_inv @ wt.T
+        h_inv[:p, :p] = s_inv
+        h_inv[:p, p:] = -s_inv_w
+        h_inv[p:, :p] = -s_inv_w.T
+        h_inv[p:, p:] += wt @ s_inv_w
+
+    return h_inv
+
+
+def _block_arrow_factors(
+    h: _BlockArrow,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Inverse diagonal blocks and W^T = D^{-1} Q^T of a block-arrow matrix
+
+    The inverse of ``D`` is returned as a stack of ``k`` by ``k`` matrices,
+    one for each index within the blocks.
+    """
+    p = h.dense.shape[0]
+    q, k, _ = h.diag.shape
+    d_inv = np.asarray(np.linalg.inv(h.diag), dtype=np.float64)
+
+    # W^T = D^{-1} Q^T, with rows grouped as (block, index)
+    qt = h.coupling.T.reshape(k, q, p).transpose(1, 0, 2)
+    wt = (d_inv @ qt).transpose(1, 0, 2).reshape(k * q, p)
+    return d_inv, wt
+
+
+def _inv_block_arrow_diag(h: _BlockArrow) -> NDArray[np.float64]:
+    r"""
+    Compute the diagonal of the inverse of a symmetric block-arrow matrix.
+
+    Parameters
+    ----------
+    h : _BlockArrow
+        Symmetric matrix with the block structure described in
+        `_inv_block_arrow`.
+
+    Returns
+    -------
+    h_inv_diag : ndarray
+        Diagonal of the inverse of ``h``.
+
+    Notes
+    -----
+    Only the selected entries of the inverse given in `_inv_block_arrow`
+    are computed. The diagonal of
+    :math:`D^{-1} + W^\mathsf{T} S^{-1} W` is obtained from the row sums
+    of :math:`W^\mathsf{T} \odot (W^\mathsf{T} S^{-1})`, so that the
+    memory required in addition to the blocks of ``h`` is dominated by the
+    dense Schur complement and by :math:`W`, rather than by the full
+    inverse or the full matrix.
+    """
+    p = h.dense.shape[0]
+    k = h.diag.shape[1]
+    if k == 0:
+        return np.asarray(np.diag(np.linalg.inv(h.dense)), dtype=np.float64)
+    d_inv, wt = _block_arrow_factors(h)
+
+    # Diagonal of D^{-1}, ordered as (block, index)
+    h_inv_diag = np.diagonal(d_inv, axis1=1, axis2=2).T.reshape(-1)
+    if p == 0:
+        return np.asarray(h_inv_diag, dtype=np.float64)
+
+    s_inv = np.linalg.inv(h.dense - h.coupling @ wt)
+    return np.concatenate(
+        (np.diag(s_inv), h_inv_diag + np.sum((wt @ s_inv) * wt, axis=1))
+    )
+
+
+def _solve_block_arrow(
+    h: _BlockArrow,
+) -> Callable[[NDArray[np.float64]], NDArray[np.float64]]:
+    """Solver for linear systems with a symmetric block-arrow matrix
+
+    Returns a function that computes ``h^{-1} @ b`` for an array ``b`` with
+    shape (size, k), using the factors of `_inv_block_arrow`.
+    """
+    p = h.dense.shape[0]
+    q, k, _ = h.diag.shape
+    if k == 0:
+        lu_h = la.lu_factor(h.dense)
+        return lambda b: np.asarray(la.lu_solve(lu_h, b), dtype=np.float64)
+    d_inv, wt = _block_arrow_factors(h)
+    lu_s = la.lu_factor(h.dense - h.coupling @ wt) if p > 0 else None
+
+    def d_solve(b: NDArray[np.float64]) -> NDArray[np.float64]:
+        # Apply D^{-1} to rows grouped as (block, index)
+        b_stack = b.reshape(k, q, -1).transpose(1, 0, 2)
+        return np.asarray(
+            (d_inv @ b_stack).transpose(1, 0, 2).reshape(k * q, -1),
+            dtype=np.float64,
+        )
+
+    def solve(b: NDArray[np.float64]) -> NDArray[np.float64]:
+        x_diag = d_solve(b[p:])
+        if lu_s is None:
+            return x_diag
+        x_dense = la.lu_solve(lu_s, b[:p] - wt.T @ b[p:])
+        return np.concatenate((x_dense, x_diag - wt @ x_dense))
+
+    return solve
+
+
+def _scale_noisefit_hess_inv(
+    sigma_alpha: float,
+    sigma_beta: float,
+    sigma_tau: float,
+    *,
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Scale vector relating scaled and unscaled noisefit parameters"""
+    # Concatenate scaling vectors for all sets of free parameters
+    return np.concatenate(
+        [
+            val
+            for tf, val in zip(
+                [
+                    fix_sigma_alpha,
+                    fix_sigma_beta,
+                    fix_sigma_tau,
+                    fix_mu,
+                    fix_a,
+                    fix_eta,
+                ],
+                [
+                    [scale_logv_alpha * sigma_alpha / 2],
+                    [scale_logv_beta * sigma_beta / 2],
+                    [scale_logv_tau * sigma_tau / 2],
+                    scale_delta_mu,
+                    scale_delta_a,
+                    scale_eta,
+                ],
+            )
+            if not tf
+        ]
+    )
+
+
+def _decode_noisefit(
+    p: NDArray[np.float64],
+    x: NDArray[np.float64],
+    dt: float,
+    *,
+    sigma_alpha0: float,
+    sigma_beta0: float,
+    sigma_tau0: float,
+    mu0: NDArray[np.float64],
+    a0: NDArray[np.float64],
+    eta0: NDArray[np.float64],
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta: NDArray[np.float64],
+) -> tuple[
+    NoiseModel, NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]
+]:
+    """Convert scaled noisefit parameters to the parameters of the model"""
+    n, m = x.shape
+    bias_correction = np.sqrt(m / (m - 1))
+
+    x_out = p
+    if fix_sigma_alpha:
+        alpha = sigma_alpha0
+    else:
+        alpha = np.exp(x_out[0] * scale_logv_alpha / 2) * bias_correction
+        x_out = x_out[1:]
+    if fix_sigma_beta:
+        beta = sigma_beta0
+    else:
+        beta = np.exp(x_out[0] * scale_logv_beta / 2) * bias_correction
+        x_out = x_out[1:]
+    if fix_sigma_tau:
+        tau = sigma_tau0
+    else:
+        tau = (
+            float(np.exp(x_out[0] * scale_logv_tau / 2) * dt) * bias_correction
+        )
+        x_out = x_out[1:]
+
+    noise_model = NoiseModel(
+        float(alpha), float(beta), float(tau), dt=float(dt)
+    )
+
+    if fix_mu:
+        mu_out = mu0
+    else:
+        mu_out = x[:, 0] - x_out[:n] * scale_delta_mu
+        x_out = x_out[n:]
+
+    if fix_a:
+        a_out = a0
+    else:
+        a_out = np.concatenate(([1.0], 1.0 + x_out[: m - 1] * scale_delta_a))
+        x_out = x_out[m - 1 :]
+
+    if fix_eta:
+        eta_out = eta0
+    else:
+        eta_out = np.concatenate(([0.0], x_out[: m - 1] * scale_eta))
+
+    return noise_model, mu_out, a_out, eta_out
+
+
+def _parse_noisefit_output(
+    out: OptimizeResult,
+    x: NDArray[np.float64],
+    dt: float,
+    *,
+    sigma_alpha0: float,
+    sigma_beta0: float,
+    sigma_tau0: float,
+    mu0: NDArray[np.float64],
+    a0: NDArray[np.float64],
+    eta0: NDArray[np.float64],
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    scale_logv_alpha: float,
+    scale_logv_beta: float,
+    scale_logv_tau: float,
+    scale_delta_mu: NDArray[np.float64],
+    scale_delta_a: NDArray[np.float64],
+    scale_eta: NDArray[np.float64],
+    unpack: Callable[[NDArray[np.float64]], dict[str, Any]],
+    errors: str = "exact",
+    covariance_rank: int = 32,
+    baseline: _NoiseFitBaseline | None = None,
+) -> NoiseResult:
+    """Parse noisefit output"""
+    noise_model, mu_out, a_out, eta_out = _decode_noisefit(
+        out.x,
+        x,
+        dt,
+        sigma_alpha0=sigma_alpha0,
+        sigma_beta0=sigma_beta0,
+        sigma_tau0=sigma_tau0,
+        mu0=mu0,
+        a0=a0,
+        eta0=eta0,
+        fix_sigma_alpha=fix_sigma_alpha,
+        fix_sigma_beta=fix_sigma_beta,
+        fix_sigma_tau=fix_sigma_tau,
+        fix_mu=fix_mu,
+        fix_a=fix_a,
+        fix_eta=fix_eta,
+        scale_logv_alpha=scale_logv_alpha,
+        scale_logv_beta=scale_logv_beta,
+        scale_logv_tau=scale_logv_tau,
+        scale_delta_mu=scale_delta_mu,
+        scale_delta_a=scale_delta_a,
+        scale_eta=scale_eta,
+    )
+    n, m = x.shape
+    alpha = noise_model.sigma_alpha
+    beta = noise_model.sigma_beta
+    tau = noise_model.sigma_tau
+    if baseline is not None:
+        mu_out = baseline.expand(mu_out, baseline.mu)
+
+    diagnostic = out
+    fun = out.fun
+
+    scale_hess_inv = _scale_noisefit_hess_inv(
+        alpha,
+        beta,
+        tau,
+        fix_sigma_alpha=fix_sigma_alpha,
+        fix_sigma_beta=fix_sigma_beta,
+        fix_sigma_tau=fix_sigma_tau,
+        fix_mu=fix_mu,
+        fix_a=fix_a,
+        fix_eta=fix_eta,
+        scale_logv_alpha=scale_logv_alpha,
+        scale_logv_beta=scale_logv_beta,
+        scale_logv_tau=scale_logv_tau,
+        scale_delta_mu=scale_delta_mu,
+        scale_delta_a=scale_delta_a,
+        scale_eta=scale_eta,
+    )
+
+    fix: dict[str, Any] = {
+        "fix_sigma_alpha": fix_sigma_alpha,
+        "fix_sigma_beta": fix_sigma_beta,
+        "fix_sigma_tau": fix_sigma_tau,
+        "fix_mu": fix_mu,
+        "fix_a": fix_a,
+        "fix_eta": fix_eta,
+    }
+
+    # Hessian at the optimum in block-arrow form, as a picklable function
+    # that holds only the data and the parameters at the optimum
+    hess_at = partial(
+        _hess_noisefit_at,
+        x.T,
+        unpack(out.x),
+        {
+            "fix_logv_alpha": fix_sigma_alpha,
+            "fix_logv_beta": fix_sigma_beta,
+            "fix_logv_tau": fix_sigma_tau,
+            "fix_delta_mu": fix_mu,
+            "fix_delta_a": fix_a,
+            "fix_eta": fix_eta,
+        },
+        {
+            "scale_logv_alpha": scale_logv_alpha,
+            "scale_logv_beta": scale_logv_beta,
+            "scale_logv_tau": scale_logv_tau,
+            "scale_delta_mu": scale_delta_mu,
+            "scale_delta_a": scale_delta_a,
+            "scale_eta_on_dt": scale_eta / dt,
+        },
+        baseline,
+    )
+
+    # Keyword arguments of _noisefit_errors. Outside the ROI, the signal
+    # vector is the mean of m data points.
+    errors_kwargs: dict[str, Any] = {
+        **fix,
+        "baseline": baseline,
+        "err_mu_baseline": alpha / np.sqrt(m),
+    }
+
+    def compute_errors() -> tuple[
+        NDArray[np.float64],
+        float,
+        float,
+        float,
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+    ]:
+        if errors == "none":
+            return _noisefit_errors(np.empty((0, 0)), n, m, **errors_kwargs)
+        if errors == "diagonal":
+            # Compute only the diagonal of the inverse Hessian, without
+            # forming the dense Hessian
+            var = _inv_block_arrow_diag(hess_at()) * scale_hess_inv**2
+            return _noisefit_errors(
+                np.empty((0, 0)), n, m, var=var, **errors_kwargs
+            )
+        if errors == "bfgs":
+            # The inverse Hessian approximation is unavailable if the
+            # minimization was stopped early
+            hess_inv_scaled = out.get("hess_inv")
+            if hess_inv_scaled is None:
+                return _noisefit_errors(
+                    np.empty((0, 0)), n, m, **errors_kwargs
+                )
+            if hasattr(hess_inv_scaled, "todense"):
+                hess_inv_scaled = hess_inv_scaled.todense()
+            # Convert inverse Hessian into unscaled parameters
+            hess_inv = (
+                np.diag(scale_hess_inv)
+                @ np.asarray(hess_inv_scaled, dtype=np.float64)
+                @ np.diag(scale_hess_inv)
+            )
+            return _noisefit_errors(hess_inv, n, m, **errors_kwargs)
+        return _noisefit_exact_errors(
+            hess_at, scale_hess_inv, n, m, errors_kwargs
+        )
+
+    if errors == "low-rank":
+        # Factor the Hessian in block-arrow form, without forming the dense
+        # Hessian
+        h = hess_at()
+        var = _inv_block_arrow_diag(h) * scale_hess_inv**2
+        solve = _solve_block_arrow(h)
+        covariance = LowRankCovariance._from_matmat(
+            lambda v: (
+                scale_hess_inv[:, np.newaxis]
+                * solve(scale_hess_inv[:, np.newaxis] * v)
+            ),
+            var,
+            rank=covariance_rank,
+            seed=0,
+        )
+        return NoiseResult(
+            noise_model,
+            mu_out,
+            a_out,
+            eta_out,
+            float(fun),
+            *_noisefit_errors(
+                np.empty((0, 0)), n, m, var=var, **errors_kwargs
+            ),
+            diagnostic,
+            covariance=covariance,
+        )
+
+    if errors == "lazy":
+        # Defer the exact computation with a picklable function
+        lazy_errors = partial(
+            _noisefit_exact_errors,
+            hess_at,
+            scale_hess_inv,
+            n,
+            m,
+            errors_kwargs,
+        )
+        return NoiseResult(
+            noise_model,
+            mu_out,
+            a_out,
+            eta_out,
+            float(fun),
+            np.empty((0, 0)),
+            np.nan,
+            np.nan,
+            np.nan,
+            np.array([]),
+            np.array([]),
+            np.array([]),
+            diagnostic,
+            _lazy_errors=lazy_errors,
+        )
+
+    # Cast fun as a Python float in case it is a NumPy constant
+    return NoiseResult(
+        noise_model,
+        mu_out,
+        a_out,
+        eta_out,
+        float(fun),
+        *compute_errors(),
+        diagnostic,
+    )
+
+
+def _hess_noisefit_at(
+    x: NDArray[np.float64],
+    params: dict[str, Any],
+    fix_kwargs: dict[str, Any],
+    scale_kwargs: dict[str, Any],
+    baseline: _NoiseFitBaseline | None = None,
+) -> _BlockArrow:
+    """Hessian of the noisefit cost function at fixed scaled parameters
+
+    The parameters ``params`` are those returned by the ``unpack`` function
+    of `_parse_noisefit_input`, and ``x`` is row-oriented. Unlike the
+    ``hess`` function of `_parse_noisefit_input`, this keeps no intermediate
+    variables, so it may be deferred with :func:`functools.partial`.
+    """
+    h = _hess_noisefit_blocks(x, **params, **fix_kwargs, **scale_kwargs)
+    if baseline is not None and not fix_kwargs["fix_logv_alpha"]:
+        scale = scale_kwargs["scale_logv_alpha"]
+        h.dense[0, 0] += (
+            scale**2 * baseline.nll(scale * params["logv_alpha_scaled"])[2]
+        )
+    return h
+
+
+def _noisefit_exact_errors(
+    hess: Callable[[], _BlockArrow],
+    scale_hess_inv: NDArray[np.float64],
+    n: int,
+    m: int,
+    errors_kwargs: dict[str, Any],
+) -> tuple[
+    NDArray[np.float64],
+    float,
+    float,
+    float,
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]:
+    """Uncertainties of the noisefit parameters from the exact Hessian
+
+    The function ``hess`` returns the Hessian in the scaled parameters, and
+    ``errors_kwargs`` holds the keyword arguments of `_noisefit_errors`.
+    """
+    # Compute the inverse Hessian, eliminating the diagonal blocks for the
+    # drift parameters with a Schur complement
+    hess_inv_scaled = _inv_block_arrow(hess())
+
+    # Convert inverse Hessian into unscaled parameters
+    hess_inv = (
+        np.diag(scale_hess_inv) @ hess_inv_scaled @ np.diag(scale_hess_inv)
+    )
+    return _noisefit_errors(hess_inv, n, m, **errors_kwargs)
+
+
+def _noisefit_errors(
+    hess_inv: NDArray[np.float64],
+    n: int,
+    m: int,
+    *,
+    var: NDArray[np.float64] | None = None,
+    fix_sigma_alpha: bool,
+    fix_sigma_beta: bool,
+    fix_sigma_tau: bool,
+    fix_mu: bool,
+    fix_a: bool,
+    fix_eta: bool,
+    baseline: _NoiseFitBaseline | None = None,
+    err_mu_baseline: float = np.nan,
+) -> tuple[
+    NDArray[np.float64],
+    float,
+    float,
+    float,
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]:
+    """Parse the uncertainties of the noisefit parameters from hess_inv
+
+    If given, the variance vector ``var`` replaces the diagonal of
+    ``hess_inv``. Otherwise, an empty ``hess_inv`` sets the uncertainties of
+    the free parameters to ``nan``. If ``baseline`` is given, the
+    uncertainty of the signal vector outside the region of interest is set
+    to ``err_mu_baseline``.
+    """
+    num_free = (
+        (not fix_sigma_alpha)
+        + (not fix_sigma_beta)
+        + (not fix_sigma_tau)
+        + (0 if fix_mu else n)
+        + ((not fix_a) + (not fix_eta)) * (m - 1)
+    )
+    if var is None:
+        var = (
+            np.full(num_free, np.nan)
+            if hess_inv.size == 0
+            else np.diag(hess_inv)
+        )
+
+    # Determine parameter uncertainty vector from the variances, which may be
+    # negative if the minimization stopped early
+    with np.errstate(invalid="ignore"):
+        err = np.sqrt(var)
+    err_mu = np.array([])
+    err_a = np.array([])
+    err_eta = np.array([])
+
+    # Parse error vector
+    # Propagate error from log(V) to sigma
+    if not fix_sigma_alpha:
+        err_sigma_alpha = err[0]
+        err = err[1:]
+    else:
+        err_sigma_alpha = 0.0
+
+    if not fix_sigma_beta:
+        err_sigma_beta = err[0]
+        err = err[1:]
+    else:
+        err_sigma_beta = 0.0
+
+    if not fix_sigma_tau:
+        err_sigma_tau = err[0]
+        err = err[1:]
+    else:
+        err_sigma_tau = 0.0
+
+    if not fix_mu:
+        err_mu = err[:n]
+        err = err[n:]
+        if baseline is not None:
+            err_mu = baseline.expand(err_mu, err_mu_baseline)
+
+    if not fix_a:
+        err_a = np.concatenate(([0], err[: m - 1]))
+        err = err[m - 1 :]
+
+    if not fix_eta:
+        err_eta = np.concatenate(([0], err[: m - 1]))
+
+    return (
+        hess_inv,
+        err_sigma_alpha,
+        err_sigma_beta,
+        err_sigma_tau,
+        err_mu,
+        err_a,
+        err_eta,
+    )
+
+
+def noisefit_batch(
+    x: ArrayLike,
+    *,
+    dt: float | None = None,
+    sigma_alpha0: float | None = None,
+    sigma_beta0: float | None = None,
+    sigma_tau0: float | None = None,
+    mu0: ArrayLike | None = None,
+    a0: ArrayLike | None = None,
+    eta0: ArrayLike | None = None,
+    fix_sigma_alpha: bool = False,
+    fix_sigma_beta: bool = False,
+    fix_sigma_tau: bool = False,
+    fix_mu: bool = False,
+    fix_a: bool = False,
+    fix_eta: bool = False,
+    min_options: dict[str, Any] | None = None,
+) -> list[NoiseResult]:
+    r"""
+    Estimate noise models for a stack of independent data arrays.
+
+    Fits the noise model of :func:`noisefit` to each of ``k`` independent
+    data arrays with the same shape, evaluating all ``k`` cost functions and
+    their gradients together at each iteration of a batched BFGS minimizer.
+    Data arrays are removed from the batch as they converge.
+
+    Parameters
+    ----------
+    x : array_like with shape (k, n, m)
+        Stack of ``k`` data arrays, each composed of ``m`` waveforms that are
+        sampled at ``n`` points.
+    dt : float or None, optional
+        Sampling time, normally in picoseconds. Default is None, which sets
+        the sampling time to ``thztools.options.sampling_time``. If both
+        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
+        sampling time is set to ``1.0``.
+    sigma_alpha0, sigma_beta0, sigma_tau0 : float, optional
+        Initial values for noise parameters, shared by all data arrays. When
+        set to ``None``, the default, use a linear least-squares fit of the
+        noise model to the time-dependent variance of each data array.
+    mu0 : array_like with shape(k, n), optional
+        Initial guess, signal vectors. Default is the first column of each
+        data array.
+    a0 : array_like with shape(k, m), optional
+        Initial guess, signal amplitude drift vectors. Default is
+        ``np.ones((k, m))``.
+    eta0 : array_like with shape(k, m), optional
+        Initial guess, signal delay drift vectors. Default is
+        ``np.zeros((k, m))``.
+    fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau : bool, optional
+        Fix the associated noise parameter. Default is False.
+    fix_mu : bool, optional
+        Fix signal vectors. Default is False.
+    fix_a : bool, optional
+        Fix signal amplitude drift vectors. Default is False.
+    fix_eta : bool, optional
+        Fix signal delay drift vectors. Default is False.
+
+    Returns
+    -------
+    res : list of NoiseResult
+        Fit results for each data array, in the same order as ``x``. The
+        ``diagnostic`` attribute of each result is an instance of
+        :class:`scipy.optimize.OptimizeResult` with the attributes ``x``,
+        ``fun``, ``jac``, ``hess_inv``, ``nit``, ``nfev``, ``njev``,
+        ``status``, ``success``, and ``message``, which have the same meaning
+        as for :func:`noisefit`.
+
+    Other Parameters
+    ----------------
     min_options : dict or None, optional
-        Keyword options passed to the ``options`` parameter of
-        :func:`scipy.optimize.minimize`. See the documentation on the
-        `BFGS <https://docs.scipy.org/doc/scipy/reference/
-        optimize.minimize-bfgs.html#optimize-minimize-bfgs>`_
-        method for details. By default, ``gtol=1e-5 * x.size``. The options
-        ``eps`` and ``finite_diff_rel_step`` are not used.
+        Options for the batched minimizer: ``gtol``, the tolerance for the
+        maximum absolute value of the gradient, default ``1e-5 * n * m``; and
+        ``maxiter``, the maximum number of iterations, default 200 times the
+        number of free parameters.
+
+    Raises
+    ------
+    ValueError
+        If all parameters are held fixed, or if the input arrays have
+        incompatible shapes.
+
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
+
+    Notes
+    -----
+    Each data array is fitted with the same scaled parameterization and
+    default scales as :func:`noisefit`, so the results agree with those of
+    :func:`noisefit` to within the convergence tolerance. Batching is most
+    effective for many small data arrays, where the overhead of separate
+    minimizations would otherwise dominate. The minimizer stores an inverse
+    Hessian approximation for each data array, so memory use grows as
+    :math:`k(N + 2M)^2`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> k, n, m, dt = 4, 128, 20, 0.05
+    >>> mu = thz.wave(n, dt=dt)
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> z = np.tile(mu, (k, m, 1)).transpose(0, 2, 1)
+    >>> x = z + noise_model.noise_sim(z, axis=1, seed=0)
+    >>> res = thz.noisefit_batch(x, dt=dt)
+    >>> [r.diagnostic.success for r in res]
+    [True, True, True, True]
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != NUM_NOISE_DATA_DIMENSIONS + 1:
+        msg = "Data array x must be 3D"
+        raise ValueError(msg)
+    dt = _assign_sampling_time(dt)
+    k, n, m = x.shape
+
+    def member(arr: ArrayLike | None, i: int) -> NDArray[np.float64] | None:
+        return None if arr is None else np.asarray(arr, dtype=np.float64)[i]
+
+    # Parse inputs separately for each data array
+    input_parsed = []
+    params = []
+    for i in range(k):
+        _, _, x0_i, input_parsed_i = _parse_noisefit_input(
+            x[i],
+            dt=dt,
+            sigma_alpha0=sigma_alpha0,
+            sigma_beta0=sigma_beta0,
+            sigma_tau0=sigma_tau0,
+            mu0=member(mu0, i),
+            a0=member(a0, i),
+            eta0=member(eta0, i),
+            fix_sigma_alpha=fix_sigma_alpha,
+            fix_sigma_beta=fix_sigma_beta,
+            fix_sigma_tau=fix_sigma_tau,
+            fix_mu=fix_mu,
+            fix_a=fix_a,
+            fix_eta=fix_eta,
+            scale_logv_alpha=None,
+            scale_logv_beta=None,
+            scale_logv_tau=None,
+            scale_delta_mu=None,
+            scale_delta_a=None,
+            scale_eta=None,
+        )
+        input_parsed_i.pop("hess")
+        input_parsed_i.pop("hessp")
+        params.append(input_parsed_i["unpack"](x0_i))
+        input_parsed.append(input_parsed_i)
+
+    # Stack the scaled parameters, free and fixed, and their scales
+    p_full = np.stack(
+        [
+            np.concatenate(
+                (
+                    [
+                        q["logv_alpha_scaled"],
+                        q["logv_beta_scaled"],
+                        q["logv_tau_scaled"],
+                    ],
+                    q["delta_mu_scaled"],
+                    q["delta_a_scaled"],
+                    q["eta_on_dt_scaled"],
+                )
+            )
+            for q in params
+        ]
+    )
+    scale_logv = np.array(
+        [
+            [
+                q["scale_logv_alpha"],
+                q["scale_logv_beta"],
+                q["scale_logv_tau"],
+            ]
+            for q in input_parsed
+        ]
+    )
+    scale_delta_mu = np.stack([q["scale_delta_mu"] for q in input_parsed])
+    scale_delta_a = np.stack([q["scale_delta_a"] for q in input_parsed])
+    scale_eta_on_dt = np.stack([q["scale_eta"] / dt for q in input_parsed])
+
+    free = np.concatenate(
+        (
+            [not fix_sigma_alpha, not fix_sigma_beta, not fix_sigma_tau],
+            np.full(n, not fix_mu),
+            np.full(m - 1, not fix_a),
+            np.full(m - 1, not fix_eta),
+        )
+    )
+    i_mu = NUM_NOISE_PARAMETERS
+    i_a = i_mu + n
+    i_eta = i_a + m - 1
+
+    # Orient each data array row-wise for the cost function
+    x_t = np.swapaxes(x, 1, 2)
+
+    def fun_and_jac(
+        _p: NDArray[np.float64], idx: NDArray[np.int_]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        _p_full = p_full[idx]
+        _p_full[:, free] = _p
+        nll, jac = _nll_jac_noisefit_batch(
+            x_t[idx],
+            _p_full[:, :i_mu],
+            _p_full[:, i_mu:i_a],
+            _p_full[:, i_a:i_eta],
+            _p_full[:, i_eta:],
+            scale_logv=scale_logv[idx],
+            scale_delta_mu=scale_delta_mu[idx],
+            scale_delta_a=scale_delta_a[idx],
+            scale_eta_on_dt=scale_eta_on_dt[idx],
+        )
+        return nll, jac[:, free]
+
+    options: dict[str, Any] = {
+        "gtol": 1e-5 * n * m,
+        "maxiter": 200 * np.count_nonzero(free),
+    }
+    if min_options is not None:
+        options.update(min_options)
+
+    out = _minimize_bfgs_batch(fun_and_jac, p_full[:, free], **options)
 
-    Raises
-    ------
-    ValueError
-        If all parameters are held fixed or if the input arrays have
-        incompatible shapes.
+    return [
+        _parse_noisefit_output(out[i], x[i], dt=dt, **input_parsed[i])
+        for i in range(k)
+    ]
 
-    Warns
-    -----
-    UserWarning
-        If ``thztools.options.sampling_time`` and the ``dt`` parameter
-        are both not ``None`` and are set to different ``float`` values, the
-        function will set the sampling time to ``dt`` and raise a
-        :class:`UserWarning`.
 
-    See Also
-    --------
-    NoiseModel : Noise model class.
+def _minimize_bfgs_batch(
+    fun_and_jac: Callable[
+        [NDArray[np.float64], NDArray[np.int_]],
+        tuple[NDArray[np.float64], NDArray[np.float64]],
+    ],
+    x0: NDArray[np.float64],
+    *,
+    gtol: float,
+    maxiter: int,
+) -> list[OptimizeResult]:
+    r"""
+    Minimize a stack of independent functions with BFGS.
+
+    Parameters
+    ----------
+    fun_and_jac : callable
+        ``fun_and_jac(p, idx) -> (f, g)``, where ``p`` has shape
+        (len(idx), N) and holds parameters for the functions with indices
+        ``idx``, ``f`` has shape (len(idx),), and ``g`` has shape
+        (len(idx), N).
+    x0 : ndarray
+        Initial parameters with shape (k, N).
+    gtol : float
+        Terminate when the maximum absolute value of the gradient is less
+        than ``gtol``.
+    maxiter : int
+        Maximum number of iterations.
+
+    Returns
+    -------
+    res : list of OptimizeResult
+        Optimization results for each function.
 
     Notes
     -----
-    Given an :math:`N\times M` data array :math:`\mathbf{X}`, the function uses
-    the BFGS method of :func:`scipy.optimize.minimize` to minimize the
-    maximum-likelihood cost function [1]_
+    Each iteration updates the search directions for all active functions
+    with stacked matrix products, then performs a backtracking line search
+    that enforces the Armijo condition. The BFGS update is skipped when the
+    curvature condition fails. Functions are removed from the active set when
+    they converge, reach ``maxiter``, or the line search fails, so that each
+    call to ``fun_and_jac`` evaluates only the functions that are still being
+    minimized.
+    """
+    c1 = 1e-4
+    max_backtrack = 30
+    messages = {
+        0: "Optimization terminated successfully.",
+        1: "Maximum number of iterations has been exceeded.",
+        2: "Desired error not necessarily achieved due to precision loss.",
+    }
 
-    .. math:: \begin{split}\
-        Q_\text{ML}\
-        (\sigma_\alpha,\sigma_\beta,\sigma_\tau,\boldsymbol{\mu},\
-        \mathbf{A},\boldsymbol{\eta};\mathbf{X})\
-        = \frac{1}{2}\sum_{k=0}^{N-1}\sum_{l=0}^{M-1}& \
-        \left[\ln\sigma_{kl}^2 + \frac{(X_{kl} \
-        - Z_{kl})^2}{\sigma_{kl}^2}\right]\
-        \end{split}
+    k, num_var = x0.shape
+    x = np.array(x0, dtype=np.float64)
+    f, g = fun_and_jac(x, np.arange(k))
+    nfev = np.ones(k, dtype=int)
+    nit = np.zeros(k, dtype=int)
+    hess_inv = np.tile(np.eye(num_var), (k, 1, 1))
+
+    status = np.full(k, -1)
+    status[np.max(np.abs(g), axis=1, initial=0.0) <= gtol] = 0
+
+    while True:
+        status[(status < 0) & (nit >= maxiter)] = 1
+        active = np.flatnonzero(status < 0)
+        if active.size == 0:
+            break
+
+        g_a = g[active]
+        d = -np.einsum("kij,kj->ki", hess_inv[active], g_a)
+
+        # Reset the inverse Hessian if d is not a descent direction
+        gd = np.sum(g_a * d, axis=1)
+        restart = ~(gd < 0)
+        if np.any(restart):
+            hess_inv[active[restart]] = np.eye(num_var)
+            d[restart] = -g_a[restart]
+            gd[restart] = -np.sum(g_a[restart] ** 2, axis=1)
+
+        # Backtracking line search on the Armijo condition
+        t = np.ones(active.size)
+        x_new = x[active]
+        f_new = f[active]
+        g_new = g_a.copy()
+        searching = np.arange(active.size)
+        for _ in range(max_backtrack):
+            x_trial = (
+                x[active[searching]] + t[searching, np.newaxis] * d[searching]
+            )
+            f_trial, g_trial = fun_and_jac(x_trial, active[searching])
+            nfev[active[searching]] += 1
+            accept = np.isfinite(f_trial) & (
+                f_trial
+                <= f[active[searching]] + c1 * t[searching] * gd[searching]
+            )
+            x_new[searching[accept]] = x_trial[accept]
+            f_new[searching[accept]] = f_trial[accept]
+            g_new[searching[accept]] = g_trial[accept]
+            searching = searching[~accept]
+            if searching.size == 0:
+                break
+            t[searching] *= 0.5
+        status[active[searching]] = 2
+
+        # BFGS update of the inverse Hessian where the curvature condition
+        # holds, scaling the initial identity matrix before the first update
+        s_k = x_new - x[active]
+        y_k = g_new - g_a
+        sy = np.sum(s_k * y_k, axis=1)
+        yy = np.sum(y_k**2, axis=1)
+        update = sy > np.finfo(float).eps * yy
+        update[searching] = False
+        i_upd = active[update]
+        s_u = s_k[update]
+        y_u = y_k[update]
+        rho = 1 / sy[update]
+        h = hess_inv[i_upd]
+        first = nit[i_upd] == 0
+        h[first] *= (sy[update][first] / yy[update][first])[
+            :, np.newaxis, np.newaxis
+        ]
+        hy = np.einsum("kij,kj->ki", h, y_u)
+        c = rho * (1 + rho * np.sum(y_u * hy, axis=1))
+        # Rank-2 update H += c s s^T - rho (H y s^T + s y^T H)
+        u = np.stack((s_u, hy), axis=2)
+        v = np.stack(
+            (
+                c[:, np.newaxis] * s_u - rho[:, np.newaxis] * hy,
+                -rho[:, np.newaxis] * s_u,
+            ),
+            axis=1,
+        )
+        hess_inv[i_upd] = h + u @ v
+
+        x[active] = x_new
+        f[active] = f_new
+        g[active] = g_new
+        nit[active] += 1
+        converged = np.max(np.abs(g_new), axis=1, initial=0.0) <= gtol
+        status[active[converged & (status[active] < 0)]] = 0
+
+    return [
+        OptimizeResult(
+            x=x[i],
+            fun=f[i],
+            jac=g[i],
+            hess_inv=hess_inv[i],
+            nit=int(nit[i]),
+            nfev=int(nfev[i]),
+            njev=int(nfev[i]),
+            status=int(status[i]),
+            success=bool(status[i] == 0),
+            message=messages[int(status[i])],
+        )
+        for i in range(k)
+    ]
 
-    with respect to the unknown model parameters :math:`\sigma_\alpha`,
-    :math:`\sigma_\beta`, :math:`\sigma_\tau`, :math:`\boldsymbol{\mu}`,
-    :math:`\mathbf{A}` and :math:`\boldsymbol{\eta}`. The model assumes that
-    the elements of :math:`\mathbf{X}` are normally distributed around the
-    corresponding elements of :math:`\mathbf{Z}` with variances given by
-    :math:`\boldsymbol{\sigma}^2`, which are in turn given by
 
-    .. math:: Z_{kl} = A_l\mu(t_k - \eta_l)
+def noisefit_stochastic(
+    x: ArrayLike,
+    *,
+    dt: float | None = None,
+    sigma_alpha0: float | None = None,
+    sigma_beta0: float | None = None,
+    sigma_tau0: float | None = None,
+    mu0: ArrayLike | None = None,
+    batch_size: int = 64,
+    maxiter: int = 1000,
+    learning_rate: float = 1e-2,
+    chunk_size: int = 1024,
+    seed: int | None = None,
+) -> NoiseResult:
+    r"""
+    Estimate noise model from mini-batches of a large set of waveforms.
 
-    and
+    Estimates the same noise model as :func:`noisefit`, but updates the
+    noise parameters and the signal vector with stochastic gradients that
+    are computed from random subsets of the waveforms, so that the cost of
+    the minimization does not depend on the number of waveforms.
 
-    .. math:: \sigma_{kl}^2 = \sigma_\alpha^2 + \sigma_\beta^2 Z_{kl}^2 \
-        + \sigma_\tau^2(\mathbf{D}\mathbf{Z})_{kl}^2,
+    Parameters
+    ----------
+    x : array_like with shape (n, m)
+        Data array composed of ``m`` waveforms, each of which is sampled at
+        ``n`` points.
+    dt : float or None, optional
+        Sampling time, normally in picoseconds. Default is None, which sets
+        the sampling time to ``thztools.options.sampling_time``. If both
+        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
+        sampling time is set to ``1.0``.
+    sigma_alpha0, sigma_beta0, sigma_tau0 : float, optional
+        Initial values for noise parameters. When set to ``None``, the
+        default, use a linear least-squares fit of the noise model to the
+        variance of a random subset of ``16 * batch_size`` waveforms.
+    mu0 : array_like with shape(n,), optional
+        Initial guess, signal vector with shape (n,). Default is first column
+        of ``x``.
+    batch_size : int, optional
+        Number of waveforms in each mini-batch. Default is 64.
+    maxiter : int, optional
+        Number of stochastic gradient iterations. Default is 1000.
+    learning_rate : float, optional
+        Step size of the Adam update, in units of the log-variance for the
+        noise parameters and in units of the initial noise amplitude for the
+        signal vector. The step size is constant for the first half of the
+        iterations and decreases linearly to zero over the second half.
+        Default is 0.01.
+    chunk_size : int, optional
+        Number of waveforms processed at once in the final pass over the
+        data. Default is 1024.
+    seed : int or None, optional
+        Random seed for the selection of mini-batches. Default is None.
 
-    where :math:`\mathbf{D}` is the time-domain derivative operator. The
-    function :math:`\mu(t)` represents an ideal primary waveform, which drifts
-    in amplitude and temporal location between each of the :math:`M` waveform
-    measurements. Each waveform comprises :math:`N` samples at the nominal
-    times :math:`t_k`, and the drift in the amplitude and the temporal location
-    of the :math:`l` waveform are given by :math:`A_l` and :math:`\eta_l`,
-    respectively, with initial values fixed at :math:`A_0 = 1.0` and
-    :math:`\eta_0 = 0.0` by definition.
+    Returns
+    -------
+    res : NoiseResult
+        Fit result represented as a ``NoiseResult`` object. The ``fval``
+        attribute is the value of the NLL cost function for all waveforms.
+        The Hessian is not computed, so the ``hess_inv`` attribute is an
+        empty array and the uncertainty attributes are set to ``nan``. The
+        ``diagnostic`` attribute is an instance of
+        :class:`scipy.optimize.OptimizeResult` with the attributes ``fun``,
+        ``nit``, ``nfev``, ``success``, ``status``, ``message``, and
+        ``execution_time``.
+
+    Raises
+    ------
+    ValueError
+        If ``x`` is not 2D or if ``mu0`` is incompatible with ``x``.
+
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
+
+    Notes
+    -----
+    At each iteration, the function selects ``batch_size`` waveforms at
+    random, updates their amplitude and delay drift parameters with Fisher
+    scoring steps while holding the noise parameters and the signal vector
+    fixed, and then updates the noise parameters and the signal vector with
+    the Adam algorithm [1]_, using the gradient of the cost function for the
+    mini-batch. The drift parameters of every waveform are then determined in
+    a final pass over the data, in chunks of ``chunk_size`` waveforms. The
+    drift parameters are defined relative to the first waveform, with
+    :math:`A_0 = 1.0` and :math:`\eta_0 = 0.0`, as in :func:`noisefit`, by
+    rescaling and shifting the signal vector at the end.
 
     References
     ----------
-    .. [1] Laleh Mohtashemi, Paul Westlund, Derek G. Sahota, Graham B. Lea,
-        Ian Bushfield, Payam Mousavi, and J. Steven Dodge, "Maximum-
-        likelihood parameter estimation in terahertz time-domain
-        spectroscopy," Opt. Express **29**, 4912-4926 (2021),
-        `<https://doi.org/10.1364/OE.417724>`_.
+    .. [1] Diederik P. Kingma and Jimmy Ba, "Adam: A Method for Stochastic
+        Optimization," `arXiv:1412.6980 <https://arxiv.org/abs/1412.6980>`_.
 
     Examples
     --------
-    In basic usage, it should be possible to call ``noisefit`` with just
-    the data array. In the code below, we simulate ``m = 50`` noisy waveforms
-    with ``n = 256`` time points each, then verify that the fit results are
-    consistent with the true noise parameters.
-
     >>> import numpy as np
     >>> import thztools as thz
-    >>> from matplotlib import pyplot as plt
-    >>> rng = np.random.default_rng(0)
-    >>> n, m, dt = 256, 50, 0.05
-    >>> t = thz.timebase(n, dt=dt)
+    >>> n, m, dt = 256, 1000, 0.05
     >>> mu = thz.wave(n, dt=dt)
-    >>> alpha, beta, tau = 1e-4, 1e-2, 1e-3
-    >>> noise_model = thz.NoiseModel(sigma_alpha=alpha, sigma_beta=beta,
-    ...  sigma_tau=tau, dt=dt)
-    >>> a = 1.0 + 1e-2 * np.concatenate(([0.0],
-    ...                                 rng.standard_normal(m - 1)))
-    >>> eta = 1e-3 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
-    >>> z = thz.scaleshift(np.repeat(np.atleast_2d(mu), m, axis=0), dt=dt,
-    ...                    a=a, eta=eta).T  # Orient the array columnwise
-    >>> x = z + noise_model.noise_sim(z, axis=0, seed=12345)
-    >>> noise_res = thz.noisefit(x, sigma_alpha0=alpha, sigma_beta0=beta,
-    ...  sigma_tau0=tau, dt=dt)
-    >>> noise_res.noise_model
-    NoiseModel(sigma_alpha=0.000100..., sigma_beta=0.00984...,
-    sigma_tau=0.000899..., dt=0.05)
-
-    >>> plt.plot(t, np.std(thz.scaleshift(x, a=1 / noise_res.a,
-    ... eta=-noise_res.eta, axis=0), axis=1), "-",
-    ... label="Data")
-    >>> plt.plot(t, noise_res.noise_model.noise_amp(noise_res.mu),
-    ...  "--", label="Fit")
-    >>> plt.legend()
-    >>> plt.xlabel("t (ps)")
-    >>> plt.ylabel(r"$\sigma(t)$")
-    >>> plt.show()
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> z = np.tile(mu, (m, 1)).T
+    >>> x = z + noise_model.noise_sim(z, axis=0, seed=0)
+    >>> res = thz.noisefit_stochastic(x, dt=dt, maxiter=300, seed=0)
+    >>> res.noise_model
+    NoiseModel(sigma_alpha=0.000103..., sigma_beta=0.00981...,
+    sigma_tau=0.000991..., dt=0.05)
     """
-    x = np.asarray(x, dtype=np.float64)
-    dt = _assign_sampling_time(dt)
-
-    parsed = _parse_noisefit_input(
-        x,
-        dt=dt,
-        sigma_alpha0=sigma_alpha0,
-        sigma_beta0=sigma_beta0,
-        sigma_tau0=sigma_tau0,
-        mu0=mu0,
-        a0=a0,
-        eta0=eta0,
-        fix_sigma_alpha=fix_sigma_alpha,
-        fix_sigma_beta=fix_sigma_beta,
-        fix_sigma_tau=fix_sigma_tau,
-        fix_mu=fix_mu,
-        fix_a=fix_a,
-        fix_eta=fix_eta,
-        scale_logv_alpha=scale_logv_alpha,
-        scale_logv_beta=scale_logv_beta,
-        scale_logv_tau=scale_logv_tau,
-        scale_delta_mu=scale_delta_mu,
-        scale_delta_a=scale_delta_a,
-        scale_eta=scale_eta,
-    )
-
-    objective, jac, x0, input_parsed = parsed
-
-    # Minimize cost function with respect to free parameters
-    out = minimize(
-        objective,
-        x0,
-        method="BFGS",
-        jac=jac,
-        tol=1e-5 * x.size,
-        options=min_options,
-    )
-
-    return _parse_noisefit_output(out, x, dt=dt, **input_parsed)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    num_drift_steps = 3
+    num_final_drift_steps = 5
 
-
-def _parse_noisefit_input(
-    x: NDArray[np.float64],
-    dt: float,
-    *,
-    sigma_alpha0: float | None,
-    sigma_beta0: float | None,
-    sigma_tau0: float | None,
-    mu0: ArrayLike | None,
-    a0: ArrayLike | None,
-    eta0: ArrayLike | None,
-    fix_sigma_alpha: bool,
-    fix_sigma_beta: bool,
-    fix_sigma_tau: bool,
-    fix_mu: bool,
-    fix_a: bool,
-    fix_eta: bool,
-    scale_logv_alpha: float | None,
-    scale_logv_beta: float | None,
-    scale_logv_tau: float | None,
-    scale_delta_mu: ArrayLike | None,
-    scale_delta_a: ArrayLike | None,
-    scale_eta: ArrayLike | None,
-) -> tuple[
-    Callable[[NDArray[np.float64]], np.float64],
-    Callable[[NDArray[np.float64]], NDArray[np.float64]],
-    NDArray[np.float64],
-    dict[str, Any],
-]:
-    """Parse noisefit inputs"""
+    x = np.asarray(x, dtype=np.float64)
     if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
         msg = "Data array x must be 2D"
         raise ValueError(msg)
+    dt = _assign_sampling_time(dt)
     n, m = x.shape
+    x_rows = x.T
+    batch_size = min(batch_size, m)
+    rng = default_rng(seed)
 
-    if (
-        fix_sigma_alpha
-        and fix_sigma_beta
-        and fix_sigma_tau
-        and fix_mu
-        and fix_a
-        and fix_eta
-    ):
-        msg = "All variables are fixed"
-        raise ValueError(msg)
+    start_time = time.perf_counter()
 
-    # Use the first column of x as a default
     if mu0 is None:
         mu0 = x[:, 0]
     else:
@@ -2348,451 +6669,1169 @@ def _parse_noisefit_input(
             msg = "Size of mu0 is incompatible with data array x."
             raise ValueError(msg)
 
-    # Compute time-dependent variance of signal array and
-    # the minimum value of the time-dependent noise amplitude
-    v_t = np.var(x, 1, ddof=1)
-    sigma_min = np.sqrt(np.min(v_t))
-
-    # If any initial guess for the noise parameters is unspecified,
-    # estimate all noise parameters with a linear least-squares fit
-    # to the time-dependent variance
     if None in [sigma_alpha0, sigma_beta0, sigma_tau0]:
-        mu0_f = np.fft.rfft(mu0)
-        w = 2 * pi * np.fft.rfftfreq(n, dt)
-        dmu0_dt = np.fft.irfft(1j * w * mu0_f, n=n)
-        a_matrix = np.stack([np.ones(n), mu0**2, dmu0_dt**2], axis=1)
-        sol = np.linalg.lstsq(a_matrix, v_t, rcond=None)
-        sigma_est = np.ma.sqrt(sol[0]).filled(sigma_min)
-
-    if sigma_alpha0 is None:
-        sigma_alpha0 = sigma_est[0]
+        idx = rng.choice(m, min(m, 16 * batch_size), replace=False)
+        sigma_est = _fit_noise_variance(np.var(x[:, idx], 1, ddof=1), mu0, dt)
+    sigma0 = np.array(
+        [
+            sigma_est[0] if sigma_alpha0 is None else sigma_alpha0,
+            sigma_est[1] if sigma_beta0 is None else sigma_beta0,
+            sigma_est[2] if sigma_tau0 is None else sigma_tau0,
+        ],
+        dtype=np.float64,
+    )
 
-    if sigma_beta0 is None:
-        sigma_beta0 = sigma_est[1]
+    # Scale the signal vector by the initial noise amplitude, so that the
+    # learning rate has the same meaning for all of its entries
+    scale_mu = NoiseModel(
+        float(sigma0[0]), float(sigma0[1]), float(sigma0[2]), dt=dt
+    ).noise_amp(mu0)
+    scale_mu[np.isclose(scale_mu, 0.0)] = np.sqrt(np.finfo(float).eps)
 
-    if sigma_tau0 is None:
-        sigma_tau0 = sigma_est[2]
+    # Replace log(x) with -1e2 when x <= 0
+    logv0 = np.ma.log((sigma0 / np.array([1.0, 1.0, dt])) ** 2).filled(-1.0e2)
+    theta = np.concatenate((logv0, mu0 / scale_mu))
+    a = np.ones(m)
+    eta_on_dt = np.zeros(m)
+    free_drift = np.ones(2, dtype=bool)
+
+    moment1 = np.zeros_like(theta)
+    moment2 = np.zeros_like(theta)
+    nfev = 0
+    for t in range(1, maxiter + 1):
+        idx = rng.choice(m, batch_size, replace=False)
+        x_batch = x_rows[idx]
+        logv = theta[:NUM_NOISE_PARAMETERS]
+        mu = theta[NUM_NOISE_PARAMETERS:] * scale_mu
+        v = np.exp(logv)
+
+        # Drift parameters of the mini-batch
+        a_batch = a[idx]
+        eta_batch = eta_on_dt[idx]
+        for _ in range(num_drift_steps):
+            _, zeta, dzeta, ddzeta = _noisefit_model(mu, a_batch, eta_batch)
+            a_batch, eta_batch, nfev_drift = _fisher_step_drift(
+                x_batch,
+                v,
+                mu,
+                a_batch,
+                eta_batch,
+                zeta,
+                dzeta,
+                ddzeta,
+                free_drift=free_drift,
+                active=np.ones(batch_size, dtype=bool),
+            )
+            nfev += nfev_drift + 1
+        a[idx] = a_batch
+        eta_on_dt[idx] = eta_batch
+
+        # Adam update of the noise parameters and the signal vector, with
+        # the mini-batch gradient scaled to estimate the full gradient
+        _, jac_logv, jac_mu, _, _ = _nll_jac_noisefit_unscaled(
+            x_batch[np.newaxis],
+            logv[np.newaxis],
+            mu[np.newaxis],
+            a_batch[np.newaxis],
+            eta_batch[np.newaxis],
+        )
+        nfev += 1
+        grad = (m / batch_size) * np.concatenate(
+            (jac_logv[0], jac_mu[0] * scale_mu)
+        )
+        moment1 = beta1 * moment1 + (1 - beta1) * grad
+        moment2 = beta2 * moment2 + (1 - beta2) * grad**2
+        step_size = learning_rate * min(1.0, 2 * (1 - (t - 1) / maxiter))
+        theta = theta - step_size * (moment1 / (1 - beta1**t)) / (
+            np.sqrt(moment2 / (1 - beta2**t)) + epsilon
+        )
 
-    noise_model = NoiseModel(
-        float(sigma_alpha0),
-        float(sigma_beta0),
-        float(sigma_tau0),
-        dt=float(dt),
+    # Final pass over all waveforms for the drift parameters
+    logv = theta[:NUM_NOISE_PARAMETERS]
+    mu = theta[NUM_NOISE_PARAMETERS:] * scale_mu
+    v = np.exp(logv)
+    fval = 0.0
+    for i in range(0, m, chunk_size):
+        x_chunk = x_rows[i : i + chunk_size]
+        a_chunk = a[i : i + chunk_size]
+        eta_chunk = eta_on_dt[i : i + chunk_size]
+        for _ in range(num_final_drift_steps):
+            _, zeta, dzeta, ddzeta = _noisefit_model(mu, a_chunk, eta_chunk)
+            a_chunk, eta_chunk, nfev_drift = _fisher_step_drift(
+                x_chunk,
+                v,
+                mu,
+                a_chunk,
+                eta_chunk,
+                zeta,
+                dzeta,
+                ddzeta,
+                free_drift=free_drift,
+                active=np.ones(x_chunk.shape[0], dtype=bool),
+            )
+            nfev += nfev_drift + 1
+        _, zeta, dzeta, _ = _noisefit_model(mu, a_chunk, eta_chunk)
+        fval += float(np.sum(_nll_rows_noisefit(x_chunk, v, zeta, dzeta)))
+        a[i : i + chunk_size] = a_chunk
+        eta_on_dt[i : i + chunk_size] = eta_chunk
+
+    # Express the drift relative to the first waveform
+    _, zeta, _, _ = _noisefit_model(mu, a[:1], eta_on_dt[:1])
+    mu = zeta[0]
+    a = a / a[0]
+    eta_on_dt = eta_on_dt - eta_on_dt[0]
+
+    sigma = np.sqrt(v) * np.array([1.0, 1.0, dt]) * np.sqrt(m / (m - 1))
+    diagnostic = OptimizeResult(
+        fun=fval,
+        nit=maxiter,
+        nfev=nfev,
+        success=True,
+        status=0,
+        message="Completed the specified number of iterations.",
+        execution_time=time.perf_counter() - start_time,
     )
+    return NoiseResult(
+        NoiseModel(float(sigma[0]), float(sigma[1]), float(sigma[2]), dt=dt),
+        mu,
+        a,
+        eta_on_dt * dt,
+        fval,
+        np.empty((0, 0)),
+        np.nan,
+        np.nan,
+        np.nan,
+        np.full(n, np.nan),
+        np.full(m, np.nan),
+        np.full(m, np.nan),
+        diagnostic,
+    )
+
+
+def noisefit_parallel(
+    x: Sequence[ArrayLike],
+    *,
+    max_workers: int | None = None,
+    blas_threads: int | None = 1,
+    return_hess_inv: bool = False,
+    **kwargs: Any,
+) -> list[NoiseResult]:
+    r"""
+    Estimate noise models for several data arrays in parallel processes.
+
+    Applies :func:`noisefit` to each data array in ``x`` with a pool of worker
+    processes. Unlike :func:`noisefit_batch`, the data arrays may have
+    different shapes.
+
+    Parameters
+    ----------
+    x : sequence of array_like
+        Data arrays, each with shape (n, m) as in :func:`noisefit`. The
+        values of ``n`` and ``m`` may differ between data arrays.
+    max_workers : int or None, optional
+        Maximum number of worker processes. Default is None, which uses
+        the number of processors on the machine.
+    blas_threads : int or None, optional
+        Number of BLAS, OpenMP, and numexpr threads in each worker process.
+        Default is 1, which avoids oversubscribing processor cores when each
+        worker runs a separate fit. When set to ``None``, the thread count is not
+        changed.
+    return_hess_inv : bool, optional
+        Return the inverse Hessian of each fit. Default is False, in which
+        case the ``hess_inv`` attribute of each result is an empty array.
+    **kwargs
+        Keyword arguments passed to :func:`noisefit` for every data array.
+
+    Returns
+    -------
+    res : list of NoiseResult
+        Fit results for each data array, in the same order as ``x``. The
+        ``diagnostic`` attribute of each result is an instance of
+        :class:`scipy.optimize.OptimizeResult` that includes only the
+        attributes ``fun``, ``nit``, ``nfev``, ``njev``, ``status``,
+        ``success``, and ``message``.
+
+    Raises
+    ------
+    ValueError
+        If any data array is not 2D.
+
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
+    noisefit_batch : Estimate noise models for a stack of data arrays.
 
-    if scale_delta_mu is None:
-        scale_delta_mu = noise_model.noise_amp(mu0)
-        scale_delta_mu[np.isclose(scale_delta_mu, 0.0)] = np.sqrt(
-            np.finfo(float).eps
+    Notes
+    -----
+    The data arrays are copied once into a single
+    :class:`multiprocessing.shared_memory.SharedMemory` block, which the
+    workers read without copying, and each worker returns only the fitted
+    parameters and their uncertainties. Workers are started with the
+    ``"spawn"`` method. The thread count set by ``blas_threads`` is applied
+    through the environment variables ``OMP_NUM_THREADS``,
+    ``OPENBLAS_NUM_THREADS``, ``MKL_NUM_THREADS``, ``BLIS_NUM_THREADS``, and
+    ``VECLIB_MAXIMUM_THREADS``, and also with `threadpoolctl
+    <https://github.com/joblib/threadpoolctl>`_ when it is installed.
+
+    Since the workers do not share the global options of the parent process,
+    the sampling time is resolved from ``kwargs`` and
+    ``thztools.options.sampling_time`` before the workers start.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> dt = 0.05
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> x = []
+    >>> for n, m in [(128, 20), (256, 10)]:
+    ...     z = np.tile(thz.wave(n, dt=dt), (m, 1)).T
+    ...     x.append(z + noise_model.noise_sim(z, axis=0, seed=0))
+    >>> res = thz.noisefit_parallel(x, dt=dt, max_workers=2)
+    >>> [r.mu.shape for r in res]
+    [(128,), (256,)]
+    """
+    arrays = [np.asarray(x_i, dtype=np.float64) for x_i in x]
+    if any(x_i.ndim != NUM_NOISE_DATA_DIMENSIONS for x_i in arrays):
+        msg = "Data array x must be 2D"
+        raise ValueError(msg)
+
+    kwargs["dt"] = _assign_sampling_time(kwargs.get("dt"))
+    offsets = np.cumsum([0] + [x_i.size for x_i in arrays])
+
+    # Copy all data arrays into one shared memory block
+    itemsize = np.dtype(np.float64).itemsize
+    shm = SharedMemory(create=True, size=max(1, int(offsets[-1]) * itemsize))
+    try:
+        buffer = np.ndarray((offsets[-1],), dtype=np.float64, buffer=shm.buf)
+        for x_i, offset in zip(arrays, offsets):
+            buffer[offset : offset + x_i.size] = x_i.ravel()
+        del buffer
+
+        environ = (
+            {}
+            if blas_threads is None
+            else {key: str(blas_threads) for key in BLAS_THREAD_VARIABLES}
         )
+        with (
+            _set_environ(environ),
+            ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_noisefit_worker,
+                initargs=(blas_threads,),
+            ) as executor,
+        ):
+            futures = [
+                executor.submit(
+                    _noisefit_shared,
+                    shm.name,
+                    x_i.shape,
+                    int(offset) * itemsize,
+                    return_hess_inv=return_hess_inv,
+                    **kwargs,
+                )
+                for x_i, offset in zip(arrays, offsets)
+            ]
+            out = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return [
+        NoiseResult(
+            NoiseModel(
+                out_i["sigma_alpha"],
+                out_i["sigma_beta"],
+                out_i["sigma_tau"],
+                dt=float(kwargs["dt"]),
+            ),
+            out_i["mu"],
+            out_i["a"],
+            out_i["eta"],
+            out_i["fval"],
+            out_i["hess_inv"],
+            out_i["err_sigma_alpha"],
+            out_i["err_sigma_beta"],
+            out_i["err_sigma_tau"],
+            out_i["err_mu"],
+            out_i["err_a"],
+            out_i["err_eta"],
+            OptimizeResult(**out_i["diagnostic"]),
+        )
+        for out_i in out
+    ]
 
-    scale_delta_mu = np.asarray(scale_delta_mu, dtype=np.float64)
 
-    if scale_delta_a is None:
-        scale_delta_a_amp = np.max((sigma_min, sigma_beta0))
-        scale_delta_a = scale_delta_a_amp * np.ones(m - 1)
+@contextmanager
+def _set_environ(environ: dict[str, str]) -> Iterator[None]:
+    """Temporarily set environment variables"""
+    saved = {key: os.environ.get(key) for key in environ}
+    os.environ.update(environ)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _init_noisefit_worker(blas_threads: int | None) -> None:
+    """Limit BLAS and numexpr threads in a noisefit_parallel worker process"""
+    if blas_threads is None:
+        return
+    ne = _numexpr()
+    if ne is not None:
+        ne.set_num_threads(blas_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=blas_threads)
+
+
+def _noisefit_shared(
+    name: str,
+    shape: tuple[int, ...],
+    offset: int,
+    *,
+    return_hess_inv: bool,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Apply noisefit to a data array in shared memory"""
+    shm = SharedMemory(name=name)
+    try:
+        x = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset)
+        res = noisefit(x, **kwargs)
+        # Copy outputs, which may include views of x
+        out = {
+            "sigma_alpha": res.noise_model.sigma_alpha,
+            "sigma_beta": res.noise_model.sigma_beta,
+            "sigma_tau": res.noise_model.sigma_tau,
+            "mu": np.array(res.mu),
+            "a": np.array(res.a),
+            "eta": np.array(res.eta),
+            "fval": res.fval,
+            "hess_inv": (
+                res.hess_inv if return_hess_inv else np.empty((0, 0))
+            ),
+            "err_sigma_alpha": res.err_sigma_alpha,
+            "err_sigma_beta": res.err_sigma_beta,
+            "err_sigma_tau": res.err_sigma_tau,
+            "err_mu": np.array(res.err_mu),
+            "err_a": np.array(res.err_a),
+            "err_eta": np.array(res.err_eta),
+            "diagnostic": {
+                key: res.diagnostic[key]
+                for key in (
+                    "fun",
+                    "nit",
+                    "nfev",
+                    "njev",
+                    "status",
+                    "success",
+                    "message",
+                )
+                if key in res.diagnostic
+            },
+        }
+        del x, res
+    finally:
+        shm.close()
+    return out
 
-    scale_delta_a = np.asarray(scale_delta_a, dtype=np.float64)
 
-    if scale_eta is None:
-        scale_eta_amp = np.max((sigma_min, sigma_tau0))
-        scale_eta = scale_eta_amp * np.ones(m - 1)
+@dataclass
+class NoiseFitStart:
+    r"""
+    Dataclass for the summary of one start of :func:`noisefit_multistart`.
 
-    scale_eta = np.asarray(scale_eta, dtype=np.float64)
+    Parameters
+    ----------
+    sigma_alpha0, sigma_beta0, sigma_tau0 : float
+        Initial values for the noise parameters.
+    noise_model : NoiseModel
+        Estimated noise parameters, represented as a :class:`NoiseModel`
+        object.
+    fval : float
+        Value of the NLL cost function at the end of the minimization.
+    nit : int
+        Number of iterations.
+    success : bool
+        Whether the minimization converged.
+    cancelled : bool
+        Whether the minimization was cancelled because its cost function
+        fell too far behind the leading start.
 
-    if scale_logv_alpha is None:
-        scale_logv_alpha = 1 / m
+    Attributes
+    ----------
+    sigma_alpha0, sigma_beta0, sigma_tau0 : float
+        Initial values for the noise parameters.
+    noise_model : NoiseModel
+        Estimated noise parameters, represented as a :class:`NoiseModel`
+        object.
+    fval : float
+        Value of the NLL cost function at the end of the minimization.
+    nit : int
+        Number of iterations.
+    success : bool
+        Whether the minimization converged.
+    cancelled : bool
+        Whether the minimization was cancelled because its cost function
+        fell too far behind the leading start.
 
-    if scale_logv_beta is None:
-        scale_logv_beta = 1 / m
+    See Also
+    --------
+    noisefit_multistart : Estimate noise model from several starting points.
+    """
 
-    if scale_logv_tau is None:
-        scale_logv_tau = 1 / m
+    sigma_alpha0: float
+    sigma_beta0: float
+    sigma_tau0: float
+    noise_model: NoiseModel
+    fval: float
+    nit: int
+    success: bool
+    cancelled: bool
 
-    scale_logv = np.array(
-        [scale_logv_alpha, scale_logv_beta, scale_logv_tau],
-        dtype=np.float64,
-    )
 
-    # Replace log(x) with -1e2 when x <= 0
-    v0 = (
-        np.asarray(
-            [sigma_alpha0, sigma_beta0, sigma_tau0 / dt], dtype=np.float64
-        )
-    ) ** 2
-    logv0_scaled = np.ma.log(v0).filled(-1.0e2) / scale_logv
-    delta0 = (x[:, 0] - mu0) / scale_delta_mu
+def noisefit_multistart(
+    x: ArrayLike,
+    *,
+    dt: float | None = None,
+    num_starts: int = 8,
+    spread: float = 1.0,
+    cancel_margin: float | None = None,
+    min_iter: int = 10,
+    max_workers: int | None = None,
+    seed: int | None = None,
+    **kwargs: Any,
+) -> tuple[NoiseResult, list[NoiseFitStart]]:
+    r"""
+    Estimate noise model from several starting points in parallel threads.
 
-    if a0 is None:
-        a0 = np.ones(m)
-    else:
-        a0 = np.asarray(a0, dtype=np.float64)
-        if a0.size != m:
-            msg = "Size of a0 is incompatible with data array x."
-            raise ValueError(msg)
+    Applies :func:`noisefit` to the same data array from ``num_starts``
+    initial values for the noise parameters, which are run concurrently in a
+    pool of threads, and returns the result with the smallest value of the
+    NLL cost function. This guards against convergence to a poor local
+    minimum, such as one in which a noise parameter collapses to zero.
 
-    epsilon0 = (a0[1:] - 1.0) / (a0[0] * scale_delta_a)
+    Parameters
+    ----------
+    x : array_like with shape (n, m)
+        Data array composed of ``m`` waveforms, each of which is sampled at
+        ``n`` points.
+    dt : float or None, optional
+        Sampling time, normally in picoseconds. Default is None, which sets
+        the sampling time to ``thztools.options.sampling_time``. If both
+        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
+        sampling time is set to ``1.0``.
+    num_starts : int, optional
+        Number of starting points. Default is 8.
+    spread : float, optional
+        Half-width of the distribution of the initial noise parameters, in
+        decades. The first start uses the initial values of
+        :func:`noisefit`, and the others multiply each free noise parameter
+        by a factor drawn from a log-uniform distribution on
+        :math:`[10^{-s}, 10^s]`, with :math:`s` equal to ``spread``.
+        Default is 1.0.
+    cancel_margin : float or None, optional
+        Cancel a start when its cost function exceeds that of the leading
+        start by more than ``cancel_margin``. Default is None, which uses
+        ``x.size``, corresponding to an average excess of 1 per data point.
+    min_iter : int, optional
+        Number of iterations before a start may be cancelled. Default is 10.
+    max_workers : int or None, optional
+        Maximum number of threads. Default is None, which uses the default
+        of :class:`concurrent.futures.ThreadPoolExecutor`.
+    seed : int or None, optional
+        Random number generator seed for the initial noise parameters.
+    **kwargs
+        Keyword arguments passed to :func:`noisefit` for every start. A
+        ``callback`` is called after each iteration of every start, from the
+        thread that runs it, in addition to the one used to cancel starts.
+        It stops only that start when it returns ``True``. If
+        ``sigma_alpha0``, ``sigma_beta0``, or ``sigma_tau0`` are given, they
+        are used as the centers of the distributions of the initial noise
+        parameters. Default scales are then derived from the initial values
+        of each start, as in :func:`noisefit`. As there, the default for
+        ``errors`` is ``"exact"``, but the exact uncertainties are computed
+        only for the selected result.
 
-    if eta0 is None:
-        eta0 = np.zeros(m)
-    else:
-        eta0 = np.asarray(eta0, dtype=np.float64)
-        if eta0.size != m:
-            msg = "Size of eta0 is incompatible with data array x."
-            raise ValueError(msg)
+    Returns
+    -------
+    res : NoiseResult
+        Fit result with the smallest value of the cost function.
+    starts : list of NoiseFitStart
+        Summary of each start, in the order of the starting points.
 
-    eta_scaled0 = eta0[1:] / scale_eta
+    Raises
+    ------
+    ValueError
+        If ``x`` is not 2D or if ``num_starts`` is not positive.
 
-    # Set initial guesses for all free parameters
-    x0 = np.array([], dtype=np.float64)
-    if not fix_sigma_alpha:
-        x0 = np.append(x0, logv0_scaled[0])
-    if not fix_sigma_beta:
-        x0 = np.append(x0, logv0_scaled[1])
-    if not fix_sigma_tau:
-        x0 = np.append(x0, logv0_scaled[2])
-    if not fix_mu:
-        x0 = np.concatenate((x0, delta0))
-    if not fix_a:
-        x0 = np.concatenate((x0, epsilon0))
-    if not fix_eta:
-        x0 = np.concatenate((x0, eta_scaled0))
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
 
-    # Bundle free parameters together into objective function
-    def objective(
-        _p: NDArray[np.float64],
-    ) -> np.float64:
-        if fix_sigma_alpha:
-            _logv_alpha = logv0_scaled[0]
-        else:
-            _logv_alpha = _p[0]
-            _p = _p[1:]
-        if fix_sigma_beta:
-            _logv_beta = logv0_scaled[1]
-        else:
-            _logv_beta = _p[0]
-            _p = _p[1:]
-        if fix_sigma_tau:
-            _logv_tau = logv0_scaled[2]
-        else:
-            _logv_tau = _p[0]
-            _p = _p[1:]
-        if fix_mu:
-            _delta = delta0
-        else:
-            _delta = _p[:n]
-            _p = _p[n:]
-        if fix_a:
-            _epsilon = epsilon0
-        else:
-            _epsilon = _p[: m - 1]
-            _p = _p[m - 1 :]
+    Notes
+    -----
+    The starts run in threads, so that their cost functions can be compared
+    while they run. Most of the computation in :func:`noisefit` is in NumPy
+    and SciPy functions that release the global interpreter lock, so the
+    threads run concurrently.
 
-        _eta = eta_scaled0 if fix_eta else _p[: m - 1]
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> n, m, dt = 128, 20, 0.05
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> z = np.tile(thz.wave(n, dt=dt), (m, 1)).T
+    >>> x = z + noise_model.noise_sim(z, axis=0, seed=0)
+    >>> res, starts = thz.noisefit_multistart(x, dt=dt, num_starts=4, seed=0)
+    >>> len(starts)
+    4
+    >>> res.fval == min(start.fval for start in starts)
+    True
+    """
+    # Keep array-like data sources out of memory for chunked evaluation
+    chunk_size = kwargs.get("chunk_size")
+    if chunk_size is None or not hasattr(x, "shape"):
+        x = np.asarray(x, dtype=np.float64)
+    x = cast("NDArray[np.float64]", x)
+    if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
+        msg = "Data array x must be 2D"
+        raise ValueError(msg)
+    if num_starts < 1:
+        msg = "Number of starts must be a positive integer"
+        raise ValueError(msg)
+    if chunk_size is not None and chunk_size < 1:
+        msg = "Chunk size must be a positive integer"
+        raise ValueError(msg)
 
-        return _nll_noisefit(
-            x.T,
-            _logv_alpha,
-            _logv_beta,
-            _logv_tau,
-            _delta,
-            _epsilon,
-            _eta,
-            scale_logv_alpha=scale_logv_alpha,
-            scale_logv_beta=scale_logv_beta,
-            scale_logv_tau=scale_logv_tau,
-            scale_delta_mu=scale_delta_mu,
-            scale_delta_a=scale_delta_a,
-            scale_eta_on_dt=scale_eta / dt,  # Scale in units of dt
+    dt = _assign_sampling_time(dt)
+    errors = kwargs.pop("errors", "exact")
+    user_callback = kwargs.pop("callback", None)
+    # Defer the exact uncertainties, unless noisefit rejects them anyway
+    defer_errors = errors == "exact" and kwargs.get("chunk_size") is None
+    if cancel_margin is None:
+        cancel_margin = float(x.size)
+
+    # Center the initial noise parameters on the given values or on the
+    # estimates from the time-dependent variance
+    if kwargs.get("estimate_drift", False):
+        mu_est, a_est, eta_est = _estimate_noisefit_drift(x, dt)
+        x_adj = scaleshift(x, dt=dt, a=1 / a_est, eta=-eta_est, axis=0)
+        sigma_center = _fit_noise_variance(
+            np.var(x_adj, 1, ddof=1), mu_est, dt
+        )
+    elif chunk_size is not None:
+        with closing(_NoiseFitChunks(x, chunk_size)) as chunks:
+            v_t = chunks.var()
+        sigma_center = _fit_noise_variance(
+            v_t, np.asarray(x[:, 0], dtype=np.float64), dt
+        )
+    else:
+        sigma_center = _fit_noise_variance(np.var(x, 1, ddof=1), x[:, 0], dt)
+    names = ("sigma_alpha", "sigma_beta", "sigma_tau")
+    for i, name in enumerate(names):
+        if kwargs.get(f"{name}0") is not None:
+            sigma_center[i] = kwargs[f"{name}0"]
+    free = np.array([not kwargs.get(f"fix_{name}", False) for name in names])
+    rng = default_rng(seed)
+    factor = 10.0 ** rng.uniform(-spread, spread, size=(num_starts, 3))
+    factor[0] = 1.0
+    factor[:, ~free] = 1.0
+    sigma0 = sigma_center * factor
+
+    # Record the lowest cost function reached at each iteration by any
+    # start, so that starts that fall behind the leader after the same number
+    # of iterations can be cancelled
+    lock = threading.Lock()
+    leader: list[float] = []
+    cancelled = np.zeros(num_starts, dtype=bool)
+
+    def make_callback(i: int) -> Callable[[NoiseFitProgress], bool]:
+        def callback(progress: NoiseFitProgress) -> bool:
+            k = progress.nit - 1
+            with lock:
+                if k == len(leader):
+                    leader.append(progress.fval)
+                elif k < len(leader):
+                    leader[k] = min(leader[k], progress.fval)
+                if (
+                    progress.nit >= min_iter
+                    and progress.fval
+                    > leader[min(k, len(leader) - 1)] + cancel_margin
+                ):
+                    cancelled[i] = True
+            stop = user_callback is not None and bool(user_callback(progress))
+            return bool(cancelled[i]) or stop
+
+        return callback
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                noisefit,
+                x,
+                dt=dt,
+                **{
+                    **kwargs,
+                    "errors": "lazy" if defer_errors else errors,
+                    "sigma_alpha0": float(sigma0_i[0]),
+                    "sigma_beta0": float(sigma0_i[1]),
+                    "sigma_tau0": float(sigma0_i[2]),
+                },
+                callback=make_callback(i),
+            )
+            for i, sigma0_i in enumerate(sigma0)
+        ]
+        results = [future.result() for future in futures]
+
+    starts = [
+        NoiseFitStart(
+            float(sigma0_i[0]),
+            float(sigma0_i[1]),
+            float(sigma0_i[2]),
+            res_i.noise_model,
+            res_i.fval,
+            int(res_i.diagnostic.get("nit", 0)),
+            bool(res_i.diagnostic.success),
+            bool(cancelled_i),
         )
+        for sigma0_i, res_i, cancelled_i in zip(sigma0, results, cancelled)
+    ]
+    best = int(np.argmin([res_i.fval for res_i in results]))
+    result = results[best]
+    if defer_errors:
+        # Evaluate the deferred uncertainties of the selected result only
+        _ = result.hess_inv
+    return result, starts
 
-    # Bundle free parameters together into objective function
-    def jac(_p: NDArray[np.float64]) -> NDArray[np.float64]:
-        if fix_sigma_alpha:
-            _logv_alpha = logv0_scaled[0]
-        else:
-            _logv_alpha = _p[0]
-            _p = _p[1:]
-        if fix_sigma_beta:
-            _logv_beta = logv0_scaled[1]
-        else:
-            _logv_beta = _p[0]
-            _p = _p[1:]
-        if fix_sigma_tau:
-            _logv_tau = logv0_scaled[2]
-        else:
-            _logv_tau = _p[0]
-            _p = _p[1:]
-        if fix_mu:
-            _delta = delta0
-        else:
-            _delta = _p[:n]
-            _p = _p[n:]
-        if fix_a:
-            _epsilon = epsilon0
-        else:
-            _epsilon = _p[: m - 1]
-            _p = _p[m - 1 :]
 
-        _eta_on_dt = eta_scaled0 / dt if fix_eta else _p[: m - 1]
+@dataclass
+class NoiseEstimate:
+    r"""
+    Dataclass for the output of :func:`noise_estimate`.
 
-        return _jac_noisefit(
-            x.T,
-            _logv_alpha,
-            _logv_beta,
-            _logv_tau,
-            _delta,
-            _epsilon,
-            _eta_on_dt,
-            fix_logv_alpha=fix_sigma_alpha,
-            fix_logv_beta=fix_sigma_beta,
-            fix_logv_tau=fix_sigma_tau,
-            fix_delta_mu=fix_mu,
-            fix_delta_a=fix_a,
-            fix_eta=fix_eta,
-            scale_logv_alpha=scale_logv_alpha,
-            scale_logv_beta=scale_logv_beta,
-            scale_logv_tau=scale_logv_tau,
-            scale_delta_mu=scale_delta_mu,
-            scale_delta_a=scale_delta_a,
-            scale_eta_on_dt=scale_eta / dt,  # Scale in units of dt
-        )
+    Parameters
+    ----------
+    noise_model : NoiseModel
+        Estimated noise parameters, represented as a :class:`NoiseModel`
+        object.
+    mu : ndarray
+        Drift-corrected mean waveform.
+    a : ndarray
+        Estimated signal amplitude drift vector.
+    eta : ndarray
+        Estimated signal delay drift vector.
+    err_sigma_alpha, err_sigma_beta, err_sigma_tau : float
+        Approximate uncertainties of the noise parameters.
+    nit : int
+        Number of reweighting iterations.
 
-    def hess(_p: NDArray[np.float64]) -> NDArray[np.float64]:
-        if fix_sigma_alpha:
-            _logv_alpha = logv0_scaled[0]
-        else:
-            _logv_alpha = _p[0]
-            _p = _p[1:]
-        if fix_sigma_beta:
-            _logv_beta = logv0_scaled[1]
-        else:
-            _logv_beta = _p[0]
-            _p = _p[1:]
-        if fix_sigma_tau:
-            _logv_tau = logv0_scaled[2]
-        else:
-            _logv_tau = _p[0]
-            _p = _p[1:]
-        if fix_mu:
-            _delta = delta0
-        else:
-            _delta = _p[:n]
-            _p = _p[n:]
-        if fix_a:
-            _epsilon = epsilon0
-        else:
-            _epsilon = _p[: m - 1]
-            _p = _p[m - 1 :]
+    Attributes
+    ----------
+    noise_model : NoiseModel
+        Estimated noise parameters, represented as a :class:`NoiseModel`
+        object.
+    mu : ndarray
+        Drift-corrected mean waveform.
+    a : ndarray
+        Estimated signal amplitude drift vector.
+    eta : ndarray
+        Estimated signal delay drift vector.
+    err_sigma_alpha, err_sigma_beta, err_sigma_tau : float
+        Approximate uncertainties of the noise parameters.
+    nit : int
+        Number of reweighting iterations.
+
+    See Also
+    --------
+    noise_estimate : Quick estimate of the noise model.
+    """
+
+    noise_model: NoiseModel
+    mu: NDArray[np.float64]
+    a: NDArray[np.float64]
+    eta: NDArray[np.float64]
+    err_sigma_alpha: float
+    err_sigma_beta: float
+    err_sigma_tau: float
+    nit: int
 
-        _eta_on_dt = eta_scaled0 / dt if fix_eta else _p[: m - 1]
 
-        return _hess_noisefit(
-            x.T,
-            _logv_alpha,
-            _logv_beta,
-            _logv_tau,
-            _delta,
-            _epsilon,
-            _eta_on_dt,
-            fix_logv_alpha=fix_sigma_alpha,
-            fix_logv_beta=fix_sigma_beta,
-            fix_logv_tau=fix_sigma_tau,
-            fix_delta_mu=fix_mu,
-            fix_delta_a=fix_a,
-            fix_eta=fix_eta,
-            scale_logv_alpha=scale_logv_alpha,
-            scale_logv_beta=scale_logv_beta,
-            scale_logv_tau=scale_logv_tau,
-            scale_delta_mu=scale_delta_mu,
-            scale_delta_a=scale_delta_a,
-            scale_eta_on_dt=scale_eta / dt,  # Scale in units of dt
-        )
+def noise_estimate(
+    x: ArrayLike,
+    *,
+    dt: float | None = None,
+    estimate_drift: bool = True,
+    max_iter: int = 20,
+    tol: float = 1e-6,
+) -> NoiseEstimate:
+    r"""
+    Quick estimate of the noise model from nominally identical waveforms.
 
-    input_parsed = {
-        "sigma_alpha0": sigma_alpha0,
-        "sigma_beta0": sigma_beta0,
-        "sigma_tau0": sigma_tau0,
-        "mu0": mu0,
-        "a0": a0,
-        "eta0": eta0,
-        "fix_sigma_alpha": fix_sigma_alpha,
-        "fix_sigma_beta": fix_sigma_beta,
-        "fix_sigma_tau": fix_sigma_tau,
-        "fix_mu": fix_mu,
-        "fix_a": fix_a,
-        "fix_eta": fix_eta,
-        "scale_logv_alpha": scale_logv_alpha,
-        "scale_logv_beta": scale_logv_beta,
-        "scale_logv_tau": scale_logv_tau,
-        "scale_delta_mu": scale_delta_mu,
-        "scale_delta_a": scale_delta_a,
-        "scale_eta": scale_eta,
-        "hess": hess,
-    }
-    return objective, jac, x0, input_parsed
+    Fits the noise model to the sample variance of the drift-corrected
+    waveforms by iteratively reweighted least squares. This is much faster
+    than :func:`noisefit` and is suitable for routine monitoring, but it is
+    less accurate, because it neglects the uncertainty in the signal and
+    drift estimates.
 
+    Parameters
+    ----------
+    x : array_like with shape (n, m)
+        Data array composed of ``m`` waveforms, each of which is sampled at
+        ``n`` points.
+    dt : float or None, optional
+        Sampling time, normally in picoseconds. Default is None, which sets
+        the sampling time to ``thztools.options.sampling_time``. If both
+        ``dt`` and ``thztools.options.sampling_time`` are ``None``, the
+        sampling time is set to ``1.0``.
+    estimate_drift : bool, optional
+        Correct the waveforms for amplitude and delay drift, estimated by
+        cross-correlation, before computing their variance. Default is True.
+        When False, the mean waveform is used as the signal estimate and
+        the drift is neglected.
+    max_iter : int, optional
+        Maximum number of reweighting iterations. Default is 20.
+    tol : float, optional
+        Terminate when the relative change in each of the variance
+        parameters is less than ``tol``. Default is ``1e-6``.
 
-def _parse_noisefit_output(
-    out: OptimizeResult,
-    x: NDArray[np.float64],
-    dt: float,
-    *,
-    sigma_alpha0: float,
-    sigma_beta0: float,
-    sigma_tau0: float,
-    mu0: NDArray[np.float64],
-    a0: NDArray[np.float64],
-    eta0: NDArray[np.float64],
-    fix_sigma_alpha: bool,
-    fix_sigma_beta: bool,
-    fix_sigma_tau: bool,
-    fix_mu: bool,
-    fix_a: bool,
-    fix_eta: bool,
-    scale_logv_alpha: float,
-    scale_logv_beta: float,
-    scale_logv_tau: float,
-    scale_delta_mu: NDArray[np.float64],
-    scale_delta_a: NDArray[np.float64],
-    scale_eta: NDArray[np.float64],
-    hess: Callable[[NDArray[np.float64]], NDArray[np.float64]],
-) -> NoiseResult:
-    """Parse noisefit output"""
-    # Parse output
-    n, m = x.shape
-    bias_correction = np.sqrt(m / (m - 1))
+    Returns
+    -------
+    res : NoiseEstimate
+        Estimate represented as a ``NoiseEstimate`` object, with the noise
+        model, the signal and drift estimates, and approximate
+        uncertainties for the noise parameters.
 
-    x_out = out.x
-    if fix_sigma_alpha:
-        alpha = sigma_alpha0
-    else:
-        alpha = np.exp(x_out[0] * scale_logv_alpha / 2) * bias_correction
-        x_out = x_out[1:]
-    if fix_sigma_beta:
-        beta = sigma_beta0
-    else:
-        beta = np.exp(x_out[0] * scale_logv_beta / 2) * bias_correction
-        x_out = x_out[1:]
-    if fix_sigma_tau:
-        tau = sigma_tau0
-    else:
-        tau = (
-            float(np.exp(x_out[0] * scale_logv_tau / 2) * dt) * bias_correction
-        )
-        x_out = x_out[1:]
+    Raises
+    ------
+    ValueError
+        If ``x`` is not 2D or has fewer than two waveforms.
 
-    noise_model = NoiseModel(
-        float(alpha), float(beta), float(tau), dt=float(dt)
-    )
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
 
-    if fix_mu:
-        mu_out = mu0
-    else:
-        mu_out = x[:, 0] - x_out[:n] * scale_delta_mu
-        x_out = x_out[n:]
+    Notes
+    -----
+    With the signal vector :math:`\boldsymbol{\mu}` and the drift
+    parameters :math:`a_l` and :math:`\eta_l` estimated by
+    cross-correlation, the residual variance at time :math:`t_k`,
+
+    .. math:: \hat{\sigma}_k^2 = \frac{1}{M - 1}\sum_{l=0}^{M-1}
+        \left[x_l(t_k) - a_l\mu(t_k - \eta_l)\right]^2,
+
+    is fitted to the average of the noise model over the waveforms,
+
+    .. math:: \hat{\sigma}_k^2 \approx \sigma_\alpha^2
+        + \sigma_\beta^2\langle\zeta_{lk}^2\rangle_l
+        + \sigma_\tau^2\langle\dot{\zeta}_{lk}^2\rangle_l,
+
+    with :math:`\zeta_{lk} = a_l\mu(t_k - \eta_l)`, which is linear in the
+    variance parameters. For Gaussian noise, the
+    variance of :math:`\hat{\sigma}_k^2` is approximately
+    :math:`2\sigma_k^4/(m - 1)`, so each iteration solves a nonnegative
+    least-squares problem with weights :math:`1/\sigma_k^2`, computed from
+    the model variance of the previous iteration, starting from the
+    unweighted fit. The
+    uncertainties are obtained from the covariance matrix of the weighted
+    fit, propagated to the noise amplitudes; for a noise amplitude of zero,
+    the square root of the uncertainty of the variance is given instead.
+    The computation requires :math:`O(MN\log N)` operations for the drift
+    estimate and the residuals, and :math:`O(N)` operations per iteration.
 
-    if fix_a:
-        a_out = a0
-    else:
-        a_out = np.concatenate(([1.0], 1.0 + x_out[: m - 1] * scale_delta_a))
-        x_out = x_out[m - 1 :]
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> n, m, dt = 256, 64, 0.05
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> z = np.tile(thz.wave(n, dt=dt), (m, 1)).T
+    >>> x = z + noise_model.noise_sim(z, axis=0, seed=0)
+    >>> res = thz.noise_estimate(x, dt=dt)
+    >>> res.noise_model
+    NoiseModel(sigma_alpha=0.000100..., sigma_beta=0.0101..., sigma_tau=0.00101..., dt=0.05)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != NUM_NOISE_DATA_DIMENSIONS:
+        msg = "Data array x must be 2D"
+        raise ValueError(msg)
+    m = x.shape[1]
+    if m < 2:
+        msg = "Data array x must have at least two waveforms"
+        raise ValueError(msg)
+    dt = _assign_sampling_time(dt)
 
-    if fix_eta:
-        eta_out = eta0
+    if estimate_drift:
+        mu, a, eta = _estimate_noisefit_drift(x, dt)
     else:
-        eta_out = np.concatenate(([0.0], x_out[: m - 1] * scale_eta))
-
-    diagnostic = out
-    fun = out.fun
+        mu = np.mean(x, axis=1)
+        a = np.ones(m)
+        eta = np.zeros(m)
 
-    # Concatenate scaling vectors for all sets of free parameters
-    scale_hess_inv = np.concatenate(
+    # Compare each waveform with the model shifted onto its own time grid,
+    # since shifting the noisy waveforms instead would spread the noise
+    # variance between neighboring time points
+    _, zeta, dzeta, _ = _noisefit_model(mu, a, eta / dt)
+    v_t = np.sum((x.T - zeta) ** 2, axis=0) / (m - 1)
+    design = np.stack(
         [
-            val
-            for tf, val in zip(
-                [
-                    fix_sigma_alpha,
-                    fix_sigma_beta,
-                    fix_sigma_tau,
-                    fix_mu,
-                    fix_a,
-                    fix_eta,
-                ],
-                [
-                    [scale_logv_alpha * alpha / 2],
-                    [scale_logv_beta * beta / 2],
-                    [scale_logv_tau * tau / 2],
-                    scale_delta_mu,
-                    scale_delta_a,
-                    scale_eta,
-                ],
-            )
-            if not tf
-        ]
+            np.ones_like(mu),
+            np.mean(zeta**2, axis=0),
+            np.mean(dzeta**2, axis=0) / dt**2,
+        ],
+        axis=1,
     )
 
-    # Get or compute the inverse hessian
-    hess_inv_scaled = np.linalg.inv(hess(out.x))
-
-    # Convert inverse Hessian into unscaled parameters
-    hess_inv = (
-        np.diag(scale_hess_inv) @ hess_inv_scaled @ np.diag(scale_hess_inv)
+    v_floor = np.min(v_t[v_t > 0], initial=np.finfo(np.float64).tiny)
+    p = nnls(design, v_t)[0]
+    nit = 0
+    while nit < max_iter:
+        nit += 1
+        weight = 1 / np.maximum(design @ p, v_floor)
+        p_new = nnls(design * weight[:, np.newaxis], v_t * weight)[0]
+        converged = np.all(np.abs(p_new - p) <= tol * np.abs(p_new))
+        p = p_new
+        if converged:
+            break
+
+    # Covariance of the variance parameters, with the variance of the
+    # sample variance evaluated from the model
+    v_model = np.maximum(design @ p, v_floor)
+    fisher = design.T @ (design * ((m - 1) / (2 * v_model**2))[:, np.newaxis])
+    err_p = np.sqrt(np.abs(np.diag(np.linalg.pinv(fisher))))
+    sigma = np.sqrt(p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        err_sigma = np.where(sigma > 0, err_p / (2 * sigma), np.sqrt(err_p))
+
+    return NoiseEstimate(
+        noise_model=NoiseModel(
+            sigma_alpha=float(sigma[0]),
+            sigma_beta=float(sigma[1]),
+            sigma_tau=float(sigma[2]),
+            dt=dt,
+        ),
+        mu=np.asarray(mu, dtype=np.float64),
+        a=np.asarray(a, dtype=np.float64),
+        eta=np.asarray(eta, dtype=np.float64),
+        err_sigma_alpha=float(err_sigma[0]),
+        err_sigma_beta=float(err_sigma[1]),
+        err_sigma_tau=float(err_sigma[2]),
+        nit=nit,
     )
 
-    # Determine parameter uncertainty vector from diagonal entries
-    err = np.sqrt(np.diag(hess_inv))
-    err_mu = np.array([])
-    err_a = np.array([])
-    err_eta = np.array([])
 
-    # Parse error vector
-    # Propagate error from log(V) to sigma
-    if not fix_sigma_alpha:
-        err_sigma_alpha = err[0]
-        err = err[1:]
-    else:
-        err_sigma_alpha = 0.0
+class IncrementalNoiseFit:
+    r"""
+    Incremental noise model estimate for a growing set of waveforms.
 
-    if not fix_sigma_beta:
-        err_sigma_beta = err[0]
-        err = err[1:]
-    else:
-        err_sigma_beta = 0.0
+    Starting from a :func:`noisefit` result, each call to :meth:`update`
+    refines the estimate with a new set of waveforms from the same
+    measurement, at a cost that depends on the number of new waveforms but
+    not on the number of waveforms that have already been processed.
 
-    if not fix_sigma_tau:
-        err_sigma_tau = err[0]
-        err = err[1:]
-    else:
-        err_sigma_tau = 0.0
+    Parameters
+    ----------
+    result : NoiseResult
+        Result of :func:`noisefit` for the initial set of waveforms, obtained
+        with all parameters free.
 
-    if not fix_mu:
-        err_mu = err[:n]
-        err = err[n:]
+    Attributes
+    ----------
+    result : NoiseResult
+        Current estimate. See :meth:`update` for the attributes that differ
+        from those of a :func:`noisefit` result.
 
-    if not fix_a:
-        err_a = np.concatenate(([0], err[: m - 1]))
-        err = err[m - 1 :]
+    Raises
+    ------
+    ValueError
+        If ``result`` was obtained with fixed parameters.
 
-    if not fix_eta:
-        err_eta = np.concatenate(([0], err[: m - 1]))
+    See Also
+    --------
+    noisefit : Estimate noise model from a set of nominally identical
+        waveforms.
 
-    # Cast fun as a Python float in case it is a NumPy constant
-    return NoiseResult(
-        noise_model,
-        mu_out,
-        a_out,
-        eta_out,
-        float(fun),
-        hess_inv,
-        err_sigma_alpha,
-        err_sigma_beta,
-        err_sigma_tau,
-        err_mu,
-        err_a,
-        err_eta,
-        diagnostic,
-    )
+    Notes
+    -----
+    The waveforms that have already been processed enter each update through
+    a quadratic approximation to their contribution to the negative
+    log-likelihood, expressed in terms of the parameters that are shared by
+    all waveforms: the logarithms of the noise variances and the signal
+    vector :math:`\boldsymbol{\mu}`. The curvature of this approximation is
+    the inverse of the marginal covariance of the shared parameters, which is
+    the Schur complement of the Hessian with the drift parameters
+    eliminated. After each update, the curvature is incremented by the Schur
+    complement of the Hessian for the new waveforms, which is computed by
+    central differences of the gradient. The amplitude and delay drift of
+    waveforms from previous updates are not refined further.
+
+    The drift parameters of the new waveforms are initialized with a
+    linear least-squares fit of each waveform to :math:`A\mu(t) -
+    A\eta\mu'(t)`, and the minimization starts from the inverse of the
+    Hessian at the initial parameters.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import thztools as thz
+    >>> n, dt = 128, 0.05
+    >>> mu = thz.wave(n, dt=dt)
+    >>> noise_model = thz.NoiseModel(sigma_alpha=1e-4, sigma_beta=1e-2,
+    ...  sigma_tau=1e-3, dt=dt)
+    >>> z = np.tile(mu, (80, 1)).T
+    >>> x = z + noise_model.noise_sim(z, axis=0, seed=0)
+    >>> fit = thz.IncrementalNoiseFit(thz.noisefit(x[:, :20], dt=dt))
+    >>> for i in range(20, 80, 20):
+    ...     res = fit.update(x[:, i : i + 20])
+    >>> res.a.shape
+    (80,)
+    """
+
+    def __init__(self, result: NoiseResult) -> None:
+        n = result.mu.size
+        m = result.a.size
+        num_shared = NUM_NOISE_PARAMETERS + n
+        if result.hess_inv.shape != (num_shared + 2 * (m - 1),) * 2:
+            msg = "Initial result must be obtained with all parameters free"
+            raise ValueError(msg)
+
+        dt = result.noise_model.dt
+        sigma = np.array(
+            [
+                result.noise_model.sigma_alpha,
+                result.noise_model.sigma_beta,
+                result.noise_model.sigma_tau,
+            ]
+        )
+
+        # Remove the bias correction applied by noisefit and express
+        # sigma_tau in units of the sampling time
+        sigma_ml = sigma / np.sqrt(m / (m - 1))
+        self._logv = np.log((sigma_ml / np.array([1.0, 1.0, dt])) ** 2)
+        self._mu = np.array(result.mu, dtype=np.float64)
+        self._dt = dt
+        self._m = m
+
+        # Convert the marginal covariance of (sigma, mu) to that of
+        # (log(v), mu), and invert it to obtain the curvature
+        scale = np.concatenate((2 / sigma, np.ones(n)))
+        cov = result.hess_inv[:num_shared, :num_shared] * np.outer(
+            scale, scale
+        )
+        self._precision = np.linalg.inv(cov)
+
+        self.result = result
+
+    def update(self, x: ArrayLike, *, maxiter: int = 50) -> NoiseResult:
+        r"""
+        Update the estimate with new waveforms.
+
+        Parameters
+        ----------
+        x : array_like with shape (n, m_new)
+            Data array composed of ``m_new`` new waveforms, each of which is
+            sampled at the same ``n`` points as the previous waveforms.
+        maxiter : int, optional
+            Maximum number of BFGS iterations. Default is 50.
+
+        Returns
+        -------
+        res : NoiseResult
+            Updated estimate, which is also stored in the ``result``
+            attribute. The attributes ``a``, ``eta``, ``err_a``, and
+            ``err_eta`` include all waveforms processed so far, and ``fval``
+            is the approximate value of the NLL cost function for all of
+            them. The ``hess_inv`` attribute is the covariance of the noise
+            parameters, the signal vector, and the amplitude and delay drift
+            of the new waveforms, in that order. The ``diagnostic`` attribute
+            is the result of :func:`scipy.optimize.minimize` for the update.
+
+        Raises
+        ------
+        ValueError
+            If ``x`` is not 2D or does not have ``n`` rows.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = self._mu.size
+        if x.ndim != NUM_NOISE_DATA_DIMENSIONS or x.shape[0] != n:
+            msg = f"Data array x must be 2D with {n} rows"
+            raise ValueError(msg)
+        m_new = x.shape[1]
+        x_rows = x.T
+        p = NUM_NOISE_PARAMETERS + n
+        i_eta = p + m_new
+
+        # Initialize the drift parameters with a linear least-squares fit
+        w = 2 * pi * _rfftfreq(n)
+        dmu = _irfft(1j * w * _rfft(self._mu), n=n)
+        coef = np.linalg.lstsq(
+            np.stack((self._mu, -dmu), axis=1), x, rcond=None
+        )[0]
+        theta_shared0 = np.concatenate((self._logv, self._mu))
+        theta0 = np.concatenate((theta_shared0, coef[0], coef[1] / coef[0]))
+
+        def split(
+            theta: NDArray[np.float64],
+        ) -> tuple[
+            NDArray[np.float64],
+            NDArray[np.float64],
+            NDArray[np.float64],
+            NDArray[np.float64],
+        ]:
+            theta = np.atleast_2d(theta)
+            return (
+                theta[:, :NUM_NOISE_PARAMETERS],
+                theta[:, NUM_NOISE_PARAMETERS:p],
+                theta[:, p:i_eta],
+                theta[:, i_eta:],
+            )
+
+        def jac_new(theta: NDArray[np.float64]) -> NDArray[np.float64]:
+            # Gradient of the NLL of the new waveforms for each row of theta,
+            # evaluated in chunks to limit memory use
+            chunk = max(1, 2**22 // x.size)
+            out = np.empty_like(theta)
+            for j in range(0, theta.shape[0], chunk):
+                _, *grads = _nll_jac_noisefit_unscaled(
+                    x_rows[np.newaxis], *split(theta[j : j + chunk])
+                )
+                out[j : j + chunk] = np.concatenate(grads, axis=1)
+            return out
+
+        def fun_and_jac(
+            theta: NDArray[np.float64],
+        ) -> tuple[float, NDArray[np.float64]]:
+            nll, *grads = _nll_jac_noisefit_unscaled(
+                x_rows[np.newaxis], *split(theta)
+            )
+            d = theta[:p] - theta_shared0
+            precision_d = self._precision @ d
+            jac = np.concatenate(grads, axis=1)[0]
+            jac[:p] += precision_d
+            return float(nll[0] + 0.5 * d @ precision_d), jac
+
+        def hess(theta: NDArray[np.float64]) -> NDArray[np.float64]:
+            # Central differences of the gradient. Since the drift
+            # parameters of different waveforms do not interact, all of the
+            # amplitude (or delay) parameters are perturbed together.
+            step = np.finfo(float).eps ** (1 / 3) * np.maximum(
+                np.abs(theta),
+                np.concatenate(
+                    (
+                        np.ones(NUM_NOISE_PARAMETERS),
+                        np.full(n, np.max(np.abs(self._mu))),
+                        np.ones(2 * m_new),
+                    )
+                ),
+            )
+            num_dir = p + 2
+            perturbation = np.zeros((num_dir, theta.size))
+            perturbation[np.arange(p), np.arange(p)] = step[:p]
+            perturbation[p, p:i_eta] = step[p:i_eta]
+            perturbation[p + 1, i_eta:] = step[i_eta:]
+            jac_diff = jac_new(
+                np.concatenate((theta + perturbation, theta - perturbation))
+            )
+            jac_diff = (jac_diff[:num_dir] - jac_diff[num_dir:]) / 2
+
+            h = np.zeros((theta.size, theta.size))
+            h[:p] = jac_diff[:p] / step[:p, np.newaxis]
+            h[:, :p] = h[:p].T
+            h[:p, :p] = (h[:p, :p] + h[:p, :p].T) / 2 + self._precision
+            idx_a = np.arange(p, i_eta)
+            idx_eta = np.arange(i_eta, theta.size)
+            h[idx_a, idx_a] = jac_diff[p, p:i_eta] / step[p:i_eta]
+            h[idx_eta, idx_eta] = jac_diff[p + 1, i_eta:] / step[i_eta:]
+            h[idx_a, idx_eta] = h[idx_eta, idx_a] = (
+                jac_diff[p, i_eta:] / step[p:i_eta]
+                + jac_diff[p + 1, p:i_eta] / step[i_eta:]
+            ) / 2
+            return h
+
+        # Minimize over variables scaled by the diagonal of the initial
+        # Hessian, and start from its inverse when it is positive definite
+        h0 = hess(theta0)
+        h0_diag = np.diag(h0)
+        scale = np.where(h0_diag > 0, 1 / np.sqrt(np.abs(h0_diag)), 1.0)
+        options: dict[str, Any] = {"maxiter": maxiter, "gtol": 1e-5 * x.size}
+        try:
+            np.linalg.cholesky(h0)
+        except np.linalg.LinAlgError:
+            pass
+        else:
+            hess_inv0 = _inv_block_arrow(
+                _BlockArrow.from_matrix(h0, p, 2)
+            ) / np.outer(scale, scale)
+            options["hess_inv0"] = (hess_inv0 + hess_inv0.T) / 2
+
+        def fun_and_jac_scaled(
+            q: NDArray[np.float64],
+        ) -> tuple[float, NDArray[np.float64]]:
+            # Return both together, so that each point is evaluated once
+            nll, jac = fun_and_jac(theta0 + scale * q)
+            return nll, scale * jac
+
+        out = minimize(
+            fun_and_jac_scaled,
+            np.zeros(theta0.size),
+            jac=True,
+            method="BFGS",
+            options=options,
+        )
+        theta = theta0 + scale * out.x
+
+        # Update the curvature for the shared parameters
+        cov = _inv_block_arrow(_BlockArrow.from_matrix(hess(theta), p, 2))
+        self._precision = np.linalg.inv(cov[:p, :p])
+        self._logv = theta[:NUM_NOISE_PARAMETERS]
+        self._mu = theta[NUM_NOISE_PARAMETERS:p]
+        self._m += m_new
+
+        dt = self._dt
+        sigma = (
+            np.sqrt(np.exp(self._logv))
+            * np.array([1.0, 1.0, dt])
+            * np.sqrt(self._m / (self._m - 1))
+        )
+        # Convert covariance to sigma and eta in units of time
+        scale_cov = np.concatenate(
+            (sigma / 2, np.ones(n + m_new), np.full(m_new, dt))
+        )
+        hess_inv = cov * np.outer(scale_cov, scale_cov)
+        err = np.sqrt(np.diag(hess_inv))
+
+        self.result = NoiseResult(
+            NoiseModel(
+                float(sigma[0]), float(sigma[1]), float(sigma[2]), dt=dt
+            ),
+            self._mu.copy(),
+            np.concatenate((self.result.a, theta[p:i_eta])),
+            np.concatenate((self.result.eta, theta[i_eta:] * dt)),
+            float(self.result.fval + out.fun),
+            hess_inv,
+            float(err[0]),
+            float(err[1]),
+            float(err[2]),
+            err[NUM_NOISE_PARAMETERS:p],
+            np.concatenate((self.result.err_a, err[p:i_eta])),
+            np.concatenate((self.result.err_eta, err[i_eta:])),
+            out,
+        )
+        return self.result
 
 
 @dataclass
@@ -3245,7 +8284,7 @@ def fit(
     else:
         f_bounds = np.asarray(f_bounds, dtype=np.float64)
 
-    f = rfftfreq(n, dt)
+    f = _rfftfreq(n, dt)
     f_excl_lo_idx = f < f_bounds[0]
     f_excl_hi_idx = f > f_bounds[1]
     f_incl_idx = ~f_excl_lo_idx * ~f_excl_hi_idx
@@ -3376,7 +8415,7 @@ def fit(
             ),
             axis=-1,
         )
-        jac_bl = irfft(fft_jac_bl * _fft_mu, n=n)
+        jac_bl = _irfft(fft_jac_bl * _fft_mu, n=n)
         if n_a > 0:
             a_circ = la.circulant(signal.unit_impulse(n_a))
             jac_a = np.concatenate(
@@ -3387,7 +8426,7 @@ def fit(
                 ),
                 axis=-1,
             )
-            jac_bl_a = irfft(jac_a * _fft_mu, n=n)
+            jac_bl_a = _irfft(jac_a * _fft_mu, n=n)
             jac_bl = np.concatenate((jac_bl, jac_bl_a), axis=0)
         if n_b > 0:
             b_circ = la.circulant(signal.unit_impulse(n_b) * 1j)
@@ -3426,7 +8465,7 @@ def fit(
                 jac_b = np.concatenate(
                     (np.zeros((n_b, n_in)), b_circ[:, :]), axis=-1
                 )
-            jac_bl_b = irfft(jac_b * _fft_mu, n=n)
+            jac_bl_b = _irfft(jac_b * _fft_mu, n=n)
             jac_bl = np.concatenate((jac_bl, jac_bl_b), axis=0)
         return jac_bl
 
@@ -3435,7 +8474,7 @@ def fit(
         mu_est = xdata[:] - _x[n_p + n_a + n_b :]
         jac_tl = np.zeros((n, n_p + n_a + n_b))
         jac_tr = np.diag(1 / sigma_x)
-        fft_mu_est = rfft(mu_est)
+        fft_mu_est = _rfft(mu_est)
         jac_bl = -(jacobian_bl(p_est[:n_p], fft_mu_est) / sigma_y).T
         impulse_response = apply_frf(
             function, signal.unit_impulse(n), dt=dt, args=p_est
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import importlib.util
+import pickle
 import sys
 from typing import TYPE_CHECKING, Any
 
@@ -7,9 +9,11 @@ import numpy as np
 import pytest
 from numpy import pi
 from numpy.testing import assert_allclose
+from scipy.optimize import approx_fprime, minimize
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from pathlib import Path
 
     from numpy.typing import ArrayLike, NDArray
 
@@ -23,17 +27,35 @@ else:
 
 import thztools
 from thztools.thztools import (
+    IncrementalNoiseFit,
+    LowRankCovariance,
+    NoiseFitProgress,
     NoiseModel,
     _assign_sampling_time,
+    _BlockArrow,
     _costfuntls,
+    _delay_phase,
     _hess_noisefit,
+    _hessp_noisefit,
+    _inv_block_arrow,
+    _inv_block_arrow_diag,
     _jac_noisefit,
+    _nll_common,
+    _nll_elementwise,
+    _nll_noisefit,
+    _NoiseFitBaseline,
     _parse_noisefit_input,
+    _solve_block_arrow,
     apply_frf,
     fft,
     fit,
     get_option,
+    noise_estimate,
     noisefit,
+    noisefit_batch,
+    noisefit_multistart,
+    noisefit_parallel,
+    noisefit_stochastic,
     reset_option,
     scaleshift,
     set_option,
@@ -70,6 +92,67 @@ def data_gen(n: int = n_default, *, np_sign: bool = True) -> dict[str, Any]:
     return {"dt": dt, "t": t, "f": f, "x": x, "p0": p0, "y": y}
 
 
+def noise_only_fit(
+    x: NDArray[np.float64],
+    *,
+    dt: float,
+    sigma0: NDArray[np.float64],
+    mu: NDArray[np.float64],
+    a: NDArray[np.float64],
+    eta: NDArray[np.float64],
+    fix_sigma_alpha: bool,
+    baseline: _NoiseFitBaseline | None = None,
+) -> tuple[float, NDArray[np.float64]]:
+    """Minimize the noisefit cost over the noise parameters directly"""
+    n, m = x.shape
+    kwargs: dict[str, Any] = {
+        "delta_mu_scaled": x[:, 0] - mu,
+        "delta_a_scaled": (a[1:] - 1.0) / a[0],
+        "eta_on_dt_scaled": eta[1:] / dt,
+        "scale_logv_alpha": 1.0,
+        "scale_logv_beta": 1.0,
+        "scale_logv_tau": 1.0,
+        "scale_delta_mu": np.ones(n),
+        "scale_delta_a": np.ones(m - 1),
+        "scale_eta_on_dt": np.ones(m - 1),
+    }
+    fix_kwargs = {
+        "fix_logv_alpha": fix_sigma_alpha,
+        "fix_logv_beta": False,
+        "fix_logv_tau": False,
+        "fix_delta_mu": True,
+        "fix_delta_a": True,
+        "fix_eta": True,
+    }
+    unit = np.array([1.0, 1.0, dt])
+    logv0 = np.log((sigma0 / unit) ** 2)
+
+    def fun(p: NDArray[np.float64]) -> tuple[float, NDArray[np.float64]]:
+        logv = np.concatenate((logv0[:1], p)) if fix_sigma_alpha else p
+        fval = float(_nll_noisefit(x.T, *logv, **kwargs))
+        jac = _jac_noisefit(x.T, *logv, **kwargs, **fix_kwargs)
+        if baseline is not None:
+            fval_baseline, jac_baseline, _ = baseline.nll(float(logv[0]))
+            fval += fval_baseline
+            if not fix_sigma_alpha:
+                jac[0] += jac_baseline
+        return fval, jac
+
+    res = minimize(
+        fun,
+        logv0[int(fix_sigma_alpha) :],
+        jac=True,
+        method="BFGS",
+        options={"gtol": 1e-10},
+    )
+    logv = np.concatenate((logv0[:1], res.x)) if fix_sigma_alpha else res.x
+    # Apply the bias correction of noisefit to the free noise parameters
+    sigma = np.sqrt(np.exp(logv)) * unit * np.sqrt(m / (m - 1))
+    if fix_sigma_alpha:
+        sigma[0] = sigma0[0]
+    return float(res.fun), sigma
+
+
 # Reset options before each test
 @pytest.fixture(autouse=True)
 def global_reset() -> None:
@@ -108,6 +191,41 @@ class TestOptions:
             with pytest.warns(UserWarning):
                 _assign_sampling_time(dt)
 
+    @pytest.mark.parametrize("workers", [1, 2, -1])
+    def test_fft_backend(self, workers: int) -> None:
+        n, m, dt = 64, 8, 0.05
+        mu = wave(n, dt=dt)
+        x = scaleshift(
+            np.tile(mu, (m, 1)), dt=dt, eta=0.1 * np.arange(m), axis=-1
+        )
+        noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+        x = x + noise_model.noise_sim(x, seed=0)
+
+        def evaluate() -> list[Any]:
+            return [
+                wave(n, dt=dt),
+                fft(mu),
+                noise_model.noise_var(mu),
+                apply_frf(tfun, mu, dt=dt, args=(1.0, 0.1)),
+                noisefit(x.T, dt=dt).fval,
+            ]
+
+        expected = evaluate()
+        set_option("fft_backend", "scipy")
+        set_option("fft_workers", workers)
+        for actual_i, expected_i in zip(evaluate(), expected):
+            assert_allclose(actual_i, expected_i, rtol=1e-9, atol=1e-12)
+
+    def test_fft_backend_error(self) -> None:
+        with pytest.raises(ValueError, match="FFT backend must be one of"):
+            set_option("fft_backend", "fftpack")
+        with pytest.raises(ValueError, match="Number of FFT workers"):
+            set_option("fft_workers", 0)
+        if importlib.util.find_spec("pyfftw") is None:
+            with pytest.raises(ImportError, match="requires the pyFFTW"):
+                set_option("fft_backend", "pyfftw")
+        assert get_option("fft_backend") == "numpy"
+
 
 class TestNoiseModel:
     n = 16
@@ -575,6 +693,54 @@ class TestJacNoiseFit:
         )
         assert_allclose(gradnll, desired_gradnll, atol=10 * eps, rtol=rtol)
 
+    def test_gradnll_numerical(self) -> None:
+        rng = np.random.default_rng(0)
+        m = 3
+        n = 8
+        x = rng.standard_normal((m, n))
+        p = np.concatenate(
+            (
+                [-0.5, 0.3, -0.2],
+                0.1 * rng.standard_normal(n),
+                0.1 * rng.standard_normal(m - 1),
+                0.3 * rng.standard_normal(m - 1),
+            )
+        )
+        scale_kwargs = {
+            "scale_logv_alpha": 1.0,
+            "scale_logv_beta": 1.0,
+            "scale_logv_tau": 1.0,
+            "scale_delta_mu": np.ones(n),
+            "scale_delta_a": np.ones(m - 1),
+            "scale_eta_on_dt": np.ones(m - 1),
+        }
+
+        def unpack(_p: NDArray[np.float64]) -> tuple[Any, ...]:
+            return (
+                _p[0],
+                _p[1],
+                _p[2],
+                _p[3 : 3 + n],
+                _p[3 + n : 2 + n + m],
+                _p[2 + n + m :],
+            )
+
+        gradnll = _jac_noisefit(
+            x,
+            *unpack(p),
+            fix_logv_alpha=False,
+            fix_logv_beta=False,
+            fix_logv_tau=False,
+            fix_delta_mu=False,
+            fix_delta_a=False,
+            fix_eta=False,
+            **scale_kwargs,
+        )
+        desired_gradnll = approx_fprime(
+            p, lambda _p: _nll_noisefit(x, *unpack(_p), **scale_kwargs)
+        )
+        assert_allclose(gradnll, desired_gradnll, atol=1e-5, rtol=1e-5)
+
 
 class TestHessNoiseFit:
     m = 2
@@ -952,6 +1118,287 @@ class TestHessNoiseFit:
         )
 
 
+class TestHesspNoiseFit:
+    rng = np.random.default_rng(0)
+    m = 3
+    n = 8
+    dt = 1.0 / n
+    x = rng.standard_normal((m, n))
+    logv_alpha = -0.5
+    logv_beta = 0.3
+    logv_tau = -0.2
+    delta_mu = 0.1 * rng.standard_normal(n)
+    delta_a = 0.1 * rng.standard_normal(m - 1)
+    eta = 0.3 * dt * rng.standard_normal(m - 1)
+    scale_logv_alpha = 0.7
+    scale_logv_beta = 1.3
+    scale_logv_tau = 0.9
+    scale_delta_mu = 0.5 + rng.random(n)
+    scale_delta_a = 0.5 + rng.random(m - 1)
+    scale_eta = dt * (0.5 + rng.random(m - 1))
+
+    @pytest.mark.parametrize("fix_logv_alpha", [True, False])
+    @pytest.mark.parametrize("fix_logv_beta", [True, False])
+    @pytest.mark.parametrize("fix_logv_tau", [True, False])
+    @pytest.mark.parametrize("fix_delta_mu", [True, False])
+    @pytest.mark.parametrize("fix_delta_a", [True, False])
+    @pytest.mark.parametrize("fix_eta", [True, False])
+    def test_hessp(
+        self,
+        *,
+        fix_logv_alpha: bool,
+        fix_logv_beta: bool,
+        fix_logv_tau: bool,
+        fix_delta_mu: bool,
+        fix_delta_a: bool,
+        fix_eta: bool,
+    ) -> None:
+        if (
+            fix_logv_alpha
+            and fix_logv_beta
+            and fix_logv_tau
+            and fix_delta_mu
+            and fix_delta_a
+            and fix_eta
+        ):
+            pytest.skip("All variables are fixed")
+        args = (
+            self.x,
+            self.logv_alpha,
+            self.logv_beta,
+            self.logv_tau,
+            self.delta_mu / self.scale_delta_mu,
+            self.delta_a / self.scale_delta_a,
+            self.eta / self.scale_eta,
+        )
+        kwargs = {
+            "fix_logv_alpha": fix_logv_alpha,
+            "fix_logv_beta": fix_logv_beta,
+            "fix_logv_tau": fix_logv_tau,
+            "fix_delta_mu": fix_delta_mu,
+            "fix_delta_a": fix_delta_a,
+            "fix_eta": fix_eta,
+            "scale_logv_alpha": self.scale_logv_alpha,
+            "scale_logv_beta": self.scale_logv_beta,
+            "scale_logv_tau": self.scale_logv_tau,
+            "scale_delta_mu": self.scale_delta_mu,
+            "scale_delta_a": self.scale_delta_a,
+            "scale_eta_on_dt": self.scale_eta / self.dt,
+        }
+        hess = _hess_noisefit(*args, **kwargs)
+        v = np.random.default_rng(1).standard_normal(hess.shape[0])
+        hessp = _hessp_noisefit(*args, v, **kwargs)
+        assert_allclose(hessp, hess @ v, atol=eps, rtol=rtol)
+
+    def test_hess_streamed(self) -> None:
+        # Large enough that the (mu, mu) block is accumulated in chunks
+        rng = np.random.default_rng(2)
+        m, n = 3, 1100
+        x = rng.standard_normal((m, n))
+        args = (
+            x,
+            self.logv_alpha,
+            self.logv_beta,
+            self.logv_tau,
+            0.1 * rng.standard_normal(n),
+            0.1 * rng.standard_normal(m - 1),
+            0.3 * rng.standard_normal(m - 1),
+        )
+        kwargs = {
+            "fix_logv_alpha": False,
+            "fix_logv_beta": False,
+            "fix_logv_tau": False,
+            "fix_delta_mu": False,
+            "fix_delta_a": False,
+            "fix_eta": False,
+            "scale_logv_alpha": self.scale_logv_alpha,
+            "scale_logv_beta": self.scale_logv_beta,
+            "scale_logv_tau": self.scale_logv_tau,
+            "scale_delta_mu": 0.5 + rng.random(n),
+            "scale_delta_a": 0.5 + rng.random(m - 1),
+            "scale_eta_on_dt": 0.5 + rng.random(m - 1),
+        }
+        hess = _hess_noisefit(*args, **kwargs)
+        assert_allclose(hess, hess.T, atol=eps, rtol=rtol)
+        v = rng.standard_normal(hess.shape[0])
+        hessp = _hessp_noisefit(*args, v, **kwargs)
+        assert_allclose(hessp, hess @ v, atol=eps, rtol=rtol)
+
+
+class TestNllElementwise:
+    rng = np.random.default_rng(0)
+    m = 3
+    n = 8
+    x = rng.standard_normal((m, n))
+    common = _nll_common(
+        x,
+        -0.5,
+        0.3,
+        -0.2,
+        0.1 * rng.standard_normal(n),
+        0.1 * rng.standard_normal(m - 1),
+        0.3 * rng.standard_normal(m - 1),
+        scale_logv_alpha=1.0,
+        scale_logv_beta=1.0,
+        scale_logv_tau=1.0,
+        scale_delta_mu=np.ones(n),
+        scale_delta_a=np.ones(m - 1),
+        scale_eta_on_dt=np.ones(m - 1),
+    )
+    vbeta = np.exp(0.3)
+    vtau = np.exp(-0.2)
+
+    @pytest.mark.parametrize("use_numexpr", [False, True])
+    def test_elementwise(self, *, use_numexpr: bool) -> None:
+        if use_numexpr:
+            pytest.importorskip("numexpr")
+        common = self.common
+        res = self.x - common.zeta
+        elementwise = _nll_elementwise(
+            self.x, common, self.vbeta, self.vtau, use_numexpr=use_numexpr
+        )
+        assert_allclose(elementwise.res, res)
+        assert_allclose(elementwise.res_w, res / common.vtot)
+        assert_allclose(elementwise.res_w2, res / common.vtot**2)
+        assert_allclose(elementwise.zeta2, common.zeta**2)
+        assert_allclose(elementwise.dzeta2, common.dzeta**2)
+        assert_allclose(
+            elementwise.vsig,
+            self.vbeta * common.zeta**2 + self.vtau * common.dzeta**2,
+        )
+        assert_allclose(
+            elementwise.dvar, (common.vtot - common.ressq) / common.vtot**2
+        )
+        assert_allclose(
+            elementwise.ddvar,
+            (2 * common.ressq - common.vtot) / common.vtot**3,
+        )
+
+    def test_numexpr_option(self) -> None:
+        elementwise = _nll_elementwise(
+            self.x, self.common, self.vbeta, self.vtau
+        )
+        assert not elementwise.use_numexpr
+        if importlib.util.find_spec("numexpr") is None:
+            with pytest.raises(ImportError, match="requires the numexpr"):
+                set_option("use_numexpr", True)
+            return
+        set_option("use_numexpr", True)
+        elementwise = _nll_elementwise(
+            self.x, self.common, self.vbeta, self.vtau
+        )
+        assert elementwise.use_numexpr
+        assert_allclose(
+            elementwise.res_w, (self.x - self.common.zeta) / self.common.vtot
+        )
+
+    def test_numexpr_error(self) -> None:
+        if importlib.util.find_spec("numexpr") is not None:
+            pytest.skip("numexpr is installed")
+        with pytest.raises(ImportError, match="require the numexpr"):
+            _nll_elementwise(
+                self.x, self.common, self.vbeta, self.vtau, use_numexpr=True
+            )
+
+
+class TestDelayPhase:
+    @pytest.mark.parametrize("n", [1, 2, 7, 8, 255, 4096])
+    @pytest.mark.parametrize("shape", [(), (5,), (2, 3)])
+    def test_delay_phase(self, n: int, shape: tuple[int, ...]) -> None:
+        eta_on_dt = np.random.default_rng(0).uniform(-10, 10, size=shape)
+        w = 2 * pi * np.fft.rfftfreq(n)
+        exp_iweta = _delay_phase(eta_on_dt, n)
+        assert exp_iweta.shape == (*shape, n // 2 + 1)
+        assert_allclose(
+            exp_iweta,
+            np.exp(1j * np.asarray(eta_on_dt)[..., np.newaxis] * w),
+            rtol=0,
+            atol=1e-13,
+        )
+
+
+class TestInvBlockArrow:
+    @pytest.mark.parametrize(
+        "num_dense, num_diag_blocks, q",
+        [(5, 2, 4), (5, 1, 4), (0, 2, 4), (0, 1, 4), (5, 0, 0)],
+    )
+    def test_inv(self, num_dense: int, num_diag_blocks: int, q: int) -> None:
+        rng = np.random.default_rng(0)
+        size = num_dense + num_diag_blocks * q
+        a = rng.standard_normal((size, size))
+        h = a @ a.T + size * np.eye(size)
+        for i in range(num_diag_blocks):
+            for j in range(num_diag_blocks):
+                rows = slice(num_dense + i * q, num_dense + (i + 1) * q)
+                cols = slice(num_dense + j * q, num_dense + (j + 1) * q)
+                h[rows, cols] = np.diag(np.diag(h[rows, cols]))
+        h_blocks = _BlockArrow.from_matrix(h, num_dense, num_diag_blocks)
+        assert_allclose(h_blocks.todense(), h)
+        assert_allclose(
+            _inv_block_arrow(h_blocks),
+            np.linalg.inv(h),
+            atol=eps,
+            rtol=rtol,
+        )
+        assert_allclose(
+            _inv_block_arrow_diag(h_blocks),
+            np.diag(np.linalg.inv(h)),
+            atol=eps,
+            rtol=rtol,
+        )
+        assert_allclose(
+            _solve_block_arrow(h_blocks)(np.eye(size)),
+            np.linalg.inv(h),
+            atol=eps,
+            rtol=rtol,
+        )
+
+
+class TestLowRankCovariance:
+    p = 50
+    rank = 3
+    rng = np.random.default_rng(0)
+    u = rng.standard_normal((p, rank))
+    d = 0.1 + rng.random(p)
+    cov = np.diag(d) + u @ u.T
+
+    def test_from_matrix(self) -> None:
+        cov_lr = LowRankCovariance.from_matrix(
+            self.cov, rank=self.rank, seed=0
+        )
+        assert cov_lr.factor.shape == (self.p, self.rank)
+        assert cov_lr.rank == self.rank
+        assert_allclose(cov_lr.variance(), np.diag(self.cov))
+        assert_allclose(
+            LowRankCovariance.from_matrix(
+                self.u @ self.u.T, rank=self.rank, seed=0
+            ).todense(),
+            self.u @ self.u.T,
+            atol=eps,
+            rtol=rtol,
+        )
+        index = [1, 4, 9]
+        assert_allclose(
+            cov_lr.covariance(index), cov_lr.todense()[np.ix_(index, index)]
+        )
+        mask = np.zeros(self.p, dtype=bool)
+        mask[index] = True
+        assert_allclose(cov_lr.covariance(mask), cov_lr.covariance(index))
+
+    def test_sample(self) -> None:
+        cov_lr = LowRankCovariance(self.d, self.u)
+        assert cov_lr.sample(seed=0).shape == (self.p,)
+        samples = cov_lr.sample(20000, seed=0)
+        assert samples.shape == (20000, self.p)
+        assert_allclose(
+            np.cov(samples, rowvar=False), self.cov, atol=0.15 * self.rank
+        )
+
+    def test_rank_error(self) -> None:
+        with pytest.raises(ValueError, match="Rank must be"):
+            _ = LowRankCovariance.from_matrix(self.cov, rank=-1)
+
+
 class TestNoiseFit:
     rng = np.random.default_rng(0)
     n = 256
@@ -1140,6 +1587,41 @@ class TestNoiseFit:
             scale_eta=scale_eta,
         )
 
+    def test_input_cache(self) -> None:
+        def parse() -> tuple[Callable, Callable, NDArray[np.float64]]:
+            objective, jac, x0, _ = _parse_noisefit_input(
+                self.x.T,
+                dt=self.dt,
+                sigma_alpha0=None,
+                sigma_beta0=None,
+                sigma_tau0=None,
+                mu0=None,
+                a0=None,
+                eta0=None,
+                fix_sigma_alpha=False,
+                fix_sigma_beta=False,
+                fix_sigma_tau=False,
+                fix_mu=False,
+                fix_a=False,
+                fix_eta=False,
+                scale_logv_alpha=None,
+                scale_logv_beta=None,
+                scale_logv_tau=None,
+                scale_delta_mu=None,
+                scale_delta_a=None,
+                scale_eta=None,
+            )
+            return objective, jac, x0
+
+        objective, jac, x0 = parse()
+        p = x0.copy()
+        _ = objective(p), jac(p)
+        # Modify the parameter vector in place to check for stale values
+        p += 1e-3 * np.random.default_rng(0).standard_normal(p.size)
+        objective_ref, jac_ref, _ = parse()
+        assert_allclose(objective(p), objective_ref(p))
+        assert_allclose(jac(p), jac_ref(p))
+
     @pytest.mark.parametrize(
         "fix_sigma_alpha, fix_sigma_beta, fix_sigma_tau, fix_mu, fix_a, "
         "fix_eta",
@@ -1199,6 +1681,835 @@ class TestNoiseFit:
         )
         assert_allclose(sigma_est / sigma, np.ones(3), atol=1e-1, rtol=1e-1)
 
+    @pytest.mark.parametrize(
+        "method",
+        [
+            "BFGS",
+            "L-BFGS-B",
+            "Newton-CG",
+            "trust-exact",
+            "trust-ncg",
+            "trust-krylov",
+            "block-coordinate",
+        ],
+    )
+    def test_method(self, method: str) -> None:
+        x = self.x
+        dt = self.dt
+        result = noisefit(
+            x.T,
+            dt=dt,
+            sigma_alpha0=self.alpha,
+            sigma_beta0=self.beta,
+            sigma_tau0=self.tau,
+            method=method,
+        )
+        assert result.diagnostic["success"]
+        assert result.diagnostic["nit"] > 0
+        assert result.diagnostic["execution_time"] > 0
+
+        sigma = self.sigma
+        sigma_est = np.asarray(
+            [
+                result.noise_model.sigma_alpha,
+                result.noise_model.sigma_beta,
+                result.noise_model.sigma_tau,
+            ]
+        )
+        assert_allclose(sigma_est / sigma, np.ones(3), atol=1e-1, rtol=1e-1)
+
+    @pytest.mark.parametrize(
+        "fix_sigma_alpha, fix_mu, fix_a, fix_eta",
+        [
+            (False, False, False, False),
+            (True, True, False, False),
+            (False, False, True, False),
+            (False, False, False, True),
+            (False, False, True, True),
+        ],
+    )
+    def test_block_coordinate(
+        self,
+        *,
+        fix_sigma_alpha: bool,
+        fix_mu: bool,
+        fix_a: bool,
+        fix_eta: bool,
+    ) -> None:
+        kwargs = {
+            "dt": self.dt,
+            "fix_sigma_alpha": fix_sigma_alpha,
+            "fix_mu": fix_mu,
+            "fix_a": fix_a,
+            "fix_eta": fix_eta,
+        }
+        x = self.x[:16].T
+        result = noisefit(x, method="block-coordinate", **kwargs)
+        result_ref = noisefit(x, **kwargs)
+        assert result.diagnostic.success
+        assert_allclose(result.fval, result_ref.fval, rtol=1e-5)
+        assert_allclose(
+            result.noise_model.sigma_beta,
+            result_ref.noise_model.sigma_beta,
+            rtol=1e-2,
+        )
+        assert_allclose(result.a, result_ref.a, atol=1e-4)
+
+    def test_method_error(self) -> None:
+        with pytest.raises(ValueError, match="Method must be one of"):
+            _ = noisefit(self.x.T, dt=self.dt, method="Nelder-Mead")
+
+    @pytest.mark.parametrize(
+        "fix_sigma_alpha, fix_mu, fix_a, fix_eta",
+        [
+            (False, False, False, False),
+            (True, True, False, False),
+            (False, False, True, True),
+        ],
+    )
+    def test_workers(
+        self,
+        *,
+        fix_sigma_alpha: bool,
+        fix_mu: bool,
+        fix_a: bool,
+        fix_eta: bool,
+    ) -> None:
+        kwargs = {
+            "dt": self.dt,
+            "fix_sigma_alpha": fix_sigma_alpha,
+            "fix_mu": fix_mu,
+            "fix_a": fix_a,
+            "fix_eta": fix_eta,
+        }
+        x = self.x[:16].T
+        result = noisefit(x, workers=2, **kwargs)
+        result_ref = noisefit(x, **kwargs)
+        assert_allclose(result.fval, result_ref.fval, rtol=1e-8)
+        assert_allclose(result.mu, result_ref.mu, rtol=1e-6, atol=1e-10)
+        assert_allclose(
+            result.noise_model.sigma_beta,
+            result_ref.noise_model.sigma_beta,
+            rtol=1e-6,
+        )
+
+    def test_workers_error(self) -> None:
+        with pytest.raises(ValueError, match="Number of workers"):
+            _ = noisefit(self.x.T, dt=self.dt, workers=0)
+
+    @pytest.mark.parametrize("fix_sigma_alpha", [True, False])
+    def test_init(self, *, fix_sigma_alpha: bool) -> None:
+        x = self.x.T
+        x_new = self.mu[:, np.newaxis] + self.noise_model.noise_sim(
+            np.ones(self.m) * self.mu[:, np.newaxis], axis=0, seed=1
+        )
+        kwargs = {
+            "dt": self.dt,
+            "sigma_alpha0": self.alpha,
+            "fix_sigma_alpha": fix_sigma_alpha,
+        }
+        result_prev = noisefit(x, **kwargs)
+        result_ref = noisefit(x_new, **kwargs)
+        result = noisefit(x_new, init=result_prev, **kwargs)
+        assert result.diagnostic.success
+        assert result.diagnostic.nit < result_ref.diagnostic.nit
+        assert result.fval < result_ref.fval + 1e-4 * abs(result_ref.fval)
+        assert_allclose(
+            result.noise_model.sigma_beta,
+            result_ref.noise_model.sigma_beta,
+            rtol=1e-2,
+        )
+
+    @pytest.mark.parametrize("method", ["BFGS", "block-coordinate"])
+    def test_callback(self, method: str) -> None:
+        progress_list: list[NoiseFitProgress] = []
+
+        def callback(progress: NoiseFitProgress) -> bool:
+            progress_list.append(progress)
+            return progress.nit >= 3
+
+        result = noisefit(
+            self.x.T,
+            dt=self.dt,
+            sigma_alpha0=self.alpha,
+            method=method,
+            callback=callback,
+        )
+        assert not result.diagnostic.success
+        assert result.diagnostic.message == "Stopped by callback."
+        assert result.diagnostic.nit == 3
+        assert [progress.nit for progress in progress_list] == [1, 2, 3]
+        progress = progress_list[-1]
+        assert progress.mu.shape == (self.n,)
+        assert progress.a.shape == (self.m,)
+        assert progress.eta.shape == (self.m,)
+        assert np.isfinite(progress.grad_norm)
+        assert progress.elapsed >= 0
+        assert_allclose(result.fval, progress.fval)
+        assert_allclose(result.mu, progress.mu)
+        assert_allclose(
+            result.noise_model.sigma_beta, progress.noise_model.sigma_beta
+        )
+
+    @pytest.mark.parametrize("method", ["BFGS", "block-coordinate"])
+    def test_budget(self, method: str) -> None:
+        kwargs = {"dt": self.dt, "sigma_alpha0": self.alpha, "method": method}
+        result = noisefit(self.x.T, max_iter=2, **kwargs)
+        assert not result.diagnostic.success
+        assert result.diagnostic.nit == 2
+        result = noisefit(self.x.T, max_time=0.0, **kwargs)
+        assert not result.diagnostic.success
+        assert result.diagnostic.message == "Maximum time has been exceeded."
+        assert result.diagnostic.nit == 1
+        assert np.isfinite(result.fval)
+
+    @pytest.mark.parametrize("method", ["BFGS", "L-BFGS-B"])
+    @pytest.mark.parametrize(
+        "errors", ["none", "bfgs", "diagonal", "low-rank", "lazy"]
+    )
+    def test_errors(self, errors: str, method: str) -> None:
+        kwargs = {
+            "dt": self.dt,
+            "sigma_alpha0": self.alpha,
+            "fix_sigma_alpha": True,
+            "method": method,
+        }
+        result_ref = noisefit(self.x.T, **kwargs)
+        result = noisefit(self.x.T, errors=errors, **kwargs)
+        assert (result._lazy_errors is not None) is (errors == "lazy")
+        num_free = 2 + self.n + 2 * (self.m - 1)
+        assert result.err_sigma_alpha == 0.0
+        assert result.err_mu.shape == (self.n,)
+        assert result.err_a.shape == (self.m,)
+        assert result.err_eta.shape == (self.m,)
+        if errors == "none":
+            assert result.hess_inv.shape == (0, 0)
+            assert np.isnan(result.err_sigma_beta)
+            assert np.all(np.isnan(result.err_mu))
+        elif errors == "bfgs":
+            assert result.hess_inv.shape == (num_free, num_free)
+            assert np.all(np.isfinite(result.err_mu))
+            assert result.err_sigma_beta > 0
+        else:
+            for name in [
+                "err_sigma_beta",
+                "err_sigma_tau",
+                "err_mu",
+                "err_a",
+                "err_eta",
+            ]:
+                assert_allclose(
+                    getattr(result, name), getattr(result_ref, name)
+                )
+            if errors in ("diagonal", "low-rank"):
+                assert result.hess_inv.shape == (0, 0)
+            else:
+                assert_allclose(result.hess_inv, result_ref.hess_inv)
+
+    def test_errors_lazy_pickle(self) -> None:
+        kwargs = {"dt": self.dt, "sigma_alpha0": self.alpha}
+        result_ref = noisefit(self.x.T, **kwargs)
+        for access in [False, True]:
+            result = noisefit(self.x.T, errors="lazy", **kwargs)
+            assert np.isnan(vars(result)["err_sigma_beta"])
+            if access:
+                assert_allclose(result.err_mu, result_ref.err_mu)
+            result_pickled = pickle.loads(pickle.dumps(result))
+            assert result._lazy_errors is None
+            assert result_pickled._lazy_errors is None
+            for name in ["err_sigma_beta", "err_mu", "err_eta", "hess_inv"]:
+                assert_allclose(
+                    vars(result_pickled)[name], getattr(result_ref, name)
+                )
+
+    def test_covariance(self) -> None:
+        kwargs = {"dt": self.dt, "sigma_alpha0": self.alpha}
+        result_ref = noisefit(self.x.T, **kwargs)
+        result = noisefit(
+            self.x.T, errors="low-rank", covariance_rank=8, **kwargs
+        )
+        assert result_ref.covariance is None
+        assert result.covariance is not None
+        assert result.covariance.rank == 8
+        assert_allclose(
+            result.covariance.variance(), np.diag(result_ref.hess_inv)
+        )
+        # The leading eigenvalue of the covariance is captured by the factor
+        assert_allclose(
+            np.linalg.norm(result.covariance.factor, ord=2) ** 2,
+            np.linalg.eigvalsh(result_ref.hess_inv)[-1],
+            rtol=1e-3,
+        )
+
+    def test_estimate_drift(self) -> None:
+        rng = np.random.default_rng(1)
+        m = 16
+        a = 1.0 + 1e-2 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
+        eta = 0.1 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
+        z = scaleshift(np.tile(self.mu, (m, 1)), dt=self.dt, a=a, eta=eta).T
+        noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=self.dt)
+        x = z + noise_model.noise_sim(z, axis=0, seed=1)
+        result_ref = noisefit(x, dt=self.dt)
+        result = noisefit(x, dt=self.dt, estimate_drift=True)
+        assert result.diagnostic.success
+        assert result.diagnostic.nit < result_ref.diagnostic.nit
+        assert result.fval <= result_ref.fval + 1e-6 * abs(result_ref.fval)
+        assert_allclose(result.eta, eta, atol=1e-2)
+        assert_allclose(result.a, a, atol=1e-2)
+
+    @pytest.mark.parametrize("chunk_size", [1, 10, 64])
+    def test_chunk_size(self, chunk_size: int, tmp_path: Path) -> None:
+        x = self.x.T
+        x_mmap = np.memmap(
+            tmp_path / "x.dat", dtype=np.float64, mode="w+", shape=x.shape
+        )
+        x_mmap[:] = x
+        x_mmap.flush()
+        kwargs = {"dt": self.dt, "sigma_alpha0": self.alpha}
+        result_ref = noisefit(x, errors="none", **kwargs)
+        result = noisefit(
+            x_mmap, chunk_size=chunk_size, errors="none", **kwargs
+        )
+        assert result.diagnostic.success
+        assert result.hess_inv.shape == (0, 0)
+        assert_allclose(result.fval, result_ref.fval, rtol=1e-9)
+        assert_allclose(result.mu, result_ref.mu, rtol=1e-6, atol=1e-12)
+        assert_allclose(
+            result.noise_model.sigma_beta,
+            result_ref.noise_model.sigma_beta,
+            rtol=1e-6,
+        )
+
+    def test_chunk_size_error(self) -> None:
+        with pytest.raises(ValueError, match="Chunk size"):
+            _ = noisefit(self.x.T, dt=self.dt, chunk_size=0)
+        with pytest.raises(ValueError, match="Chunked evaluation requires"):
+            _ = noisefit(
+                self.x.T,
+                dt=self.dt,
+                errors="none",
+                chunk_size=8,
+                method="Newton-CG",
+            )
+        with pytest.raises(ValueError, match="Data array x must be 2D"):
+            _ = noisefit(self.x[0], dt=self.dt, errors="none", chunk_size=8)
+        for errors in ["exact", "lazy", "diagonal", "low-rank"]:
+            with pytest.raises(ValueError, match="does not support errors"):
+                _ = noisefit(self.x.T, dt=self.dt, errors=errors, chunk_size=8)
+
+    def test_fix_eta_delay_phase(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Fixed delays should require one evaluation of the phase factors
+        delay_phase = thztools.thztools._delay_phase
+        num_calls = 0
+
+        def counting_delay_phase(*args: Any) -> Any:
+            nonlocal num_calls
+            num_calls += 1
+            return delay_phase(*args)
+
+        monkeypatch.setattr(
+            thztools.thztools, "_delay_phase", counting_delay_phase
+        )
+        result = noisefit(self.x.T, dt=self.dt, fix_eta=True, errors="none")
+        assert result.diagnostic.nfev > 1
+        assert num_calls == 1
+
+    @pytest.mark.parametrize("fix_sigma_alpha", [True, False])
+    @pytest.mark.parametrize("drift", [True, False])
+    def test_noise_only(self, *, fix_sigma_alpha: bool, drift: bool) -> None:
+        x = self.x.T
+        kwargs: dict[str, Any] = {
+            "dt": self.dt,
+            "sigma_alpha0": self.alpha,
+            "mu0": self.mu,
+            "fix_sigma_alpha": fix_sigma_alpha,
+            "fix_mu": True,
+            "fix_a": True,
+            "fix_eta": True,
+            "min_options": {"gtol": 1e-6},
+        }
+        a, eta = self.a, self.eta
+        if drift:
+            rng = np.random.default_rng(1)
+            a = kwargs["a0"] = 1.0 + 1e-3 * rng.standard_normal(self.m)
+            eta = kwargs["eta0"] = 1e-3 * rng.standard_normal(self.m)
+        fval_ref, sigma_ref = noise_only_fit(
+            x,
+            dt=self.dt,
+            sigma0=self.sigma,
+            mu=self.mu,
+            a=a,
+            eta=eta,
+            fix_sigma_alpha=fix_sigma_alpha,
+        )
+        result = noisefit(x, **kwargs)
+        assert result.diagnostic.success
+        assert_allclose(result.fval, fval_ref, rtol=1e-12)
+        for name, sigma_ref_i in zip(
+            ["sigma_alpha", "sigma_beta", "sigma_tau"], sigma_ref
+        ):
+            assert_allclose(
+                getattr(result.noise_model, name), sigma_ref_i, rtol=1e-5
+            )
+        assert_allclose(result.mu, self.mu)
+        assert_allclose(
+            result.err_sigma_beta,
+            noisefit(x, errors="bfgs", **kwargs).err_sigma_beta,
+            rtol=1e-6,
+        )
+
+    def test_errors_error(self) -> None:
+        with pytest.raises(ValueError, match="Errors must be one of"):
+            _ = noisefit(self.x.T, dt=self.dt, errors="approximate")
+        with pytest.raises(ValueError, match="requires method"):
+            _ = noisefit(
+                self.x.T, dt=self.dt, errors="bfgs", method="Newton-CG"
+            )
+
+    @pytest.mark.parametrize("method", ["BFGS", "block-coordinate"])
+    def test_roi(self, method: str) -> None:
+        x = self.x.T
+        roi = slice(64, 192)
+        outside = np.ones(self.n, dtype=bool)
+        outside[roi] = False
+        result_ref = noisefit(x, dt=self.dt)
+        result = noisefit(x, dt=self.dt, roi=roi, method=method)
+        assert result.diagnostic.success
+        assert result.diagnostic.x.size == result_ref.diagnostic.x.size - (
+            self.n - (roi.stop - roi.start)
+        )
+        assert result.mu.shape == result.err_mu.shape == (self.n,)
+        for name in ["sigma_alpha", "sigma_beta", "sigma_tau"]:
+            assert_allclose(
+                getattr(result.noise_model, name),
+                getattr(result_ref.noise_model, name),
+                atol=0.1 * getattr(result_ref, f"err_{name}"),
+            )
+        assert np.all(
+            np.abs(result.mu[roi] - result_ref.mu[roi])
+            < result_ref.err_mu[roi]
+        )
+        assert_allclose(result.mu[outside], np.mean(x[outside], axis=1))
+        assert_allclose(
+            result.err_mu[outside],
+            result.noise_model.sigma_alpha / np.sqrt(self.m),
+        )
+
+    @pytest.mark.parametrize("fix_sigma_alpha", [True, False])
+    def test_roi_noise_only(self, *, fix_sigma_alpha: bool) -> None:
+        x = self.x.T
+        roi = np.zeros(self.n, dtype=bool)
+        roi[64:192] = True
+        kwargs: dict[str, Any] = {
+            "dt": self.dt,
+            "sigma_alpha0": self.alpha,
+            "mu0": self.mu,
+            "fix_sigma_alpha": fix_sigma_alpha,
+            "fix_mu": True,
+            "fix_a": True,
+            "fix_eta": True,
+            "min_options": {"gtol": 1e-6},
+        }
+        fval_ref, sigma_ref = noise_only_fit(
+            x[roi],
+            dt=self.dt,
+            sigma0=self.sigma,
+            mu=self.mu[roi],
+            a=self.a,
+            eta=self.eta,
+            fix_sigma_alpha=fix_sigma_alpha,
+            baseline=_NoiseFitBaseline.from_data(x, slice(64, 192)),
+        )
+        result = noisefit(x, roi=roi, **kwargs)
+        assert result.diagnostic.success
+        assert_allclose(result.fval, fval_ref, rtol=1e-12)
+        for name, sigma_ref_i in zip(
+            ["sigma_alpha", "sigma_beta", "sigma_tau"], sigma_ref
+        ):
+            assert_allclose(
+                getattr(result.noise_model, name), sigma_ref_i, rtol=1e-5
+            )
+
+    def test_roi_error(self) -> None:
+        roi = np.zeros(self.n, dtype=bool)
+        roi[[10, 20]] = True
+        with pytest.raises(ValueError, match="contiguous range"):
+            _ = noisefit(self.x.T, dt=self.dt, roi=roi)
+        with pytest.raises(ValueError, match="contiguous range"):
+            _ = noisefit(self.x.T, dt=self.dt, roi=slice(0, 128, 2))
+        with pytest.raises(ValueError, match="boolean array"):
+            _ = noisefit(self.x.T, dt=self.dt, roi=roi[1:])
+        with pytest.raises(ValueError, match="at least 3 samples"):
+            _ = noisefit(self.x.T, dt=self.dt, roi=slice(10, 11))
+
+
+class TestNoiseFitBatch:
+    k = 3
+    n = 64
+    m = 16
+    dt = 0.05
+    mu = wave(n, dt=dt, t0=n * dt / 3)
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    z = np.tile(mu, (k, m, 1)).transpose(0, 2, 1)
+    x = z + noise_model.noise_sim(z, axis=1, seed=0)
+
+    @pytest.mark.parametrize(
+        "fix_sigma_alpha, fix_sigma_tau, fix_mu, fix_a, fix_eta",
+        [
+            (False, False, False, False, False),
+            (True, False, False, False, False),
+            (False, True, False, False, False),
+            (False, False, True, False, False),
+            (False, False, False, True, True),
+        ],
+    )
+    def test_noisefit_batch(
+        self,
+        *,
+        fix_sigma_alpha: bool,
+        fix_sigma_tau: bool,
+        fix_mu: bool,
+        fix_a: bool,
+        fix_eta: bool,
+    ) -> None:
+        kwargs = {
+            "dt": self.dt,
+            "sigma_alpha0": 1e-4,
+            "sigma_beta0": 1e-2,
+            "sigma_tau0": 1e-3,
+            "fix_sigma_alpha": fix_sigma_alpha,
+            "fix_sigma_tau": fix_sigma_tau,
+            "fix_mu": fix_mu,
+            "fix_a": fix_a,
+            "fix_eta": fix_eta,
+        }
+        res = noisefit_batch(self.x, **kwargs)
+        assert len(res) == self.k
+        for x_i, res_i in zip(self.x, res):
+            res_ref = noisefit(x_i, **kwargs)
+            assert res_i.diagnostic.success
+            assert_allclose(
+                [
+                    res_i.noise_model.sigma_alpha,
+                    res_i.noise_model.sigma_beta,
+                    res_i.noise_model.sigma_tau,
+                ],
+                [
+                    res_ref.noise_model.sigma_alpha,
+                    res_ref.noise_model.sigma_beta,
+                    res_ref.noise_model.sigma_tau,
+                ],
+                rtol=1e-2,
+            )
+            assert_allclose(res_i.fval, res_ref.fval, rtol=1e-6)
+
+    def test_initial_values(self) -> None:
+        mu0 = self.x[:, :, 1]
+        a0 = np.ones((self.k, self.m))
+        eta0 = np.zeros((self.k, self.m))
+        res = noisefit_batch(self.x, dt=self.dt, mu0=mu0, a0=a0, eta0=eta0)
+        assert all(res_i.diagnostic.success for res_i in res)
+
+    def test_inputs(self) -> None:
+        with pytest.raises(ValueError, match="Data array x must be 3D"):
+            _ = noisefit_batch(self.x[0], dt=self.dt)
+        res = noisefit_batch(self.x, dt=self.dt, min_options={"maxiter": 1})
+        assert all(res_i.diagnostic.status == 1 for res_i in res)
+
+
+class TestNoiseFitParallel:
+    dt = 0.05
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    z1 = np.tile(wave(64, dt=dt), (16, 1)).T
+    z2 = np.tile(wave(128, dt=dt), (8, 1)).T
+    x = (
+        z1 + noise_model.noise_sim(z1, seed=0),
+        z2 + noise_model.noise_sim(z2, seed=1),
+    )
+
+    @pytest.mark.parametrize("return_hess_inv", [True, False])
+    @pytest.mark.parametrize("blas_threads", [1, None])
+    def test_noisefit_parallel(
+        self, *, return_hess_inv: bool, blas_threads: int | None
+    ) -> None:
+        res = noisefit_parallel(
+            self.x,
+            dt=self.dt,
+            max_workers=2,
+            blas_threads=blas_threads,
+            return_hess_inv=return_hess_inv,
+        )
+        for x_i, res_i in zip(self.x, res):
+            res_ref = noisefit(x_i, dt=self.dt)
+            assert_allclose(
+                [
+                    res_i.noise_model.sigma_alpha,
+                    res_i.noise_model.sigma_beta,
+                    res_i.noise_model.sigma_tau,
+                ],
+                [
+                    res_ref.noise_model.sigma_alpha,
+                    res_ref.noise_model.sigma_beta,
+                    res_ref.noise_model.sigma_tau,
+                ],
+                rtol=1e-6,
+            )
+            assert_allclose(res_i.mu, res_ref.mu, rtol=1e-6)
+            assert_allclose(res_i.err_mu, res_ref.err_mu, rtol=1e-6)
+            assert res_i.diagnostic.success
+            if return_hess_inv:
+                assert_allclose(res_i.hess_inv, res_ref.hess_inv, rtol=1e-4)
+            else:
+                assert res_i.hess_inv.size == 0
+
+    def test_inputs(self) -> None:
+        with pytest.raises(ValueError, match="Data array x must be 2D"):
+            _ = noisefit_parallel([np.ones(8)])
+
+
+class TestNoiseFitMultistart:
+    dt = 0.05
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    z = np.tile(wave(64, dt=dt), (16, 1)).T
+    x = z + noise_model.noise_sim(z, axis=0, seed=0)
+
+    def test_noisefit_multistart(self) -> None:
+        res, starts = noisefit_multistart(
+            self.x, dt=self.dt, num_starts=3, seed=0
+        )
+        assert len(starts) == 3
+        assert res.fval == min(start.fval for start in starts)
+        res_ref = noisefit(self.x, dt=self.dt)
+        _, starts_ref = noisefit_multistart(
+            self.x, dt=self.dt, num_starts=2, spread=0.0
+        )
+        assert starts[0].sigma_beta0 == starts_ref[1].sigma_beta0
+        assert starts[1].sigma_beta0 != starts_ref[1].sigma_beta0
+        assert_allclose(starts_ref[0].fval, res_ref.fval)
+        assert res.fval <= res_ref.fval + 1e-6 * abs(res_ref.fval)
+
+    def test_errors(self) -> None:
+        res, _ = noisefit_multistart(self.x, dt=self.dt, num_starts=1)
+        res_ref = noisefit(self.x, dt=self.dt)
+        assert res._lazy_errors is None
+        assert_allclose(res.hess_inv, res_ref.hess_inv)
+        res, _ = noisefit_multistart(
+            self.x, dt=self.dt, num_starts=2, errors="none"
+        )
+        assert res.hess_inv.size == 0
+
+    def test_cancel(self) -> None:
+        _, starts = noisefit_multistart(
+            self.x,
+            dt=self.dt,
+            num_starts=4,
+            cancel_margin=0.0,
+            min_iter=1,
+            max_workers=1,
+            sigma_alpha0=1e-4,
+            fix_sigma_alpha=True,
+            seed=0,
+        )
+        assert any(start.cancelled for start in starts)
+        assert not starts[0].cancelled
+        assert all(start.sigma_alpha0 == 1e-4 for start in starts)
+        for start in starts:
+            assert start.success is not start.cancelled
+
+    def test_chunk_size(self, tmp_path: Path) -> None:
+        x_mmap = np.memmap(
+            tmp_path / "x.dat", dtype=np.float64, mode="w+", shape=self.x.shape
+        )
+        x_mmap[:] = self.x
+        x_mmap.flush()
+        kwargs: dict[str, Any] = {"num_starts": 2, "errors": "none", "seed": 0}
+        res, starts = noisefit_multistart(
+            x_mmap, dt=self.dt, chunk_size=5, **kwargs
+        )
+        _, starts_ref = noisefit_multistart(self.x, dt=self.dt, **kwargs)
+        for start, start_ref in zip(starts, starts_ref):
+            assert_allclose(start.sigma_alpha0, start_ref.sigma_alpha0)
+        assert_allclose(res.fval, min(start.fval for start in starts_ref))
+
+    def test_callback(self) -> None:
+        nits: list[int] = []
+
+        def callback(progress: NoiseFitProgress) -> bool:
+            nits.append(progress.nit)
+            return progress.nit >= 2
+
+        _, starts = noisefit_multistart(
+            self.x, dt=self.dt, num_starts=2, callback=callback, seed=0
+        )
+        assert len(nits) == 4
+        for start in starts:
+            assert start.nit == 2
+            assert not start.success
+            assert not start.cancelled
+
+    def test_inputs(self) -> None:
+        with pytest.raises(ValueError, match="Data array x must be 2D"):
+            _ = noisefit_multistart(self.x[:, 0], dt=self.dt)
+        with pytest.raises(ValueError, match="Number of starts"):
+            _ = noisefit_multistart(self.x, dt=self.dt, num_starts=0)
+
+
+class TestNoiseEstimate:
+    n = 256
+    m = 64
+    dt = 0.05
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    rng = np.random.default_rng(0)
+    a = 1.0 + 1e-2 * rng.standard_normal(m)
+    eta = 1e-2 * rng.standard_normal(m)
+    a[0], eta[0] = 1.0, 0.0
+
+    @pytest.mark.parametrize("drift", [True, False])
+    def test_noise_estimate(self, *, drift: bool) -> None:
+        z = np.tile(wave(self.n, dt=self.dt), (self.m, 1))
+        if drift:
+            z = scaleshift(z, dt=self.dt, a=self.a, eta=self.eta, axis=-1)
+        x = z.T + self.noise_model.noise_sim(z.T, axis=0, seed=1)
+        res = noise_estimate(x, dt=self.dt, estimate_drift=drift)
+        assert res.nit > 1
+        for name in ["sigma_alpha", "sigma_beta", "sigma_tau"]:
+            err = getattr(res, f"err_{name}")
+            assert 0 < err < 0.1 * getattr(self.noise_model, name)
+            assert_allclose(
+                getattr(res.noise_model, name),
+                getattr(self.noise_model, name),
+                atol=4 * err,
+            )
+        if drift:
+            # Compare the amplitudes within the uncertainties of the
+            # maximum-likelihood estimates, which vanish for the reference
+            # waveform
+            err_a = noisefit(x, dt=self.dt).err_a
+            assert np.all(np.abs(res.a - self.a) <= 4 * err_a)
+            assert_allclose(res.eta, self.eta, atol=5e-3)
+        else:
+            assert_allclose(res.mu, np.mean(x, axis=1))
+
+    def test_inputs(self) -> None:
+        x = np.ones((8, 4))
+        with pytest.raises(ValueError, match="Data array x must be 2D"):
+            _ = noise_estimate(x[:, 0], dt=self.dt)
+        with pytest.raises(ValueError, match="at least two waveforms"):
+            _ = noise_estimate(x[:, :1], dt=self.dt)
+
+
+class TestIncrementalNoiseFit:
+    dt = 0.05
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    z = np.tile(wave(64, dt=dt), (48, 1)).T
+    x = z + noise_model.noise_sim(z, axis=0, seed=0)
+
+    def test_update(self) -> None:
+        res_ref = noisefit(self.x, dt=self.dt)
+        inc = IncrementalNoiseFit(noisefit(self.x[:, :16], dt=self.dt))
+        for i in (16, 32):
+            res = inc.update(self.x[:, i : i + 16])
+        assert res is inc.result
+        assert res.diagnostic.success
+        assert res.a.shape == res.eta.shape == res.err_a.shape == (48,)
+        assert res.hess_inv.shape == (3 + 64 + 2 * 16,) * 2
+        assert_allclose(
+            [
+                res.noise_model.sigma_alpha,
+                res.noise_model.sigma_beta,
+                res.noise_model.sigma_tau,
+            ],
+            [
+                res_ref.noise_model.sigma_alpha,
+                res_ref.noise_model.sigma_beta,
+                res_ref.noise_model.sigma_tau,
+            ],
+            rtol=0.05,
+        )
+        assert_allclose(res.mu, res_ref.mu, rtol=1e-2, atol=1e-3)
+
+    def test_update_repeated(self) -> None:
+        # The NLL for a repeated data set is minimized by the initial
+        # parameters, so the update should match a fit to both copies
+        x = self.x[:, :16]
+        res_ref = noisefit(np.concatenate((x, x), axis=1), dt=self.dt)
+        res = IncrementalNoiseFit(noisefit(x, dt=self.dt)).update(x)
+        assert_allclose(res.mu, res_ref.mu, atol=1e-4)
+        assert_allclose(res.err_mu, res_ref.err_mu, rtol=0.02)
+        assert_allclose(res.err_sigma_beta, res_ref.err_sigma_beta, rtol=0.02)
+
+    def test_update_evaluations(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Each BFGS point should require one evaluation of the cost function
+        # and its gradient together
+        inc = IncrementalNoiseFit(noisefit(self.x[:, :16], dt=self.dt))
+        nll_jac = thztools.thztools._nll_jac_noisefit_unscaled
+        num_points = 0
+
+        def counting_nll_jac(*args: Any) -> Any:
+            nonlocal num_points
+            num_points += args[1].shape[0] == 1
+            return nll_jac(*args)
+
+        monkeypatch.setattr(
+            thztools.thztools, "_nll_jac_noisefit_unscaled", counting_nll_jac
+        )
+        res = inc.update(self.x[:, 16:32])
+        assert num_points == res.diagnostic.nfev
+
+    def test_inputs(self) -> None:
+        res = noisefit(self.x[:, :16], dt=self.dt, fix_sigma_tau=True)
+        with pytest.raises(ValueError, match="all parameters free"):
+            _ = IncrementalNoiseFit(res)
+        inc = IncrementalNoiseFit(noisefit(self.x[:, :16], dt=self.dt))
+        with pytest.raises(ValueError, match="must be 2D with 64 rows"):
+            _ = inc.update(self.x[:32])
+
+
+class TestNoiseFitStochastic:
+    n = 64
+    m = 200
+    dt = 0.05
+    noise_model = NoiseModel(1e-4, 1e-2, 1e-3, dt=dt)
+    rng = np.random.default_rng(0)
+    a = 1.0 + 1e-2 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
+    eta = 1e-3 * np.concatenate(([0.0], rng.standard_normal(m - 1)))
+    z = scaleshift(np.tile(wave(n, dt=dt), (m, 1)), dt=dt, a=a, eta=eta).T
+    x = z + noise_model.noise_sim(z, axis=0, seed=1)
+
+    def test_noisefit_stochastic(self) -> None:
+        res = noisefit_stochastic(
+            self.x,
+            dt=self.dt,
+            batch_size=32,
+            maxiter=500,
+            learning_rate=3e-2,
+            seed=0,
+        )
+        res_ref = noisefit(self.x, dt=self.dt, method="block-coordinate")
+        assert res.a[0] == 1.0
+        assert res.eta[0] == 0.0
+        assert res.hess_inv.size == 0
+        assert np.isnan(res.err_sigma_beta)
+        assert res.diagnostic.nit == 500
+        for attr in ("sigma_alpha", "sigma_beta", "sigma_tau"):
+            assert_allclose(
+                getattr(res.noise_model, attr),
+                getattr(res_ref.noise_model, attr),
+                rtol=0.05,
+            )
+        assert_allclose(res.mu, res_ref.mu, atol=5e-3)
+        assert_allclose(res.a, res_ref.a, atol=1e-3)
+        assert_allclose(res.eta, res_ref.eta, atol=1e-4)
+        assert_allclose(res.fval, res_ref.fval, rtol=1e-4)
+
+    def test_inputs(self) -> None:
+        with pytest.raises(ValueError, match="Data array x must be 2D"):
+            _ = noisefit_stochastic(np.ones(8))
+        with pytest.raises(ValueError, match="Size of mu0"):
+            _ = noisefit_stochastic(self.x, mu0=np.ones(8))
+
 
 class TestFit:
     alpha, beta, tau = 1e-5, 0, 0